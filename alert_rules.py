@@ -0,0 +1,246 @@
+# 알림 규칙 엔진
+# 사용자가 등록한 임계값/돌파/변동률 규칙을 게시된 버전 사이의 변경분에만 적용
+# (값이 바뀐 종목 x 바뀐 필드를 참조하는 규칙만 평가하므로 전체 행 x 전체 규칙을 돌지 않음)
+# 규칙은 서버가, 평가 상태와 발생한 알림은 게시하는 쪽(파이프라인)이 기록
+
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+
+from atomic_publish import atomic_open, file_lock
+import snapshot_versions
+
+ALERT_RULES_FILENAME = 'nasdaq100_alert_rules.json'
+ALERT_STATE_FILENAME = 'nasdaq100_alert_state.json'
+ALERTS_FILENAME = 'nasdaq100_alerts.jsonl'
+
+# 규칙을 걸 수 있는 클라이언트 행 필드
+RULE_FIELDS = ('peg', 'trailPE', 'fwdPE', 'price')
+
+# 규칙 종류
+KIND_CROSSES_BELOW = 'crosses_below'  # 이전 값 >= value 였다가 value 미만이 됨 (예: PEG 1.0 미만 = peg-good)
+KIND_CROSSES_ABOVE = 'crosses_above'  # 이전 값 <= value 였다가 value 초과가 됨 (두 값이 모두 있을 때만)
+KIND_CHANGE_PCT = 'change_pct'        # 직전 버전 대비 value% 이상 변동 (예: Forward P/E 20%)
+RULE_KINDS = (KIND_CROSSES_BELOW, KIND_CROSSES_ABOVE, KIND_CHANGE_PCT)
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+def _load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def normalize_rule(spec):
+    """요청으로 받은 규칙을 검증해 정규화된 dict 반환, 잘못된 값이면 ValueError"""
+    field = spec.get('field')
+    if field not in RULE_FIELDS:
+        raise ValueError(f'field는 {", ".join(RULE_FIELDS)} 중 하나여야 합니다.')
+    kind = spec.get('kind')
+    if kind not in RULE_KINDS:
+        raise ValueError(f'kind는 {", ".join(RULE_KINDS)} 중 하나여야 합니다.')
+    try:
+        value = float(spec.get('value'))
+    except (TypeError, ValueError):
+        raise ValueError('value는 숫자여야 합니다.')
+    if kind == KIND_CHANGE_PCT and value <= 0:
+        raise ValueError('변동률(value)은 0보다 커야 합니다.')
+
+    tickers = spec.get('tickers') or None
+    if isinstance(tickers, str):
+        tickers = tickers.split(',')
+    if tickers is not None:
+        tickers = sorted({str(ticker).strip().upper() for ticker in tickers if str(ticker).strip()}) or None
+    return {'field': field, 'kind': kind, 'value': value, 'tickers': tickers,
+            'label': str(spec.get('label') or '')}
+
+
+class AlertRuleStore:
+    """{규칙 id: 규칙}을 파일로 유지 (여러 워커 프로세스가 쓰므로 파일 잠금 아래에서 읽고 고침)"""
+
+    def __init__(self, path=ALERT_RULES_FILENAME):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self):
+        with file_lock(self.path, shared=True):
+            return _load_json(self.path, {})
+
+    def add(self, rule):
+        with self._lock, file_lock(self.path):
+            rules = _load_json(self.path, {})
+            rule = {**rule, 'id': uuid.uuid4().hex, 'created_at': _now()}
+            rules[rule['id']] = rule
+            self._write(rules)
+        return rule
+
+    def delete(self, rule_id):
+        with self._lock, file_lock(self.path):
+            rules = _load_json(self.path, {})
+            if rules.pop(rule_id, None) is None:
+                return False
+            self._write(rules)
+        return True
+
+    def _write(self, rules):
+        with atomic_open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(rules, f, indent=2, ensure_ascii=False)
+
+
+class RuleIndex:
+    """필드(와 종목)별로 규칙을 묶어, 바뀐 필드를 참조하는 규칙만 바로 찾도록 함"""
+
+    def __init__(self, rules):
+        self.by_field = {}          # 필드 -> 모든 종목 대상 규칙
+        self.by_field_ticker = {}   # (필드, 티커) -> 해당 종목 규칙
+        for rule in rules:
+            if rule['tickers'] is None:
+                self.by_field.setdefault(rule['field'], []).append(rule)
+            else:
+                for ticker in rule['tickers']:
+                    self.by_field_ticker.setdefault((rule['field'], ticker), []).append(rule)
+        self.fields = set(self.by_field) | {field for field, _ in self.by_field_ticker}
+
+    def rules_for(self, field, ticker):
+        return self.by_field.get(field, []) + self.by_field_ticker.get((field, ticker), [])
+
+
+def rule_fires(rule, old, new):
+    """이전 값 -> 새 값 변화가 규칙을 만족하는지
+
+    이전 값이 없으면(종목이 빠졌다 돌아오거나 값이 비어 있던 경우) 돌파로 보지 않음
+    """
+    if old is None or new is None:
+        return False
+    threshold = rule['value']
+    if rule['kind'] == KIND_CROSSES_BELOW:
+        return new < threshold <= old
+    if rule['kind'] == KIND_CROSSES_ABOVE:
+        return old <= threshold < new
+    if rule['kind'] == KIND_CHANGE_PCT:
+        return old != 0 and abs(new / old - 1) * 100 >= threshold
+    return False
+
+
+def describe(rule, ticker, old, new):
+    if rule['kind'] == KIND_CHANGE_PCT:
+        change = (new / old - 1) * 100
+        return f"{ticker} {rule['field']} {old:.4g} → {new:.4g} ({change:+.1f}%)"
+    direction = '미만' if rule['kind'] == KIND_CROSSES_BELOW else '초과'
+    return f"{ticker} {rule['field']} {rule['value']:g} {direction} ({old if old is None else f'{old:.4g}'} → {new:.4g})"
+
+
+def evaluate_diff(old_rows, new_rows, index, version):
+    """두 버전 {티커: 행} 사이에서 값이 바뀐 (종목, 필드)에 걸린 규칙만 평가해 알림 목록 반환"""
+    alerts = []
+    fired_at = _now()
+    for ticker, row in new_rows.items():
+        previous = old_rows.get(ticker)
+        if previous == row:
+            continue
+        for field in index.fields:
+            old = previous.get(field) if previous is not None else None
+            new = row.get(field)
+            if old == new:
+                continue
+            for rule in index.rules_for(field, ticker):
+                if rule_fires(rule, old, new):
+                    alerts.append({'rule_id': rule['id'], 'ticker': ticker, 'field': field,
+                                   'kind': rule['kind'], 'value': rule['value'],
+                                   'old': old, 'new': new, 'version': version, 'fired_at': fired_at,
+                                   'message': describe(rule, ticker, old, new)})
+    return alerts
+
+
+def _recover_unsaved_alerts(alerts_path, offset):
+    """상태를 저장하기 전에 중단된 평가가 offset 뒤에 남긴 알림의 {(규칙, 종목, 버전)}과 마지막 seq
+
+    기록 도중 끊긴 마지막 줄은 잘라내 다음 알림이 그 줄에 이어 붙지 않도록 함
+    """
+    keys, last_seq = set(), 0
+    if not os.path.exists(alerts_path):
+        return keys, last_seq
+    with open(alerts_path, 'rb+') as f:
+        f.seek(offset)
+        end = offset
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            end += len(line)
+            try:
+                alert = json.loads(line)
+            except ValueError:
+                continue
+            keys.add((alert['rule_id'], alert['ticker'], alert['version']))
+            last_seq = max(last_seq, alert['seq'])
+        f.truncate(end)
+    return keys, last_seq
+
+
+def evaluate_new_versions(rule_store=None, state_path=ALERT_STATE_FILENAME, alerts_path=ALERTS_FILENAME):
+    """마지막으로 평가한 버전 이후 게시된 버전마다 직전 버전과의 변경분을 평가, 새 알림 목록 반환
+
+    알림 파일에 추가한 뒤 상태를 저장하기 전에 중단되면 다음 평가가 같은 버전을 다시 평가하므로,
+    상태에 기록한 알림 파일 위치(alerts_offset) 뒤의 알림과 (규칙, 종목, 버전)이 같은 알림은 다시 쓰지 않음
+    """
+    rules = list((rule_store or AlertRuleStore()).load().values())
+    state = _load_json(state_path, {'last_version': 0, 'last_seq': 0, 'alerts_offset': 0})
+    if 'alerts_offset' not in state:  # 위치를 기록하기 전의 상태 파일
+        state['alerts_offset'] = os.path.getsize(alerts_path) if os.path.exists(alerts_path) else 0
+    current = snapshot_versions.load_manifest()['current']
+    if current <= state['last_version']:
+        return []
+
+    index = RuleIndex(rules)
+    fired = []
+    for version in range(state['last_version'] + 1, current + 1):
+        old_rows = snapshot_versions.load_version_rows(version - 1) if version > 1 else None
+        new_rows = snapshot_versions.load_version_rows(version)
+        # 첫 버전이거나 보관 기간이 지난 버전은 비교 대상이 없어 건너뜀
+        if old_rows is None or new_rows is None or not index.fields:
+            continue
+        fired.extend(evaluate_diff(old_rows, new_rows, index, version))
+
+    recorded, last_seq = _recover_unsaved_alerts(alerts_path, state['alerts_offset'])
+    state['last_seq'] = max(state['last_seq'], last_seq)
+    fired = [alert for alert in fired if (alert['rule_id'], alert['ticker'], alert['version']) not in recorded]
+    if fired:
+        with open(alerts_path, 'a', encoding='utf-8') as f:
+            for alert in fired:
+                state['last_seq'] += 1
+                alert['seq'] = state['last_seq']
+                f.write(json.dumps(alert, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+    state['alerts_offset'] = os.path.getsize(alerts_path) if os.path.exists(alerts_path) else 0
+    state['last_version'] = current
+    with atomic_open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    return fired
+
+
+def load_alerts(since=0, rule_id=None, ticker=None, limit=500, path=ALERTS_FILENAME):
+    """seq가 since보다 큰 알림 (최신 limit개), 규칙/종목으로 거를 수 있음"""
+    if not os.path.exists(path):
+        return []
+    alerts = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                alert = json.loads(line)
+            except ValueError:
+                continue  # 기록 중 끊긴 마지막 줄
+            if alert['seq'] <= since:
+                continue
+            if rule_id is not None and alert['rule_id'] != rule_id:
+                continue
+            if ticker is not None and alert['ticker'] != ticker:
+                continue
+            alerts.append(alert)
+    return alerts[-limit:]
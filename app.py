@@ -1,7 +1,25 @@
-from flask import Flask, render_template_string, jsonify, request, send_from_directory
-import subprocess
+from flask import Flask, Response, render_template_string, jsonify, request, send_from_directory, abort, stream_with_context
 import os
+import re
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
 from datetime import datetime
+from pipeline import run_update_pipeline
+from atomic_publish import PipelineBusyError
+from crawl_priority import add_page_views
+from snapshot_store import latest_snapshot_date, load_snapshot, load_snapshot_table, snapshot_filename
+import raw_archive
+import generate_web_report
+import snapshot_versions
+import watchlists
+import price_stream
+import serving_bundle
+import alert_rules
+import snapshot_export
+import search_index
+import peer_groups
 
 app = Flask(__name__)
 
@@ -18,31 +36,448 @@ def bull_logo():
 def bnb_image():
     return send_from_directory('.', 'bnb.jpg')
 
+# 미리 압축된 파일 (generate_web_report.py가 생성), 선호 순서대로
+PRECOMPRESSED_VARIANTS = [('br', '.br'), ('gzip', '.gz')]
+
+# 운영 서버(serve.py)에서는 모든 워커가 게시 때 만든 응답 번들을 메모리 매핑으로 공유
+USE_SERVING_BUNDLE = os.environ.get('PEG_SERVING_BUNDLE') == '1'
+shared_bundle = serving_bundle.SharedBundle() if USE_SERVING_BUNDLE else None
+
+def bundled_response(name, mimetype):
+    """번들에 든 응답을 그대로 전송 (압축본 우선), 번들에 없으면 None"""
+    if shared_bundle is None:
+        return None
+    for candidate, suffix in PRECOMPRESSED_VARIANTS:
+        if candidate in request.accept_encodings:
+            body = shared_bundle.get(name + suffix)
+            if body is not None:
+                response = Response(body, mimetype=mimetype)
+                response.headers['Content-Encoding'] = candidate
+                response.vary.add('Accept-Encoding')
+                return response
+    body = shared_bundle.get(name)
+    if body is None:
+        return None
+    response = Response(body, mimetype=mimetype)
+    response.vary.add('Accept-Encoding')
+    return response
+
+# 파일 캐시 (파일이 바뀌었을 때만 다시 읽음)
+_file_cache = {}
+
+def read_cached_file(filename):
+    """(수정 시각, 파일 바이트) 반환, 파일이 바뀐 경우에만 디스크에서 다시 읽음"""
+    mtime = os.path.getmtime(filename)
+    cached = _file_cache.get(filename)
+    if cached is None or cached[0] != mtime:
+        with open(filename, 'rb') as f:
+            cached = (mtime, f.read())
+        _file_cache[filename] = cached
+    return cached
+
+def precompressed_response(filename, mimetype):
+    """클라이언트가 받을 수 있는 미리 압축된 파일을 그대로 전송 (요청마다 압축하지 않음)"""
+    mtime, body = read_cached_file(filename)
+    encoding = None
+    for candidate, suffix in PRECOMPRESSED_VARIANTS:
+        variant = filename + suffix
+        if candidate in request.accept_encodings and os.path.exists(variant):
+            variant_mtime, variant_body = read_cached_file(variant)
+            if variant_mtime >= mtime:  # 원본보다 오래된 압축본은 사용하지 않음
+                body, encoding = variant_body, candidate
+                break
+    response = Response(body, mimetype=mimetype)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
 # PWA 필수 파일 서빙
 @app.route('/manifest.json')
 def manifest():
-    response = send_from_directory('.', 'manifest.json')
-    response.headers['Content-Type'] = 'application/manifest+json'
+    response = precompressed_response('manifest.json', 'application/manifest+json')
     response.headers['Cache-Control'] = 'max-age=0, no-cache, no-store, must-revalidate'
     return response
 
 @app.route('/sw.js')
 def service_worker():
-    response = send_from_directory('.', 'sw.js')
-    response.headers['Content-Type'] = 'application/javascript'
+    response = precompressed_response('sw.js', 'application/javascript')
     response.headers['Cache-Control'] = 'max-age=0, no-cache, no-store, must-revalidate'
     response.headers['Service-Worker-Allowed'] = '/'
     return response
 
-# HTML 템플릿을 읽어오는 함수
-def read_html_template():
-    with open('index.html', 'r', encoding='utf-8') as f:
-        return f.read()
+def prewarm_cache():
+    """갱신 직후 페이지와 압축본을 캐시에 미리 채움"""
+    for filename in ['index.html'] + ['index.html' + suffix for _, suffix in PRECOMPRESSED_VARIANTS]:
+        if os.path.exists(filename):
+            read_cached_file(filename)
 
 @app.route('/')
 def index():
-    html_content = read_html_template()
-    return html_content
+    return bundled_response('index.html', 'text/html') or precompressed_response('index.html', 'text/html')
+
+# 날짜별 PEG 분석 리포트
+@app.route('/nasdaq100_real_peg_analysis_<date>.html')
+def peg_report(date):
+    filename = generate_web_report.report_filename(date)
+    if not re.fullmatch(r'\d{4}-\d{2}-\d{2}', date):
+        abort(404)
+    if os.path.exists(filename):
+        return precompressed_response(filename, 'text/html')
+    # 생성된 리포트 파일이 없으면 스냅샷에서 바로 렌더링해 스트리밍
+    df = load_snapshot(date)
+    if df is None or df.empty:
+        abort(404)
+    return Response(stream_with_context(generate_web_report.render_report(df, date)),
+                    mimetype='text/html')
+
+# 최신 스냅샷 캐시 (Arrow 파일을 메모리 매핑으로 열어 프로세스 간 페이지 공유)
+_snapshot_cache = {'key': None, 'rows': None}
+
+def current_snapshot_rows():
+    """최신 스냅샷의 행 목록, 파일이 바뀐 경우에만 다시 매핑"""
+    date = latest_snapshot_date()
+    if date is None:
+        return None, []
+    arrow_filename = snapshot_filename(date, 'arrow')
+    key = (date, os.path.getmtime(arrow_filename) if os.path.exists(arrow_filename) else None)
+    if _snapshot_cache['key'] != key:
+        table = load_snapshot_table(date)
+        _snapshot_cache['rows'] = table.to_pylist() if table is not None else []
+        _snapshot_cache['key'] = key
+    return date, _snapshot_cache['rows']
+
+@app.route('/api/snapshot')
+def api_snapshot():
+    bundled = bundled_response('api/snapshot', 'application/json')
+    if bundled is not None:
+        return bundled
+    date, rows = current_snapshot_rows()
+    if date is None:
+        return jsonify({'success': False, 'message': '스냅샷이 없습니다.'}), 404
+    return jsonify({'success': True, 'date': date, 'rows': rows})
+
+@lru_cache(maxsize=64)
+def cached_changes(since, manifest_mtime):
+    """버전별 변경분 응답 캐시 (새 버전이 게시되면 manifest 수정 시각이 바뀌어 키도 바뀜)"""
+    return snapshot_versions.changes_since(since)
+
+@app.route('/api/changes')
+def api_changes():
+    since = request.args.get('since', type=int)
+    if not since:
+        # 처음 받는 클라이언트의 전체 응답은 게시 때 만들어 둔 번들에서 바로 전송
+        bundled = bundled_response('api/changes', 'application/json')
+        if bundled is not None:
+            bundled.headers['Cache-Control'] = 'no-cache'
+            return bundled
+    if not os.path.exists(snapshot_versions.VERSIONS_FILENAME):
+        return jsonify({'success': False, 'message': '게시된 버전이 없습니다.'}), 404
+    payload = cached_changes(since, os.path.getmtime(snapshot_versions.VERSIONS_FILENAME))
+    if payload is None:
+        return jsonify({'success': False, 'message': '게시된 버전이 없습니다.'}), 404
+    response = jsonify({'success': True, **payload})
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# 최신 게시 버전의 행 (모든 관심 목록 화면이 공유), 새 버전이 게시되면 다시 로드
+_version_cache = {'key': None, 'version': None, 'rows': None}
+
+def current_version_rows():
+    """(최신 게시 버전, {티커: 행}), 게시된 버전이 없으면 (None, None)"""
+    if not os.path.exists(snapshot_versions.VERSIONS_FILENAME):
+        return None, None
+    key = os.path.getmtime(snapshot_versions.VERSIONS_FILENAME)
+    if _version_cache['key'] != key:
+        version = snapshot_versions.load_manifest()['current']
+        if version != _version_cache['version']:
+            _version_cache['rows'] = snapshot_versions.load_version_rows(version)
+            _version_cache['version'] = version
+            # 이전 버전으로 계산한 관심 목록 화면은 더 이상 쓰지 않음
+            _watchlist_views.clear()
+        _version_cache['key'] = key
+    return _version_cache['version'], _version_cache['rows']
+
+# (관심 목록 조건, 스냅샷 버전)별 화면 캐시, 같은 조건의 사용자들은 한 번만 계산
+MAX_WATCHLIST_VIEWS = 4096
+_watchlist_views = {}
+
+def watchlist_response(watchlist):
+    version, rows = current_version_rows()
+    if version is None:
+        return jsonify({'success': False, 'message': '게시된 버전이 없습니다.'}), 404
+    cache_key = (watchlists.watchlist_key(watchlist), version)
+    view = _watchlist_views.get(cache_key)
+    if view is None:
+        if len(_watchlist_views) >= MAX_WATCHLIST_VIEWS:
+            _watchlist_views.clear()
+        view = _watchlist_views[cache_key] = watchlists.compute_view(rows, watchlist)
+    return jsonify({'success': True, 'version': version, 'watchlist': watchlist, 'rows': view})
+
+_watchlist_store = watchlists.WatchlistStore()
+
+@app.route('/api/watchlist')
+def api_watchlist_adhoc():
+    """저장하지 않은 관심 목록 (?tickers=AAPL,MSFT&sort=peg&desc=1&max_peg=1.5)"""
+    try:
+        watchlist = watchlists.normalize_watchlist(request.args.to_dict())
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return watchlist_response(watchlist)
+
+@app.route('/api/watchlists', methods=['POST'])
+@app.route('/api/watchlists/<watchlist_id>', methods=['PUT'])
+def api_watchlist_save(watchlist_id=None):
+    if watchlist_id is not None and _watchlist_store.get(watchlist_id) is None:
+        return jsonify({'success': False, 'message': '관심 목록이 없습니다.'}), 404
+    try:
+        watchlist = watchlists.normalize_watchlist(request.get_json(silent=True) or {})
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    watchlist_id = _watchlist_store.save(watchlist, watchlist_id)
+    return jsonify({'success': True, 'id': watchlist_id, 'watchlist': watchlist})
+
+@app.route('/api/watchlists/<watchlist_id>', methods=['GET'])
+def api_watchlist(watchlist_id):
+    watchlist = _watchlist_store.get(watchlist_id)
+    if watchlist is None:
+        return jsonify({'success': False, 'message': '관심 목록이 없습니다.'}), 404
+    return watchlist_response(watchlist)
+
+@app.route('/api/watchlists/<watchlist_id>', methods=['DELETE'])
+def api_watchlist_delete(watchlist_id):
+    if not _watchlist_store.delete(watchlist_id):
+        return jsonify({'success': False, 'message': '관심 목록이 없습니다.'}), 404
+    return jsonify({'success': True})
+
+# 실시간 가격: 서버 전체에 폴러 하나, 클라이언트는 SSE로 바뀐 가격만 받음
+price_broadcaster = price_stream.PriceBroadcaster()
+# 워커당 동시 SSE 연결 상한 (SSE 연결은 스레드를 계속 차지하므로, 넘는 클라이언트는 폴링으로 받음)
+MAX_PRICE_STREAMS = int(os.environ.get('PEG_MAX_PRICE_STREAMS', '100'))
+_price_poller_lock = threading.Lock()
+_price_poller = None
+
+def ensure_price_poller():
+    """첫 구독 때 가격 폴러 스레드를 한 번만 시작
+
+    여러 워커로 실행 중이면(serve.py) 잠금을 얻은 워커 하나만 조회하고,
+    모든 워커가 이벤트 파일을 따라 읽어 자기 클라이언트에 전달
+    """
+    global _price_poller
+    with _price_poller_lock:
+        if _price_poller is not None:
+            return
+        interval = float(os.environ.get('PEG_PRICE_POLL_SECONDS', price_stream.DEFAULT_POLL_SECONDS))
+        if USE_SERVING_BUNDLE:
+            feed = price_stream.SharedPriceFeed(price_broadcaster)
+            threading.Thread(target=feed.follow, daemon=True).start()
+            # 다른 워커의 클라이언트도 수요 파일로 알 수 있어, 어느 워커에도 클라이언트가 없으면 조회 중단
+            _price_poller = price_stream.PricePoller(feed.publish, current_version_rows,
+                                                     has_clients=feed.has_demand,
+                                                     lease=price_stream.poller_lease(interval),
+                                                     interval=interval)
+        else:
+            _price_poller = price_stream.PricePoller(price_broadcaster.publish, current_version_rows,
+                                                     has_clients=price_broadcaster.has_clients,
+                                                     interval=interval)
+        threading.Thread(target=_price_poller.run_forever, daemon=True).start()
+
+@app.route('/api/prices/stream')
+def api_price_stream():
+    ensure_price_poller()
+    subscription = price_broadcaster.try_subscribe(MAX_PRICE_STREAMS)
+    if subscription is None:
+        # 워커 스레드가 모두 SSE에 묶이지 않도록 거절, 클라이언트는 /api/prices 폴링으로 전환
+        return jsonify({'success': False, 'message': '실시간 연결이 많아 폴링으로 전환합니다.',
+                        'poll': '/api/prices'}), 503
+    return Response(price_broadcaster.events(subscription), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/prices')
+def api_prices():
+    """SSE 대신 폴링하는 클라이언트용 최근 가격 이벤트 (?since=<seq>)
+
+    since가 없으면(처음 폴링) 지난 이벤트를 다시 보내지 않고 현재 seq만 알려줌
+    """
+    ensure_price_poller()
+    since = request.args.get('since', type=int)
+    if since is None:
+        since = price_broadcaster.current_seq()
+    events = price_broadcaster.events_since(since)
+    response = jsonify({'success': True, 'events': events,
+                        'seq': events[-1]['seq'] if events else since})
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# 알림 규칙 등록/조회 (평가는 게시할 때 파이프라인에서 변경분에 대해서만 실행)
+_alert_rule_store = alert_rules.AlertRuleStore()
+
+@app.route('/api/alerts/rules', methods=['GET'])
+def api_alert_rules():
+    return jsonify({'success': True, 'rules': list(_alert_rule_store.load().values())})
+
+@app.route('/api/alerts/rules', methods=['POST'])
+def api_alert_rule_add():
+    try:
+        rule = alert_rules.normalize_rule(request.get_json(silent=True) or {})
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return jsonify({'success': True, 'rule': _alert_rule_store.add(rule)})
+
+@app.route('/api/alerts/rules/<rule_id>', methods=['DELETE'])
+def api_alert_rule_delete(rule_id):
+    if not _alert_rule_store.delete(rule_id):
+        return jsonify({'success': False, 'message': '규칙이 없습니다.'}), 404
+    return jsonify({'success': True})
+
+@app.route('/api/alerts')
+def api_alerts():
+    """발생한 알림 (?since=<seq>&rule=<id>&ticker=<티커>)"""
+    alerts = alert_rules.load_alerts(since=request.args.get('since', 0, type=int),
+                                     rule_id=request.args.get('rule'),
+                                     ticker=(request.args.get('ticker') or '').upper() or None)
+    return jsonify({'success': True, 'alerts': alerts,
+                    'last_seq': alerts[-1]['seq'] if alerts else request.args.get('since', 0, type=int)})
+
+@app.route('/api/export')
+def api_export():
+    """스냅샷 내보내기 (?format=csv|jsonl|xlsx&universe=AAPL,MSFT&columns=ticker,peg&start=...&end=...)
+
+    행을 조각 단위로 만들어 바로 전송 (Content-Length 없이 chunked 전송)
+    """
+    try:
+        spec = snapshot_export.normalize_export(request.args.to_dict())
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except LookupError as e:
+        return jsonify({'success': False, 'message': str(e)}), 404
+    mimetype = snapshot_export.FORMATS[spec['format']][0]
+    response = Response(stream_with_context(snapshot_export.stream_export(spec)), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{snapshot_export.export_filename(spec)}"'
+    response.headers['Cache-Control'] = 'no-cache'
+    # 프록시가 전체 응답을 모았다가 보내지 않도록
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+# 종목 검색 (파이프라인이 만든 인덱스 파일을 시작할 때 읽고, 파일이 바뀌면 다시 읽음)
+_search_index = search_index.SearchIndex()
+
+@app.route('/api/search')
+def api_search():
+    """티커/회사명/산업군 검색 (?q=appl&limit=10)"""
+    query = request.args.get('q', '')
+    limit = min(max(request.args.get('limit', search_index.DEFAULT_LIMIT, type=int), 1), search_index.MAX_LIMIT)
+    if not _search_index.reload():
+        return jsonify({'success': False, 'message': '검색 인덱스가 없습니다.'}), 404
+    return jsonify({'success': True, 'query': query, 'results': _search_index.search(query, limit)})
+
+# 최신 유사 종목 캐시 (새 날짜 파일이 생기거나 파일이 바뀌면 다시 로드)
+_peers_cache = {'key': None, 'payload': None}
+
+def current_peers():
+    dates = peer_groups.available_peer_dates()
+    if not dates:
+        return None
+    filename = peer_groups.peers_filename(dates[-1])
+    key = (filename, os.path.getmtime(filename))
+    if _peers_cache['key'] != key:
+        _peers_cache['payload'] = peer_groups.load_peers(dates[-1])
+        _peers_cache['key'] = key
+    return _peers_cache['payload']
+
+@app.route('/api/peers/<ticker>')
+def api_peers(ticker):
+    """밸류에이션 유사 종목 (?cheaper=1 이면 PEG가 더 낮은 종목만, ?limit=5)"""
+    payload = current_peers()
+    if payload is None:
+        return jsonify({'success': False, 'message': '유사 종목 데이터가 없습니다.'}), 404
+    result = peer_groups.peer_response(payload, ticker.upper(), cheaper=request.args.get('cheaper') == '1',
+                                       limit=request.args.get('limit', type=int))
+    if result is None:
+        return jsonify({'success': False, 'message': f'{ticker.upper()} 종목의 유사 종목이 없습니다.'}), 404
+    return jsonify({'success': True, **result})
+
+class ArchiveIndex:
+    """원본 아카이브 하나와 그 오프셋 인덱스 (캐시 키는 날짜/크기/수정 시각, 인덱스는 키와 항상 짝)"""
+
+    __slots__ = ('key', 'offsets')
+
+    def __init__(self, key, offsets):
+        self.key = key
+        self.offsets = offsets
+
+    @property
+    def date(self):
+        return self.key[0]
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __eq__(self, other):
+        return isinstance(other, ArchiveIndex) and other.key == self.key
+
+# 원본 아카이브 오프셋 인덱스 캐시 (아카이브가 교체되면 새 객체로 바꿔 끼움)
+_archive_index_cache = {'archive': None}
+
+def current_archive_index():
+    """최신 원본 아카이브의 ArchiveIndex, 아카이브가 없으면 None"""
+    dates = raw_archive.available_archive_dates()
+    if not dates:
+        return None
+    date = dates[-1]
+    stat = os.stat(raw_archive.unified_filename(date))
+    key = (date, stat.st_size, stat.st_mtime_ns)
+    archive = _archive_index_cache['archive']
+    if archive is None or archive.key != key:
+        archive = ArchiveIndex(key, raw_archive.load_index(date))
+        _archive_index_cache['archive'] = archive
+    return archive
+
+@lru_cache(maxsize=256)
+def cached_ticker_record(archive, symbol):
+    """자주 조회되는 종목의 원본 데이터 LRU 캐시 (아카이브가 바뀌면 키도 바뀜)
+
+    읽는 사이에 아카이브가 교체되면 ArchiveChangedError (어긋난 위치를 읽어 캐시하지 않음)
+    """
+    size, mtime_ns = archive.key[1:]
+    return raw_archive.read_ticker_record(archive.date, symbol, index=archive.offsets,
+                                          archive_stat={'size': size, 'mtime_ns': mtime_ns})
+
+# 종목 조회수 (크롤링 우선순위 page_views용), 메모리에 모았다가 주기적으로 파일에 누적
+PAGE_VIEW_FLUSH_SECONDS = 60
+_page_views = Counter()
+_page_views_lock = threading.Lock()
+_page_views_flushed_at = time.monotonic()
+
+def record_page_view(symbol):
+    global _page_views_flushed_at
+    with _page_views_lock:
+        _page_views[symbol] += 1
+        if time.monotonic() - _page_views_flushed_at < PAGE_VIEW_FLUSH_SECONDS:
+            return
+        counts = dict(_page_views)
+        _page_views.clear()
+        _page_views_flushed_at = time.monotonic()
+        add_page_views(counts)
+
+@app.route('/api/ticker/<symbol>')
+def api_ticker(symbol):
+    symbol = symbol.upper()
+    # 확인과 읽기 사이에 새 아카이브가 게시되면 새 인덱스로 한 번 더 시도
+    for attempt in range(2):
+        archive = current_archive_index()
+        if archive is None:
+            return jsonify({'success': False, 'message': '원본 데이터가 없습니다.'}), 404
+        if symbol not in archive.offsets:
+            return jsonify({'success': False, 'message': f'{symbol} 종목 정보가 없습니다.'}), 404
+        try:
+            info = cached_ticker_record(archive, symbol)
+            break
+        except raw_archive.ArchiveChangedError:
+            if attempt:
+                return jsonify({'success': False, 'message': '원본 데이터가 갱신 중입니다. 잠시 후 다시 시도해주세요.'}), 503
+    record_page_view(symbol)
+    return jsonify({'success': True, 'date': archive.date, 'ticker': symbol, 'info': info})
 
 @app.route('/update', methods=['POST'])
 def update_data():
@@ -56,35 +491,23 @@ def update_data():
     
     try:
         print(f"[{datetime.now()}] 데이터 업데이트 시작...")
-        
-        # 1. 데이터 크롤링 실행
-        print("1단계: 데이터 크롤링 중...")
-        result1 = subprocess.run(['python', 'crawl_pe_peg_batch.py'], 
-                               capture_output=True, text=True, cwd=os.getcwd())
-        
-        if result1.returncode != 0:
-            return jsonify({
-                'success': False, 
-                'message': f'크롤링 오류: {result1.stderr}'
-            })
-        
-        # 2. 웹 리포트 생성
-        print("2단계: 웹 리포트 생성 중...")
-        result2 = subprocess.run(['python', 'generate_web_report.py'], 
-                               capture_output=True, text=True, cwd=os.getcwd())
-        
-        if result2.returncode != 0:
-            return jsonify({
-                'success': False, 
-                'message': f'리포트 생성 오류: {result2.stderr}'
-            })
-        
-        print(f"[{datetime.now()}] 업데이트 완료!")
+        # ?profile=1 이면 크롤링/리포트 단계를 --profile로 실행 (profiles/에 타이밍 보고서 저장)
+        profile = request.args.get('profile') == '1'
+        success, message = run_update_pipeline(profile=profile)
+        if success:
+            prewarm_cache()
+            print(f"[{datetime.now()}] 업데이트 완료!")
         return jsonify({
-            'success': True, 
-            'message': '데이터가 성공적으로 업데이트되었습니다! 페이지를 새로고침해주세요.'
+            'success': success, 
+            'message': message
         })
         
+    except PipelineBusyError as e:
+        return jsonify({
+            'success': False, 
+            'message': str(e)
+        }), 409
+        
     except Exception as e:
         return jsonify({
             'success': False, 
@@ -95,4 +518,12 @@ if __name__ == '__main__':
     print("🚀 나스닥 PEG 분석 서버 시작...")
     print("📱 브라우저에서 http://localhost:5000 접속하세요")
     print("📱 모바일에서는 http://14.33.80.107:5000 접속하세요")
+
+    # PEG_SCHEDULER=1 이면 장 시간 기반 자동 갱신 스케줄러를 함께 실행
+    # (디버그 리로더의 감시 프로세스에서는 실행하지 않음)
+    if os.environ.get('PEG_SCHEDULER') == '1' and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        from market_scheduler import RefreshScheduler
+        scheduler = RefreshScheduler(prewarm=prewarm_cache)
+        threading.Thread(target=scheduler.run_forever, daemon=True).start()
+        print(f"🗓️ 자동 갱신 스케줄러 실행 중 (다음 실행: {scheduler.next_run_time():%Y-%m-%d %H:%M %Z})")
     app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
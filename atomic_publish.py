@@ -0,0 +1,226 @@
+# 생성 파일의 원자적 게시와 파이프라인 단일 실행 보장
+# 모든 결과물은 임시 파일에 쓴 뒤 os.replace로 교체해, 읽는 쪽은 항상 완성된 파일만 보게 됨
+# 파이프라인 실행은 만료 시간이 있는 잠금 파일(lease)로 한 번에 하나만 게시
+
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: 개발 서버는 단일 프로세스라 스레드 잠금만으로 충분
+    fcntl = None
+
+LEASE_FILENAME = '.pipeline.lock'
+DEFAULT_LEASE_TTL = 30 * 60  # 30분 동안 갱신이 없으면 중단된 실행으로 간주
+
+
+def _replace(src, dst, attempts=5):
+    """임시 파일을 대상 경로로 교체 (Windows에서 다른 프로세스가 읽는 중이면 잠시 후 재시도)"""
+    for attempt in range(attempts):
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.1 * (attempt + 1))
+
+
+@contextmanager
+def atomic_path(path):
+    """같은 디렉터리의 임시 경로를 넘겨주고, 블록이 정상 종료되면 대상 경로로 교체"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.chmod(tmp_path, 0o644)
+        _replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def atomic_open(path, mode='w', encoding=None, newline=None):
+    """open()과 같은 방식으로 쓰되, 끝까지 쓰고 디스크에 반영된 뒤에만 대상 파일을 교체"""
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, mode, encoding=encoding, newline=newline) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+
+
+@contextmanager
+def file_lock(path, shared=False):
+    """path 옆의 .lock 파일로 프로세스 간 잠금 (읽기는 shared, 읽고-고쳐-쓰기는 배타 잠금)
+
+    여러 워커 프로세스가 같은 JSON 파일을 고칠 때 서로의 변경을 덮어쓰지 않도록 사용
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(f'{path}.lock', 'a') as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+# 잠금을 보유한 실행이 자식 프로세스에 넘겨주는 토큰 (자식은 같은 잠금을 다시 잡지 않고 이어받음)
+LEASE_TOKEN_ENV = 'PIPELINE_LEASE_TOKEN'
+
+
+class PipelineBusyError(RuntimeError):
+    """다른 파이프라인 실행이 이미 잠금을 보유 중"""
+
+
+class PipelineLease:
+    """만료 시간이 있는 파일 잠금: 프로세스/스레드를 가리지 않고 한 실행만 게시하도록 보장"""
+
+    def __init__(self, path=LEASE_FILENAME, ttl=DEFAULT_LEASE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.token = None
+        self.inherited = False
+        self._stop = threading.Event()
+        self._heartbeat = None
+
+    def _write_temp(self):
+        """잠금 내용을 같은 디렉터리의 임시 파일에 완전히 쓴 뒤 그 경로 반환"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(self.path)}.', suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'token': self.token, 'pid': os.getpid(),
+                       'expires_at': time.time() + self.ttl}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        return tmp_path
+
+    def _create(self):
+        """내용이 다 쓰인 잠금 파일을 원자적으로 생성 (이미 있으면 FileExistsError)
+
+        임시 파일을 하드 링크로 잠금 경로에 연결하므로, 다른 프로세스가 빈 잠금 파일을 보는 순간이 없음
+        """
+        tmp_path = self._write_temp()
+        try:
+            os.link(tmp_path, self.path)
+        finally:
+            os.remove(tmp_path)
+
+    def _renew(self):
+        """만료 시간 연장 (임시 파일에 쓴 뒤 교체)"""
+        tmp_path = self._write_temp()
+        try:
+            _replace(tmp_path, self.path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _expires_at(self, path):
+        """잠금 파일의 만료 시각, 내용을 읽을 수 없으면 파일 수정 시각 + ttl (파일이 없으면 None)"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return float(json.load(f)['expires_at'])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            try:
+                return os.path.getmtime(path) + self.ttl
+            except OSError:
+                return None
+
+    def _break_if_expired(self):
+        """만료된 잠금(비정상 종료된 실행)을 치움"""
+        expires_at = self._expires_at(self.path)
+        if expires_at is None or expires_at > time.time():
+            return
+        # 다른 프로세스와 동시에 치우지 않도록 고유 이름으로 옮긴 뒤 삭제
+        stale = f'{self.path}.{uuid.uuid4().hex}.stale'
+        try:
+            os.replace(self.path, stale)
+        except OSError:
+            return
+        try:
+            # 확인과 이동 사이에 다른 실행이 새 잠금을 만들었다면 되돌려 놓음
+            restore = self._expires_at(stale)
+            if restore is not None and restore > time.time():
+                try:
+                    os.link(stale, self.path)
+                except OSError:
+                    pass
+        finally:
+            os.remove(stale)
+
+    def child_env(self):
+        """자식 프로세스가 이 잠금을 이어받도록 토큰을 넣은 환경 변수"""
+        return dict(os.environ, **{LEASE_TOKEN_ENV: self.token})
+
+    def acquire(self):
+        """잠금 획득 시도, 성공하면 True (보유 중에는 자동으로 만료 시간 연장)
+
+        부모 프로세스가 child_env()로 넘긴 토큰이 현재 잠금과 같으면 새로 잡지 않고 이어받음
+        (만료 시간 연장과 해제는 부모가 담당)
+        """
+        inherited = os.environ.get(LEASE_TOKEN_ENV)
+        holder = self._read() if inherited else None
+        if holder is not None and holder.get('token') == inherited:
+            self.token, self.inherited = inherited, True
+            return True
+        self.token = uuid.uuid4().hex
+        for _ in range(2):
+            try:
+                self._create()
+                break
+            except FileExistsError:
+                self._break_if_expired()
+        else:
+            self.token = None
+            return False
+        self._stop.clear()
+        self._heartbeat = threading.Thread(target=self._renew_loop, daemon=True)
+        self._heartbeat.start()
+        return True
+
+    def _renew_loop(self):
+        while not self._stop.wait(self.ttl / 3):
+            holder = self._read()
+            if holder is None or holder.get('token') != self.token:
+                return
+            self._renew()
+
+    def release(self):
+        """보유 중인 잠금만 해제 (이어받은 잠금은 부모가 해제)"""
+        if self.inherited:
+            self.token, self.inherited = None, False
+            return
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+        holder = self._read()
+        if holder is not None and holder.get('token') == self.token:
+            os.remove(self.path)
+        self.token = None
+
+    def __enter__(self):
+        if not self.acquire():
+            raise PipelineBusyError('이미 다른 업데이트가 진행 중입니다.')
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
@@ -0,0 +1,191 @@
+# 원본 아카이브로 파생 데이터 재계산 (backfill)
+# 저장된 nasdaq100_real_unified_{date}.json마다 지표 스냅샷(CSV/Arrow/Parquet)과 유사 종목을 다시 계산
+# (그 날짜 PEG 분석 리포트가 이미 있으면 새 스냅샷으로 다시 생성)
+# 날짜별로 프로세스 풀에서 병렬 실행하고 네트워크는 사용하지 않음
+# 크롤링/가격 갱신과 같은 PipelineLease를 잡고 실행해 게시가 겹치지 않음
+# 원본 파일과 계산 코드가 지난 실행과 같으면 건너뜀 (nasdaq100_backfill_state.json)
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from atomic_publish import PipelineBusyError, PipelineLease, atomic_open
+from generate_web_report import report_filename, write_precompressed, write_report
+from pipeline import LEASE_PATH
+import raw_archive
+from peer_groups import update_peers
+from snapshot_store import load_snapshot, snapshot_filename, write_snapshot, write_snapshot_csv
+from valuation_metrics import compute_metrics, load_raw_snapshot
+
+BACKFILL_STATE_FILENAME = 'nasdaq100_backfill_state.json'
+
+# 파생 데이터 계산 코드 (이 파일들과 리포트 템플릿이 바뀌면 모든 날짜를 다시 계산)
+DERIVATION_SOURCES = ['valuation_metrics.py', 'snapshot_store.py', 'peer_groups.py', 'backfill.py',
+                      'generate_web_report.py', 'report_templates.py']
+DERIVATION_TEMPLATES = os.path.join('templates', '*')
+
+
+def _file_digest(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def code_version():
+    """파생 데이터 계산 코드의 해시"""
+    base = os.path.dirname(os.path.abspath(__file__))
+    templates = sorted(glob.glob(os.path.join(base, DERIVATION_TEMPLATES)))
+    return _file_digest([os.path.join(base, name) for name in DERIVATION_SOURCES] + templates)
+
+
+def input_version(date):
+    """원본 아카이브 내용의 해시"""
+    return _file_digest([raw_archive.unified_filename(date)])
+
+
+def load_state(path=BACKFILL_STATE_FILENAME):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(state, path=BACKFILL_STATE_FILENAME):
+    with atomic_open(path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+
+
+def rebuild_date(date):
+    """한 날짜의 원본으로 지표 스냅샷과 유사 종목을 다시 계산해 저장 (작업 프로세스에서 실행)
+
+    원본에 없는 종목 중 기존 스냅샷에서 Stale로 유지되던 행은 그대로 두고,
+    갱신시각은 기존 스냅샷 값을 이어받음 (원본에는 수집 시각이 없음)
+    그 날짜 리포트 파일이 있으면 예전 값이 남지 않도록 새 스냅샷으로 다시 생성
+    반환: {date, rows, report, input_bytes, seconds}
+    """
+    started = time.perf_counter()
+    json_filename = raw_archive.unified_filename(date)
+    results = compute_metrics(load_raw_snapshot(json_filename), date)
+
+    existing = load_snapshot(date)
+    fetched_at = {}
+    if existing is not None and '갱신시각' in existing.columns:
+        fetched_at = dict(zip(existing['티커'], existing['갱신시각']))
+    results['갱신시각'] = results['티커'].map(fetched_at).fillna(date)
+    results['Stale'] = False
+    if existing is not None and 'Stale' in existing.columns:
+        stale = existing['Stale'].fillna(False).astype(bool)
+        kept = existing[stale & ~existing['티커'].isin(results['티커'])]
+        if not kept.empty:
+            kept = kept.reindex(columns=results.columns)
+            results = pd.concat([results.astype(object), kept.astype(object)], ignore_index=True)
+    results = results.sort_values('티커', kind='stable').reset_index(drop=True)
+
+    write_snapshot_csv(results, snapshot_filename(date, 'csv'))
+    write_snapshot(results, date)
+    update_peers(date)
+
+    html_filename = report_filename(date)
+    report = os.path.exists(html_filename)
+    if report:
+        write_report(load_snapshot(date), date, html_filename)
+        write_precompressed(html_filename)
+    return {'date': date, 'rows': len(results), 'report': report,
+            'input_bytes': os.path.getsize(json_filename), 'seconds': time.perf_counter() - started}
+
+
+def plan_dates(dates, state, code, force=False):
+    """다시 계산할 (날짜, 원본 해시) 목록과 건너뛸 날짜 목록"""
+    todo, skipped = [], []
+    for date in dates:
+        version = input_version(date)
+        previous = state.get(date)
+        if not force and previous and previous['input'] == version and previous['code'] == code:
+            skipped.append(date)
+        else:
+            todo.append((date, version))
+    return todo, skipped
+
+
+def run_backfill(dates, jobs=None, force=False, state_path=BACKFILL_STATE_FILENAME, lease_path=LEASE_PATH):
+    """날짜별 재계산을 프로세스 풀로 실행하고 날짜별 처리량 출력, 실패한 날짜 목록 반환
+
+    다른 파이프라인 실행이 진행 중이면 PipelineBusyError 발생
+    """
+    with PipelineLease(path=lease_path):
+        return _run_backfill(dates, jobs, force, state_path)
+
+
+def _run_backfill(dates, jobs, force, state_path):
+    state = load_state(state_path)
+    code = code_version()
+    todo, skipped = plan_dates(dates, state, code, force)
+    if skipped:
+        print(f"⏭️ 원본과 코드가 그대로인 {len(skipped)}개 날짜 건너뜀")
+    if not todo:
+        print("✅ 다시 계산할 날짜가 없습니다.")
+        return []
+
+    print(f"🔁 {len(todo)}개 날짜 재계산 (프로세스 {jobs or os.cpu_count()}개)")
+    started = time.perf_counter()
+    failed = []
+    total_rows = 0
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(rebuild_date, date): (date, version) for date, version in todo}
+        for future in as_completed(futures):
+            date, version = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failed.append(date)
+                print(f"  ❌ {date}: {e}")
+                continue
+            total_rows += result['rows']
+            seconds = max(result['seconds'], 1e-9)
+            print(f"  ✅ {date}: {result['rows']}행{', 리포트 재생성' if result['report'] else ''}, "
+                  f"{result['seconds']:.2f}초 ({result['rows'] / seconds:,.0f}행/초, "
+                  f"{result['input_bytes'] / seconds / 1e6:.1f}MB/초)")
+            # 날짜마다 바로 기록해 중간에 멈춰도 끝난 날짜는 다음 실행에서 건너뜀
+            state[date] = {'input': version, 'code': code, 'rows': result['rows'],
+                           'finished_at': datetime.now(timezone.utc).isoformat(timespec='seconds')}
+            save_state(state, state_path)
+
+    elapsed = time.perf_counter() - started
+    done = len(todo) - len(failed)
+    print(f"📊 {done}개 날짜, {total_rows}행 재계산 ({elapsed:.2f}초, {done / elapsed:.2f}날짜/초)")
+    if failed:
+        print(f"⚠️ 실패한 날짜: {', '.join(sorted(failed))}")
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="저장된 원본 아카이브로 지표 스냅샷/유사 종목을 다시 계산 (네트워크 사용 안 함)")
+    parser.add_argument('dates', nargs='*', help='YYYY-MM-DD (기본: 모든 아카이브 날짜)')
+    parser.add_argument('--start', help='이 날짜부터')
+    parser.add_argument('--end', help='이 날짜까지')
+    parser.add_argument('--jobs', type=int, help='작업 프로세스 수 (기본: CPU 수)')
+    parser.add_argument('--force', action='store_true', help='원본/코드가 그대로인 날짜도 다시 계산')
+    args = parser.parse_args()
+
+    available = raw_archive.available_archive_dates()
+    missing = sorted(set(args.dates) - set(available))
+    if missing:
+        parser.error(f"원본 아카이브가 없는 날짜: {', '.join(missing)}")
+    dates = [date for date in (args.dates or available)
+             if (args.start is None or date >= args.start) and (args.end is None or date <= args.end)]
+    try:
+        failed = run_backfill(sorted(set(dates)), jobs=args.jobs, force=args.force)
+    except PipelineBusyError as e:
+        print(f"⏳ {e}")
+        raise SystemExit(1)
+    raise SystemExit(1 if failed else 0)
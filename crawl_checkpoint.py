@@ -0,0 +1,100 @@
+# 크롤링 체크포인트 (JSON Lines)
+# 종목 하나가 끝날 때마다 결과를 한 줄씩 추가 기록해, 중단되어도 이어서 실행 가능
+
+import json
+import os
+from datetime import datetime, timezone
+
+# 재시도 없이 건너뛸 수 있는 상태 (실패한 종목은 --resume 시 다시 시도)
+COMPLETED_STATUSES = ('ok',)
+
+
+def checkpoint_filename(run_date):
+    """실행 날짜별 체크포인트 파일 이름"""
+    return f"nasdaq100_checkpoint_{run_date}.jsonl"
+
+
+class CrawlCheckpoint:
+    """종목별 크롤링 결과를 추가 전용으로 기록하고 스트리밍으로 다시 읽는 저장소"""
+
+    def __init__(self, run_date, resume=False):
+        self.path = checkpoint_filename(run_date)
+        if not resume and os.path.exists(self.path):
+            os.remove(self.path)
+        if resume and os.path.exists(self.path):
+            self._truncate_partial_line()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _truncate_partial_line(self, block_size=65536):
+        """강제 종료로 잘린 마지막 줄을 잘라냄 (다음 기록이 그 줄에 이어 붙지 않도록)"""
+        with open(self.path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(position - block_size, 0)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b'\n')
+                if newline != -1:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position != end:
+                f.truncate(position)
+
+    def append(self, ticker, status, info=None):
+        """종목 결과 한 건(상태, 수집 시각, 원본 info)을 기록하고 즉시 디스크에 반영"""
+        record = {"ticker": ticker, "status": status,
+                  "fetched_at": datetime.now(timezone.utc).isoformat(timespec='seconds'), "info": info}
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _iter_raw(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f):
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError:
+                    # 강제 종료로 잘린 마지막 줄은 무시
+                    continue
+
+    def completed_tickers(self):
+        """이미 처리가 끝난 종목 집합"""
+        return {record['ticker'] for _, record in self._iter_raw()
+                if record.get('status') in COMPLETED_STATUSES}
+
+    def iter_records(self):
+        """종목별 최종 기록만 순서대로 스트리밍 (재시도된 종목은 마지막 기록 사용)"""
+        last_line = {}
+        for line_number, record in self._iter_raw():
+            last_line[record['ticker']] = line_number
+        keep = set(last_line.values())
+        for line_number, record in self._iter_raw():
+            if line_number in keep:
+                yield record
+
+    def read_from(self, offset):
+        """offset(바이트) 뒤에 새로 기록된 완전한 줄만 읽어 (기록 목록, 다음 offset) 반환
+
+        중간 게시처럼 같은 실행 중에 여러 번 읽을 때 이미 읽은 부분을 다시 파싱하지 않도록 사용
+        """
+        records = []
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # 아직 기록 중인 줄은 다음 번에
+                offset += len(line)
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return records, offset
+
+    def close(self):
+        self._file.close()
+
+    def discard(self):
+        """최종 파일 생성이 끝난 체크포인트 삭제"""
+        self.close()
+        os.remove(self.path)
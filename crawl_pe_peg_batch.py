@@ -1,17 +1,24 @@
 import yfinance as yf
 import pandas as pd
-import json
+import argparse
 from datetime import datetime
-import ssl
-import certifi
 import os
 import time
 from nasdaq100_tickers import NASDAQ_100_TICKERS
-
-# SSL 인증서 문제 해결을 위한 설정
-import urllib3
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-ssl._create_default_https_context = ssl._create_unverified_context
+from yf_session import get_yf_session, close_yf_session, DEFAULT_TIMEOUT as TRANSPORT_TIMEOUT
+from crawl_checkpoint import CrawlCheckpoint
+from valuation_metrics import raw_frame, compute_metrics, RAW_TEXT_FIELDS, RAW_NUMERIC_FIELDS
+from snapshot_store import (write_snapshot, write_snapshot_csv, snapshot_filename,
+                            latest_snapshot_date, load_snapshot)
+import generate_web_report
+from negative_cache import NegativeCache, UNRESOLVABLE_REASONS, REASON_EMPTY_INFO, REASON_NOT_FOUND
+from crawl_priority import order_tickers, PRIORITY_STRATEGIES, DEFAULT_PRIORITY
+from run_profiler import profiler
+from fetch_hedging import HedgedFetcher, DEFAULT_REQUEST_TIMEOUT
+from raw_archive import write_unified_archive, unified_filename, index_filename
+from peer_groups import update_peers
+from atomic_publish import PipelineBusyError, PipelineLease
+from pipeline import LEASE_PATH
 
 # 현재 날짜 가져오기
 current_date = datetime.now().strftime("%Y-%m-%d")
@@ -21,176 +28,419 @@ BATCH_SIZE = 5
 DELAY_BETWEEN_TICKERS = 2  # 각 종목 간 2초 대기
 DELAY_BETWEEN_BATCHES = 5  # 배치 간 5초 대기
 
-print(f"🎯 나스닥 100 실제 데이터 크롤링 시작")
-print(f"📊 총 종목 수: {len(NASDAQ_100_TICKERS)}개")
-print(f"🔄 배치 크기: {BATCH_SIZE}개씩")
-print(f"⏱️  종목 간 대기: {DELAY_BETWEEN_TICKERS}초")
-print(f"🔄 배치 간 대기: {DELAY_BETWEEN_BATCHES}초")
-print("=" * 60)
-
-# 결과를 저장할 리스트와 딕셔너리
-results_list = []
-all_stock_data = {}
-
-# 통계
-total_tickers = len(NASDAQ_100_TICKERS)
-successful_count = 0
-failed_count = 0
-current_ticker_index = 0
-
-# 배치별로 처리
-for batch_start in range(0, total_tickers, BATCH_SIZE):
-    batch_end = min(batch_start + BATCH_SIZE, total_tickers)
-    batch_tickers = NASDAQ_100_TICKERS[batch_start:batch_end]
-    batch_number = (batch_start // BATCH_SIZE) + 1
-    total_batches = (total_tickers + BATCH_SIZE - 1) // BATCH_SIZE
-    
-    print(f"\n🔄 배치 {batch_number}/{total_batches} 처리 중...")
-    print(f"📋 종목: {', '.join(batch_tickers)}")
-    
-    for ticker in batch_tickers:
-        current_ticker_index += 1
+# 모든 종목 요청이 공유하는 HTTP 세션 (TLS 연결과 쿠키/crumb 재사용)
+YF_SESSION = get_yf_session(pool_size=BATCH_SIZE)
+
+
+def request_info(ticker):
+    """종목 정보 요청 한 번 (요청마다 새 Ticker 객체라 헤지 요청도 캐시 없이 따로 전송)"""
+    return yf.Ticker(ticker, session=YF_SESSION).info
+
+
+def is_not_found_error(error):
+    """Yahoo가 종목 자체를 찾지 못했다는 응답인지 (재시도해도 소용없는 오류)"""
+    message = str(error).lower()
+    return '404' in message or 'not found' in message or 'delisted' in message
+
+
+def fetch_ticker_info(ticker, attempts=3, deadline=None, fetcher=None):
+    """yfinance로 종목 정보를 요청 (최대 attempts번 재시도), (info, 실패 사유) 반환
+
+    성공하면 실패 사유는 None, 실패하면 info는 빈 딕셔너리
+    fetcher(HedgedFetcher)가 있으면 요청마다 타임아웃/헤징을 적용하고,
+    deadline(time.monotonic 기준)을 넘기면 더 기다리지 않음
+    """
+    info_data = {}
+    reason = None
+    for attempt in range(attempts):
         try:
-            print(f"\n[{current_ticker_index}/{total_tickers}] {ticker} 실제 데이터 수집 중...")
-            
-            # yfinance를 사용하여 실제 주식 정보 가져오기
-            data = yf.Ticker(ticker)
-            
-            # 실제 데이터 요청 (재시도 로직 포함)
-            info_data = {}
-            for attempt in range(3):  # 최대 3번 시도
+            print(f"  📡 {ticker} 실제 데이터 요청 중... (시도 {attempt + 1}/{attempts})")
+            info_data = fetcher.fetch(ticker, deadline) if fetcher is not None else request_info(ticker)
+            if info_data and info_data.get('quoteType') == 'NONE':
+                # 상장폐지/티커 변경 종목은 시세 유형이 NONE인 빈 껍데기 정보만 돌아옴
+                print(f"  🚫 {ticker} 시세 정보가 없는 종목 (quoteType: NONE)")
+                return {}, REASON_NOT_FOUND
+            if info_data and len(info_data) > 5:  # 최소한의 데이터가 있는지 확인
+                print(f"  ✅ {ticker} 실제 데이터 수신 성공!")
+                return info_data, None
+            else:
+                print(f"  ⚠️ {ticker} 데이터 부족, 재시도...")
+                reason = REASON_EMPTY_INFO
+                profiler.sleep(1)
+        except Exception as e:
+            print(f"  ❌ {ticker} 데이터 요청 실패 (시도 {attempt + 1}): {e}")
+            if is_not_found_error(e):
+                # 존재하지 않는 종목은 재시도하지 않음
+                return {}, REASON_NOT_FOUND
+            reason = f'error: {e}'
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            if attempt < attempts - 1:  # 마지막 시도가 아니면 대기
+                profiler.sleep(2)
+    return {}, reason
+
+
+def print_ticker_summary(ticker, info_data):
+    """수신한 종목 정보 요약 출력 (지표 계산은 valuation_metrics 단계에서 일괄 처리)"""
+    print(f"  📊 {ticker} 실제 정보:")
+    print(f"    종목명: {info_data.get('longName', info_data.get('shortName', 'N/A'))}")
+    print(f"    현재가: ${info_data.get('currentPrice')}")
+    print(f"    P/E: {info_data.get('trailingPE')}")
+
+
+def pause(seconds, deadline=None):
+    """대기하되 마감 시각(time.monotonic 기준)을 넘기지 않음"""
+    if deadline is not None:
+        seconds = min(seconds, max(deadline - time.monotonic(), 0))
+    profiler.sleep(seconds)
+
+
+def crawl(tickers, checkpoint, on_batch_complete=None, negative_cache=None, deadline=None, fetcher=None):
+    """배치 단위로 종목을 크롤링하며 결과를 체크포인트에 즉시 기록, 마감으로 남은 종목 목록 반환
+
+    on_batch_complete가 있으면 배치가 끝날 때마다 호출 (중간 게시용)
+    negative_cache가 있으면 해석 불가 종목을 기록하고, 재확인 종목은 한 번만 시도
+    deadline(time.monotonic 기준)을 지나면 다음 종목을 시작하지 않고 멈춤
+    fetcher(HedgedFetcher)는 종목 요청의 타임아웃/헤징에 사용
+    """
+    total_tickers = len(tickers)
+    current_ticker_index = 0
+
+    # 배치별로 처리
+    for batch_start in range(0, total_tickers, BATCH_SIZE):
+        batch_end = min(batch_start + BATCH_SIZE, total_tickers)
+        batch_tickers = tickers[batch_start:batch_end]
+        batch_number = (batch_start // BATCH_SIZE) + 1
+        total_batches = (total_tickers + BATCH_SIZE - 1) // BATCH_SIZE
+
+        print(f"\n🔄 배치 {batch_number}/{total_batches} 처리 중...")
+        print(f"📋 종목: {', '.join(batch_tickers)}")
+
+        for ticker in batch_tickers:
+            if deadline is not None and time.monotonic() >= deadline:
+                remaining = tickers[current_ticker_index:]
+                print(f"\n⏰ 크롤링 마감 시간 도달: {len(remaining)}개 종목은 이전 값 유지")
+                return remaining
+            current_ticker_index += 1
+            with profiler.ticker(ticker):
                 try:
-                    print(f"  📡 {ticker} 실제 데이터 요청 중... (시도 {attempt + 1}/3)")
-                    info_data = data.info
-                    if info_data and len(info_data) > 5:  # 최소한의 데이터가 있는지 확인
-                        print(f"  ✅ {ticker} 실제 데이터 수신 성공!")
-                        break
+                    print(f"\n[{current_ticker_index}/{total_tickers}] {ticker} 실제 데이터 수집 중...")
+
+                    # yfinance를 사용하여 실제 주식 정보 가져오기 (재시도 로직 포함)
+                    reprobe = negative_cache is not None and negative_cache.is_reprobe(ticker)
+                    with profiler.stage('fetch'):
+                        info_data, reason = fetch_ticker_info(ticker, attempts=1 if reprobe else 3,
+                                                              deadline=deadline, fetcher=fetcher)
+
+                    # 실제 데이터가 있는 경우 처리
+                    if reason is None:
+                        print_ticker_summary(ticker, info_data)
+                        with profiler.stage('checkpoint'):
+                            checkpoint.append(ticker, 'ok', info=info_data)
+                        if negative_cache is not None:
+                            negative_cache.record_success(ticker)
+                        print(f"  ✅ {ticker} 실제 데이터 저장 완료")
                     else:
-                        print(f"  ⚠️ {ticker} 데이터 부족, 재시도...")
-                        time.sleep(1)
+                        checkpoint.append(ticker, 'failed')
+                        if negative_cache is not None and reason in UNRESOLVABLE_REASONS:
+                            negative_cache.record_failure(ticker, reason)
+                            print(f"  🚫 {ticker} 해석 불가 종목으로 기록 ({reason})")
+                        print(f"  ❌ {ticker} 실제 데이터 수집 실패")
+
+                    # 종목 간 대기 (API 안정성)
+                    if current_ticker_index < total_tickers:
+                        print(f"  ⏱️  {DELAY_BETWEEN_TICKERS}초 대기...")
+                        pause(DELAY_BETWEEN_TICKERS, deadline)
+
                 except Exception as e:
-                    print(f"  ❌ {ticker} 데이터 요청 실패 (시도 {attempt + 1}): {e}")
-                    if attempt < 2:  # 마지막 시도가 아니면 대기
-                        time.sleep(2)
-            
-            # 실제 데이터가 있는 경우 처리
-            if info_data and len(info_data) > 5:
-                # 통계 딕셔너리에 실제 데이터 저장
-                all_stock_data[ticker] = info_data
-                
-                # 필요한 실제 정보 추출
-                company_name = info_data.get('longName', info_data.get('shortName', 'N/A'))
-                sector = info_data.get('sector', 'N/A')
-                industry = info_data.get('industry', 'N/A')
-                current_price = info_data.get('currentPrice', None)
-                trailing_pe = info_data.get('trailingPE', None)
-                forward_pe = info_data.get('forwardPE', None)
-                
-                # 실제 PEG 비율 다중 소스 확인
-                peg_ratio = info_data.get('trailingPegRatio', None)
-                if peg_ratio is None:
-                    peg_ratio = info_data.get('pegRatio', None)
-                if peg_ratio is None:
-                    peg_ratio = info_data.get('forwardPegRatio', None)
-                if peg_ratio is None and trailing_pe is not None:
-                    earnings_growth = info_data.get('earningsGrowth', None)
-                    if earnings_growth is not None and earnings_growth > 0:
-                        peg_ratio = trailing_pe / (earnings_growth * 100)
-                
-                # 산업군 정보 조합
-                industry_info = f"{sector}"
-                if industry != 'N/A' and industry != sector:
-                    industry_info += f" - {industry}"
-                
-                # 실제 데이터 정보 출력
-                print(f"  📊 {ticker} 실제 정보:")
-                print(f"    종목명: {company_name}")
-                print(f"    현재가: ${current_price}")
-                print(f"    P/E: {trailing_pe}")
-                print(f"    PEG: {peg_ratio}")
-                
-                # 유효한 실제 데이터만 저장
-                if current_price is not None or trailing_pe is not None or peg_ratio is not None:
-                    results_list.append({
-                        "날짜": current_date,
-                        "종목명": company_name,
-                        "티커": ticker,
-                        "산업군": industry_info,
-                        "현재가격": current_price,
-                        "Trailing P/E": trailing_pe,
-                        "Forward P/E": forward_pe,
-                        "PEG Ratio": peg_ratio
-                    })
-                    successful_count += 1
-                    print(f"  ✅ {ticker} 실제 데이터 저장 완료")
-                else:
-                    print(f"  ⚠️ {ticker} 유효한 재무 데이터 없음")
+                    checkpoint.append(ticker, 'failed')
+                    print(f"  ❌ {ticker} 처리 오류: {e}")
+                    pause(3, deadline)  # 오류 시 더 긴 대기
+
+        # 배치 완료 후 대기
+        if batch_end < total_tickers:
+            if on_batch_complete is not None:
+                with profiler.stage('partial_publish'):
+                    on_batch_complete()
+            print(f"\n🔄 배치 {batch_number} 완료. {DELAY_BETWEEN_BATCHES}초 대기 후 다음 배치...")
+            pause(DELAY_BETWEEN_BATCHES, deadline)
+    return []
+
+
+def compute_metrics_from_checkpoint(checkpoint):
+    """체크포인트의 원본 데이터를 스트리밍으로 읽어 지표 DataFrame 계산 (행별 갱신 시각 포함)"""
+    fetched_at = {}
+
+    def records():
+        for record in checkpoint.iter_records():
+            if record['info'] is not None:
+                fetched_at[record['ticker']] = record.get('fetched_at')
+                yield record['ticker'], record['info']
+
+    return metrics_frame(records(), fetched_at)
+
+
+def metrics_frame(records, fetched_at):
+    """(티커, info) 이터러블로 게시용 지표 DataFrame 계산 (갱신시각은 fetched_at에서)"""
+    results = compute_metrics(raw_frame(records), current_date)
+    results['갱신시각'] = results['티커'].map(fetched_at)
+    results['Stale'] = False
+    # 크롤링 순서(우선순위, 이어받기)와 무관하게 항상 같은 순서로 게시
+    return results.sort_values('티커', kind='stable').reset_index(drop=True)
+
+
+def load_previous_snapshot():
+    """중간 게시 때 아직 갱신되지 않은 종목을 채울 직전 스냅샷, 없으면 None"""
+    date = latest_snapshot_date()
+    if date is None:
+        return None
+    previous = load_snapshot(date)
+    if '갱신시각' not in previous.columns:
+        previous['갱신시각'] = date
+    return previous
+
+
+def merge_with_previous(fresh, previous):
+    """새로 수집한 행을 우선하고, 나머지 종목은 직전 스냅샷 값을 유지 (Stale=True로 표시)"""
+    if previous is None or previous.empty:
+        return fresh
+    kept = previous[~previous['티커'].isin(fresh['티커'])].reindex(columns=fresh.columns)
+    kept['Stale'] = True
+    merged = pd.concat([fresh.astype(object), kept.astype(object)], ignore_index=True)
+    return merged.sort_values('티커', kind='stable').reset_index(drop=True)
+
+
+def publish_snapshot(results, final=False):
+    """스냅샷 파일과 index.html을 게시 (중간 게시는 직전 스냅샷과 병합된 데이터)"""
+    csv_filename = snapshot_filename(current_date, 'csv')
+    with profiler.stage('csv'):
+        try:
+            write_snapshot_csv(results, csv_filename)
+        except PermissionError:
+            if not final:
+                raise
+            import random
+            csv_filename = f"nasdaq100_real_data_{current_date}_{random.randint(1000,9999)}.csv"
+            write_snapshot_csv(results, csv_filename)
+    with profiler.stage('arrow'):
+        snapshot_files = write_snapshot(results, current_date)
+    with profiler.stage('index_html'):
+        generate_web_report.update_index_html(results, current_date)
+    return csv_filename, snapshot_files
+
+
+def make_partial_publisher(checkpoint, previous):
+    """배치마다 지금까지 수집한 행을 직전 스냅샷 위에 덮어 게시하는 콜백 생성
+
+    체크포인트는 지난 게시 이후 새로 기록된 줄만 읽고, 지표 계산에 필요한 원본 필드만 모아 둠
+    (섹터 중앙값처럼 전체 종목에 걸친 지표가 있어 계산은 모아 둔 원본 전체에 대해 다시 실행)
+    """
+    raw_rows = {}   # 티커 -> 지표 계산용 원본 필드 (재시도된 종목은 마지막 기록)
+    fetched_at = {}
+    position = 0
+
+    def read_new_records():
+        nonlocal position
+        records, position = checkpoint.read_from(position)
+        for record in records:
+            ticker, info = record['ticker'], record['info']
+            if info is None:
+                raw_rows.pop(ticker, None)
+                fetched_at.pop(ticker, None)
             else:
-                print(f"  ❌ {ticker} 실제 데이터 수집 실패")
-                failed_count += 1
-            
-            # 종목 간 대기 (API 안정성)
-            if current_ticker_index < total_tickers:
-                print(f"  ⏱️  {DELAY_BETWEEN_TICKERS}초 대기...")
-                time.sleep(DELAY_BETWEEN_TICKERS)
-            
+                raw_rows[ticker] = {field: info.get(field) for field in RAW_TEXT_FIELDS + RAW_NUMERIC_FIELDS}
+                fetched_at[ticker] = record.get('fetched_at')
+
+    def publish_partial():
+        try:
+            read_new_records()
+            fresh = metrics_frame(raw_rows.items(), fetched_at)
+            if fresh.empty:
+                # 아직 성공한 종목이 없음 (rate limit 등): 직전 스냅샷을 그대로 둠
+                return
+            publish_snapshot(merge_with_previous(fresh, previous))
+            print(f"\n📤 중간 게시 완료: 새로 수집 {len(fresh)}개 종목 반영")
         except Exception as e:
-            failed_count += 1
-            print(f"  ❌ {ticker} 처리 오류: {e}")
-            time.sleep(3)  # 오류 시 더 긴 대기
-    
-    # 배치 완료 후 대기
-    if batch_end < total_tickers:
-        print(f"\n🔄 배치 {batch_number} 완료. {DELAY_BETWEEN_BATCHES}초 대기 후 다음 배치...")
-        time.sleep(DELAY_BETWEEN_BATCHES)
-
-# 최종 실제 데이터 결과 요약
-print(f"\n" + "=" * 60)
-print(f"🎉 실제 데이터 크롤링 완료!")
-print(f"✅ 성공: {successful_count}개 종목")
-print(f"❌ 실패: {failed_count}개 종목")
-print(f"📊 총 처리: {total_tickers}개 종목")
-print(f"🎯 성공률: {(successful_count/total_tickers)*100:.1f}%")
-print("=" * 60)
-
-# 실제 데이터 DataFrame 생성
-if results_list:
-    results = pd.DataFrame(results_list)
-    print(f"\n📊 수집된 실제 데이터: {len(results)}개 종목")
-else:
-    results = pd.DataFrame()
-    print("\n❌ 수집된 실제 데이터가 없습니다.")
-
-# 실제 데이터가 있는 경우 CSV 파일로 저장
-if not results.empty:
-    csv_filename = f"nasdaq100_real_data_{current_date}.csv"
+            print(f"\n⚠️ 중간 게시 실패 (크롤링은 계속): {e}")
+    return publish_partial
+
+
+def main():
+    parser = argparse.ArgumentParser(description="나스닥 100 PE/PEG 실제 데이터 크롤링")
+    parser.add_argument('--resume', action='store_true',
+                        help='오늘 체크포인트에 이미 기록된 종목은 건너뛰고 이어서 크롤링')
+    parser.add_argument('--no-progressive', action='store_true',
+                        help='배치마다 중간 결과를 게시하지 않고 마지막에 한 번만 게시')
+    parser.add_argument('--ignore-negative-cache', action='store_true',
+                        help='해석 불가로 기록된 종목도 모두 다시 요청')
+    parser.add_argument('--priority', choices=PRIORITY_STRATEGIES, default=DEFAULT_PRIORITY,
+                        help=f'크롤링 순서 (기본: {DEFAULT_PRIORITY})')
+    parser.add_argument('--deadline', type=float,
+                        help='크롤링 시간 예산(초), 넘기면 남은 종목은 이전 값을 유지하고 종료')
+    parser.add_argument('--request-timeout', type=float, default=DEFAULT_REQUEST_TIMEOUT,
+                        help=f'종목 요청 하나의 최대 대기 시간(초, 기본: {DEFAULT_REQUEST_TIMEOUT})')
+    parser.add_argument('--hedge', action='store_true',
+                        help='요청이 관찰된 p95 지연을 넘기면 같은 요청을 한 번 더 보내 먼저 온 응답 사용')
+    parser.add_argument('--profile', action='store_true',
+                        help='단계별/종목별 시간을 기록해 profiles/에 JSON 보고서 저장')
+    parser.add_argument('--cprofile', action='store_true',
+                        help='--profile과 함께 cProfile 통계(.prof)도 저장')
+    args = parser.parse_args()
+
+    # 직접 실행(수동/cron)도 /update, 스케줄러와 같은 잠금을 잡아 게시가 겹치지 않도록
+    # (파이프라인이 실행한 경우에는 부모가 보유한 잠금을 이어받음)
     try:
-        results.to_csv(csv_filename, index=False, encoding='utf-8-sig')
-        print(f"\n📄 실제 데이터가 '{csv_filename}' 파일에 저장되었습니다.")
-    except PermissionError:
-        import random
-        csv_filename = f"nasdaq100_real_data_{current_date}_{random.randint(1000,9999)}.csv"
-        results.to_csv(csv_filename, index=False, encoding='utf-8-sig')
+        with PipelineLease(path=LEASE_PATH):
+            run_crawl(args)
+    except PipelineBusyError as e:
+        print(f"⏳ {e}")
+        raise SystemExit(1)
+
+
+def run_crawl(args):
+    """크롤링부터 최종 게시까지 실행 (PipelineLease를 보유한 상태에서 호출)"""
+    if args.profile or args.cprofile:
+        profiler.enable('crawl', cprofile=args.cprofile)
+
+    print(f"🎯 나스닥 100 실제 데이터 크롤링 시작")
+    print(f"📊 총 종목 수: {len(NASDAQ_100_TICKERS)}개")
+    print(f"🔄 배치 크기: {BATCH_SIZE}개씩")
+    print(f"⏱️  종목 간 대기: {DELAY_BETWEEN_TICKERS}초")
+    print(f"🔄 배치 간 대기: {DELAY_BETWEEN_BATCHES}초")
+    print("=" * 60)
+
+    checkpoint = CrawlCheckpoint(current_date, resume=args.resume)
+    tickers = NASDAQ_100_TICKERS
+    if args.resume:
+        done = checkpoint.completed_tickers()
+        tickers = [ticker for ticker in NASDAQ_100_TICKERS if ticker not in done]
+        print(f"♻️  체크포인트 '{checkpoint.path}'에서 {len(done)}개 종목 이어받기, {len(tickers)}개 남음")
+
+    # 해석 불가로 기록된 종목은 만료 전까지 건너뜀
+    negative_cache = NegativeCache()
+    if not args.ignore_negative_cache:
+        suppressed = [ticker for ticker in tickers if negative_cache.is_suppressed(ticker)]
+        if suppressed:
+            tickers = [ticker for ticker in tickers if ticker not in suppressed]
+            print(f"🚫 해석 불가 종목 {len(suppressed)}개 건너뜀: {', '.join(suppressed)}")
+
+    # 중요한 종목부터 크롤링 (마감으로 끊겨도 대형주가 먼저 갱신되도록)
+    tickers = order_tickers(tickers, args.priority)
+    print(f"📌 크롤링 순서: {args.priority} 우선 ({', '.join(tickers[:5])}{' ...' if len(tickers) > 5 else ''})")
+
+    deadline = None
+    if args.deadline is not None:
+        deadline = time.monotonic() + args.deadline
+        print(f"⏰ 크롤링 시간 예산: {args.deadline:.0f}초")
+
+    # 배치마다 지금까지의 결과를 직전 스냅샷과 병합해 게시
+    with profiler.stage('load_previous'):
+        previous = load_previous_snapshot()
+    on_batch_complete = None
+    if not args.no_progressive:
+        on_batch_complete = make_partial_publisher(checkpoint, previous)
+
+    # 종목은 한 번에 하나씩 요청 (응답 없는 요청이 전송 계층 타임아웃까지 붙잡는 스레드만큼 여유를 둠)
+    fetcher = HedgedFetcher(request_info, timeout=args.request_timeout, hedge=args.hedge,
+                            concurrency=1, transport_timeout=TRANSPORT_TIMEOUT)
+    try:
+        with profiler.stage('crawl'):
+            remaining = crawl(tickers, checkpoint, on_batch_complete, negative_cache, deadline, fetcher)
+    finally:
+        fetcher.shutdown()
+
+    # 지표 계산 (원본 데이터 전체를 컬럼 단위로 한 번에)
+    with profiler.stage('metrics'):
+        results = compute_metrics_from_checkpoint(checkpoint)
+    fresh_count = len(results)
+    if remaining:
+        # 마감으로 수집하지 못한 종목은 직전 스냅샷 값을 유지하고 Stale로 표시
+        results = merge_with_previous(results, previous)
+
+    # 통계 (이어받은 종목 포함)
+    total_tickers = len(NASDAQ_100_TICKERS)
+    successful_count = fresh_count
+    failed_count = sum(1 for record in checkpoint.iter_records() if record['status'] == 'failed')
+
+    # 최종 실제 데이터 결과 요약
+    print(f"\n" + "=" * 60)
+    print(f"🎉 실제 데이터 크롤링 완료!")
+    print(f"✅ 성공: {successful_count}개 종목")
+    print(f"❌ 실패: {failed_count}개 종목")
+    print(f"📊 총 처리: {total_tickers}개 종목")
+    print(f"🎯 성공률: {(successful_count/total_tickers)*100:.1f}%")
+    print("=" * 60)
+
+    # 실제 데이터가 있는 경우 최종 게시 (이번 실행에서 수집한 행만, 전체 실행 결과와 동일)
+    if not results.empty:
+        print(f"\n📊 수집된 실제 데이터: {fresh_count}개 종목")
+        if remaining:
+            print(f"⏳ 이전 값 유지(Stale): {len(results) - fresh_count}개 종목")
+        with profiler.stage('publish'):
+            csv_filename, snapshot_files = publish_snapshot(results, final=True)
         print(f"\n📄 실제 데이터가 '{csv_filename}' 파일에 저장되었습니다.")
-    
-    # Top 5 PEG 종목 실제 데이터 표시
-    if 'PEG Ratio' in results.columns:
+
+        # 타입이 지정된 Arrow/Parquet 스냅샷 (메모리 매핑 로딩용)
+        for snapshot_file in snapshot_files:
+            print(f"📦 스냅샷 '{snapshot_file}' 저장 완료")
+
+        # Top 5 PEG 종목 실제 데이터 표시
         peg_column = 'PEG Ratio'
         peg_stocks = results[results[peg_column].notna()].sort_values(by=peg_column)
         if not peg_stocks.empty:
             print(f"\n🏆 실제 PEG 상위 5개 종목:")
             for i, (_, row) in enumerate(peg_stocks.head().iterrows(), 1):
-                print(f"  {i}. {row['종목명']} ({row['티커']}): PEG {row[peg_column]:.3f}")
+                print(f"  {i}. {row['종목명']} ({row['티커']}): PEG {row[peg_column]:.3f} ({row['PEG Source']})")
+    else:
+        print("\n❌ 수집된 실제 데이터가 없습니다.")
+
+    # 티커 목록 정리를 위한 해석 불가 종목 보고
+    negative_cache.print_report()
 
-# 실제 데이터 통합 JSON 파일 저장
-if all_stock_data:
-    unified_json_filename = f"nasdaq100_real_unified_{current_date}.json"
+    # 요청 지연/타임아웃/헤징 보고
+    fetcher.print_report()
+
+    # 실제 데이터 통합 JSON 파일 저장 (체크포인트에서 스트리밍, 종목별 오프셋 인덱스 포함)
+    json_saved = False
+    unified_json_filename = unified_filename(current_date)
     try:
-        with open(unified_json_filename, "w", encoding='utf-8') as f:
-            json.dump(all_stock_data, f, indent=2, ensure_ascii=False)
-        print(f"\n📋 실제 데이터 통합 JSON이 '{unified_json_filename}' 파일에 저장되었습니다.")
-        print(f"   - 실제 데이터 종목수: {len(all_stock_data)}개")
+        records = ((record['ticker'], record['info']) for record in checkpoint.iter_records()
+                   if record['info'] is not None)
+        with profiler.stage('archive'):
+            ticker_count = write_unified_archive(records, current_date)
+        json_saved = True
+        if ticker_count:
+            print(f"\n📋 실제 데이터 통합 JSON이 '{unified_json_filename}' 파일에 저장되었습니다.")
+            print(f"   - 실제 데이터 종목수: {ticker_count}개")
+            print(f"   - 종목별 오프셋 인덱스: '{index_filename(current_date)}'")
+
+            # 저장한 원본으로 밸류에이션 유사 종목 계산
+            try:
+                with profiler.stage('peers'):
+                    peers_file = update_peers(current_date)
+                print(f"👥 유사 종목 '{peers_file}' 저장 완료")
+            except Exception as e:
+                print(f"⚠️ 유사 종목 계산 실패: {e}")
+        else:
+            os.remove(unified_json_filename)
+            os.remove(index_filename(current_date))
     except Exception as e:
         print(f"\n❌ JSON 파일 저장 실패: {e}")
 
-print(f"\n�� 실제 데이터 크롤링 완료!") 
\ No newline at end of file
+    # 최종 파일이 모두 만들어졌으면 체크포인트 정리
+    if json_saved:
+        checkpoint.discard()
+    else:
+        checkpoint.close()
+    close_yf_session()
+
+    profiler.print_summary()
+    report_path = profiler.write_report()
+    if report_path:
+        print(f"📈 프로파일 보고서: '{report_path}'")
+
+    print(f"\n�� 실제 데이터 크롤링 완료!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# 크롤링 우선순위
+# 중요한 종목부터 수집해, 크롤링이 도중에 끊겨도 대형주가 먼저 갱신되도록 정렬
+
+import json
+import os
+
+from atomic_publish import atomic_open, file_lock
+from raw_archive import available_archive_dates, unified_filename
+from valuation_metrics import load_raw_snapshot
+
+INDEX_WEIGHTS_FILENAME = 'nasdaq100_index_weights.json'  # {티커: 지수 비중} (선택)
+PAGE_VIEWS_FILENAME = 'nasdaq100_page_views.json'        # {티커: 조회수} (app.py가 기록)
+
+PRIORITY_STRATEGIES = ['market_cap', 'index_weight', 'page_views', 'alphabetical']
+DEFAULT_PRIORITY = 'market_cap'
+
+
+def _load_json(filename):
+    if not os.path.exists(filename):
+        return {}
+    with open(filename, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def market_cap_scores():
+    """직전 원본 아카이브의 시가총액 {티커: 시가총액}"""
+    dates = available_archive_dates()
+    if not dates:
+        return {}
+    raw = load_raw_snapshot(unified_filename(dates[-1]))
+    raw = raw[raw['marketCap'].notna()]
+    return dict(zip(raw['ticker'], raw['marketCap']))
+
+
+def index_weight_scores():
+    """지수 비중 파일 값, 파일이 없으면 시가총액으로 대체 (나스닥 100은 시가총액 가중)"""
+    return _load_json(INDEX_WEIGHTS_FILENAME) or market_cap_scores()
+
+
+def page_view_scores():
+    """종목 상세 조회수"""
+    return _load_json(PAGE_VIEWS_FILENAME)
+
+
+def add_page_views(counts):
+    """조회수 {티커: 증가분}을 조회수 파일에 누적 (여러 워커 프로세스가 동시에 기록해도 빠지지 않도록 잠금)"""
+    with file_lock(PAGE_VIEWS_FILENAME):
+        totals = _load_json(PAGE_VIEWS_FILENAME)
+        for ticker, count in counts.items():
+            totals[ticker] = totals.get(ticker, 0) + count
+        with atomic_open(PAGE_VIEWS_FILENAME, 'w', encoding='utf-8') as f:
+            json.dump(totals, f, indent=2, sort_keys=True)
+
+
+def priority_scores(strategy):
+    """우선순위 방식별 {티커: 점수} (점수가 클수록 먼저)"""
+    if strategy == 'market_cap':
+        return market_cap_scores()
+    if strategy == 'index_weight':
+        return index_weight_scores()
+    if strategy == 'page_views':
+        return page_view_scores()
+    if strategy == 'alphabetical':
+        return {}
+    raise ValueError(f"알 수 없는 우선순위 방식: {strategy}")
+
+
+def order_tickers(tickers, strategy=DEFAULT_PRIORITY):
+    """점수가 높은 순으로 정렬, 점수가 없는 종목은 뒤에 알파벳 순"""
+    scores = priority_scores(strategy)
+    return sorted(tickers, key=lambda ticker: (-scores.get(ticker, float('-inf')), ticker))
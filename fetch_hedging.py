@@ -0,0 +1,180 @@
+# 요청 타임아웃과 헤징(hedged request)
+# 종목 요청마다 타임아웃(과 전체 실행 마감)을 걸어 멈춘 요청 하나가 크롤링 전체를 붙잡지 않도록 하고,
+# 헤징을 켜면 요청이 지금까지 관찰한 p95 지연을 넘길 때 같은 요청을 한 번 더 보내 먼저 온 응답을 사용
+# (헤지 요청은 전체 요청 수의 일정 비율 안에서만 보내 rate limit 예산을 넘지 않음)
+
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DEFAULT_REQUEST_TIMEOUT = 20   # 종목 요청 하나의 최대 대기 (초)
+HEDGE_QUANTILE = 95            # 이 백분위 지연을 넘기면 헤지 요청
+HEDGE_MIN_SAMPLES = 10         # 백분위를 믿을 수 있을 만큼 모인 뒤에만 헤징
+HEDGE_BUDGET_RATIO = 0.1       # 헤지 요청은 전체 요청의 10%까지
+MAX_WORKERS = 32
+
+
+class FetchTimeout(TimeoutError):
+    """요청 타임아웃 또는 실행 마감까지 응답이 없음"""
+
+
+def percentile(samples, quantile):
+    """nearest-rank 백분위, 샘플이 없으면 None"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(math.ceil(quantile / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+class HedgedFetcher:
+    """fetch(key)를 작업 스레드에서 실행하며 타임아웃/헤징 적용, 지연 통계 수집"""
+
+    def __init__(self, fetch, timeout=DEFAULT_REQUEST_TIMEOUT, hedge=False,
+                 hedge_quantile=HEDGE_QUANTILE, min_samples=HEDGE_MIN_SAMPLES,
+                 budget_ratio=HEDGE_BUDGET_RATIO, concurrency=1, transport_timeout=None,
+                 max_workers=None):
+        self._fetch = fetch
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.min_samples = min_samples
+        self.budget_ratio = budget_ratio
+        if max_workers is None:
+            max_workers = self.pool_size(timeout, concurrency, hedge, transport_timeout)
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fetch')
+        # 작업 스레드 수만큼만 제출 (큐에서 기다리다 타임아웃 뒤에 뒤늦게 전송되는 요청이 없도록)
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.latencies = []          # 실제로 응답을 받기까지 걸린 시간 (헤지 포함)
+        self.primary_latencies = []  # 첫 요청만 보냈다면 걸렸을 시간
+        self._pending_primaries = {}
+
+    @staticmethod
+    def pool_size(timeout, concurrency=1, hedge=False, transport_timeout=None):
+        """작업 스레드 수: 동시 요청 수 x (헤지 포함 요청 수) x 응답 없는 요청이 스레드를 붙잡는 동안 새로 보낼 요청 수
+
+        타임아웃된 요청은 취소할 수 없어 전송 계층 타임아웃(transport_timeout)까지 스레드를 차지함
+        """
+        per_request = 2 if hedge else 1
+        held = math.ceil(transport_timeout / timeout) + 1 if transport_timeout and timeout > 0 else 2
+        return min(max(concurrency * per_request * held, 2), MAX_WORKERS)
+
+    def _submit(self, key, wait_seconds):
+        """빈 작업 스레드가 있을 때만 요청 제출 (wait_seconds까지 기다림), 없으면 None"""
+        if not self._slots.acquire(timeout=max(wait_seconds, 0)):
+            return None
+        try:
+            future = self._executor.submit(self._fetch, key)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def hedge_delay(self):
+        """헤지 요청을 보낼 지연 기준 (샘플이 부족하거나 예산을 다 쓰면 None)"""
+        if not self.hedge or len(self.primary_latencies) < self.min_samples:
+            return None
+        if self.hedges + 1 > self.budget_ratio * self.requests:
+            return None
+        return percentile(self.primary_latencies, self.hedge_quantile)
+
+    def _record_primary(self, future, started):
+        with self._lock:
+            self._pending_primaries.pop(future, None)
+            self.primary_latencies.append(time.perf_counter() - started)
+
+    def fetch(self, key, deadline=None):
+        """key 요청 결과 반환, 타임아웃/마감까지 응답이 없으면 FetchTimeout
+
+        deadline은 time.monotonic 기준 실행 마감 시각
+        """
+        timeout = self.timeout
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+        if timeout <= 0:
+            raise FetchTimeout(f'{key}: 실행 마감 시간이 지났습니다.')
+
+        started = time.perf_counter()
+        primary = self._submit(key, timeout)
+        if primary is None:
+            with self._lock:
+                self.requests += 1
+                self.timeouts += 1
+            raise FetchTimeout(f'{key}: 작업 스레드가 모두 응답 없는 요청에 묶여 있어 {timeout:.1f}초 안에 보내지 못했습니다.')
+        with self._lock:
+            self.requests += 1
+            self._pending_primaries[primary] = started
+        primary.add_done_callback(lambda future: self._record_primary(future, started))
+        futures = {primary}
+
+        delay = self.hedge_delay()
+        if delay is not None and delay < timeout:
+            done, _ = wait(futures, timeout=delay)
+            if not done:
+                hedge = self._submit(key, 0)
+                if hedge is not None:
+                    with self._lock:
+                        self.hedges += 1
+                    futures.add(hedge)
+
+        remaining = timeout - (time.perf_counter() - started)
+        done, _ = wait(futures, timeout=max(remaining, 0), return_when=FIRST_COMPLETED)
+        if not done:
+            # 아직 시작하지 않은 요청은 보내지 않도록 취소 (이미 전송 중인 요청은 전송 계층 타임아웃까지 진행)
+            for future in futures:
+                future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise FetchTimeout(f'{key}: {timeout:.1f}초 안에 응답이 없습니다.')
+
+        # 먼저 끝난 응답 사용 (둘 다 끝났으면 첫 요청 우선), 실패한 쪽만 끝났으면 다른 쪽을 기다림
+        winner = primary if primary in done else done.pop()
+        if winner.exception() is not None and len(futures) > 1:
+            other = (futures - {winner}).pop()
+            remaining = timeout - (time.perf_counter() - started)
+            if wait({other}, timeout=max(remaining, 0)).done and other.exception() is None:
+                winner = other
+        with self._lock:
+            self.latencies.append(time.perf_counter() - started)
+            if winner is not primary:
+                self.hedge_wins += 1
+        return winner.result()
+
+    def stats(self):
+        """요청/타임아웃/헤징 횟수와 지연 백분위 (p99 개선량 포함)"""
+        now = time.perf_counter()
+        with self._lock:
+            # 아직 끝나지 않은 첫 요청은 지금까지 걸린 시간으로 계산
+            primary = self.primary_latencies + [now - started for started in self._pending_primaries.values()]
+            effective = list(self.latencies)
+            stats = {'requests': self.requests, 'timeouts': self.timeouts,
+                     'hedges': self.hedges, 'hedge_wins': self.hedge_wins}
+        for quantile in (50, 95, 99):
+            stats[f'p{quantile}'] = percentile(effective, quantile)
+            stats[f'primary_p{quantile}'] = percentile(primary, quantile)
+        if stats['p99'] is not None and stats['primary_p99'] is not None:
+            stats['p99_saved'] = stats['primary_p99'] - stats['p99']
+        return stats
+
+    def print_report(self):
+        stats = self.stats()
+        if not stats['requests']:
+            return
+        print(f"\n📶 요청 {stats['requests']}건: 타임아웃 {stats['timeouts']}건, "
+              f"헤지 {stats['hedges']}건 ({stats['hedges'] / stats['requests']:.1%}), 헤지 응답 사용 {stats['hedge_wins']}건")
+        if stats['p99'] is not None:
+            print(f"   지연 p50 {stats['p50']:.2f}s / p95 {stats['p95']:.2f}s / p99 {stats['p99']:.2f}s")
+        if self.hedges and stats.get('p99_saved') is not None:
+            print(f"   헤징 없이 p99 {stats['primary_p99']:.2f}s → 헤징으로 {stats['p99_saved']:.2f}s 단축")
+
+    def shutdown(self):
+        """응답 없는 요청은 기다리지 않고 종료"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
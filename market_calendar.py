@@ -0,0 +1,114 @@
+# 미국 주식시장(NYSE/NASDAQ) 거래일 캘린더
+# 휴장일, 조기 폐장일, 정규장 시간을 외부 의존성 없이 계산
+
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+MARKET_TZ = ZoneInfo("America/New_York")
+REGULAR_OPEN = time(9, 30)
+REGULAR_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+
+
+def _nth_weekday(year, month, weekday, n):
+    """해당 월의 n번째 요일 (n=-1이면 마지막 요일)"""
+    if n > 0:
+        first = date(year, month, 1)
+        offset = (weekday - first.weekday()) % 7
+        return first + timedelta(days=offset + 7 * (n - 1))
+    if month == 12:
+        last = date(year, 12, 31)
+    else:
+        last = date(year, month + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year):
+    """그레고리력 부활절 날짜 (익명 알고리즘)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return date(year, month, day)
+
+
+def _observed(holiday):
+    """토요일 휴일은 금요일, 일요일 휴일은 월요일로 대체"""
+    if holiday.weekday() == 5:
+        return holiday - timedelta(days=1)
+    if holiday.weekday() == 6:
+        return holiday + timedelta(days=1)
+    return holiday
+
+
+@lru_cache(maxsize=None)
+def market_holidays(year):
+    """해당 연도의 휴장일 집합"""
+    holidays = set()
+
+    # 신정 (토요일이면 전년도 12/31로 대체하지 않음)
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays.add(_observed(new_year))
+
+    holidays.add(_nth_weekday(year, 1, 0, 3))   # 마틴 루터 킹 데이
+    holidays.add(_nth_weekday(year, 2, 0, 3))   # 대통령의 날
+    holidays.add(_easter(year) - timedelta(days=2))  # 성금요일
+    holidays.add(_nth_weekday(year, 5, 0, -1))  # 메모리얼 데이
+    if year >= 2022:
+        holidays.add(_observed(date(year, 6, 19)))  # 준틴스
+    holidays.add(_observed(date(year, 7, 4)))   # 독립기념일
+    holidays.add(_nth_weekday(year, 9, 0, 1))   # 노동절
+    holidays.add(_nth_weekday(year, 11, 3, 4))  # 추수감사절
+    holidays.add(_observed(date(year, 12, 25)))  # 크리스마스
+    return frozenset(holidays)
+
+
+def is_trading_day(day):
+    """주말과 휴장일을 제외한 거래일 여부"""
+    return day.weekday() < 5 and day not in market_holidays(day.year)
+
+
+@lru_cache(maxsize=None)
+def early_close_days(year):
+    """오후 1시 조기 폐장일 집합 (독립기념일 전날, 추수감사절 다음날, 크리스마스 이브)"""
+    candidates = [
+        date(year, 7, 3),
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1),
+        date(year, 12, 24),
+    ]
+    return frozenset(day for day in candidates if is_trading_day(day))
+
+
+def market_session(day):
+    """거래일이면 (개장, 폐장) 시각을 뉴욕 시간대로 반환, 휴장일이면 None"""
+    if not is_trading_day(day):
+        return None
+    close = EARLY_CLOSE if day in early_close_days(day.year) else REGULAR_CLOSE
+    return (
+        datetime.combine(day, REGULAR_OPEN, tzinfo=MARKET_TZ),
+        datetime.combine(day, close, tzinfo=MARKET_TZ),
+    )
+
+
+def is_market_open(moment):
+    """주어진 시각(타임존 포함)에 정규장이 열려 있는지 여부"""
+    local = moment.astimezone(MARKET_TZ)
+    session = market_session(local.date())
+    return session is not None and session[0] <= local < session[1]
+
+
+def next_trading_day(day):
+    """주어진 날짜 이후의 첫 거래일"""
+    day += timedelta(days=1)
+    while not is_trading_day(day):
+        day += timedelta(days=1)
+    return day
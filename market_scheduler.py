@@ -0,0 +1,145 @@
+# 장 시간 기반 자동 갱신 스케줄러
+# 장중에는 일정 간격으로 가격을 갱신하고, 폐장 후 한 번 전체 재무 데이터를 크롤링
+# 시계(clock)와 대기(sleep) 함수를 주입할 수 있어 가짜 시계로 로컬 테스트 가능
+
+import argparse
+import time
+import urllib.request
+from datetime import datetime, timedelta
+
+import market_calendar
+from market_calendar import MARKET_TZ
+from pipeline import run_price_refresh, run_update_pipeline
+
+DEFAULT_PRICE_INTERVAL_MINUTES = 15     # 장중 가격 갱신 간격
+DEFAULT_FUNDAMENTALS_DELAY_MINUTES = 30  # 폐장 후 재무 크롤링까지 대기
+MAX_SLEEP_SECONDS = 3600                 # 한 번에 최대 대기 시간 (시계 보정용)
+
+
+def system_clock():
+    """현재 시각 (뉴욕 시간대)"""
+    return datetime.now(MARKET_TZ)
+
+
+class FakeClock:
+    """테스트용 가짜 시계: sleep 호출 시 실제로 기다리지 않고 시간만 전진"""
+
+    def __init__(self, start):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+def prewarm_via_http(base_url):
+    """실행 중인 서버의 페이지를 미리 요청해 캐시를 데움"""
+    def prewarm():
+        with urllib.request.urlopen(base_url, timeout=10) as response:
+            response.read()
+    return prewarm
+
+
+class RefreshScheduler:
+    """미국 거래일 캘린더에 맞춰 가격/재무 갱신 작업을 실행"""
+
+    def __init__(self, price_job=run_price_refresh, fundamentals_job=run_update_pipeline,
+                 prewarm=None, clock=system_clock, sleep=time.sleep,
+                 price_interval=timedelta(minutes=DEFAULT_PRICE_INTERVAL_MINUTES),
+                 fundamentals_delay=timedelta(minutes=DEFAULT_FUNDAMENTALS_DELAY_MINUTES)):
+        self.price_job = price_job
+        self.fundamentals_job = fundamentals_job
+        self.prewarm = prewarm
+        self.clock = clock
+        self.sleep = sleep
+        self.price_interval = price_interval
+        self.fundamentals_delay = fundamentals_delay
+        self.last_price_run = None
+        self.last_fundamentals_day = None
+
+    def _fundamentals_time(self, session):
+        return session[1] + self.fundamentals_delay
+
+    def _price_due(self, now):
+        return self.last_price_run is None or now - self.last_price_run >= self.price_interval
+
+    def _run(self, name, job):
+        print(f"[{self.clock():%Y-%m-%d %H:%M %Z}] ⏰ {name} 실행")
+        try:
+            success, message = job()
+            print(f"  {'✅' if success else '❌'} {message}")
+        except Exception as e:
+            print(f"  ❌ {name} 실행 오류: {e}")
+            return
+        if success and self.prewarm is not None:
+            try:
+                self.prewarm()
+            except Exception as e:
+                print(f"  ⚠️ 캐시 예열 실패: {e}")
+
+    def run_pending(self):
+        """지금 실행해야 할 작업을 실행하고, 실행한 작업 이름 목록 반환"""
+        now = self.clock().astimezone(MARKET_TZ)
+        session = market_calendar.market_session(now.date())
+        ran = []
+        if session is None:
+            return ran
+
+        if session[0] <= now < session[1] and self._price_due(now):
+            self.last_price_run = now
+            self._run('가격 갱신', self.price_job)
+            ran.append('price')
+
+        if now >= self._fundamentals_time(session) and self.last_fundamentals_day != now.date():
+            self.last_fundamentals_day = now.date()
+            self._run('재무 데이터 크롤링', self.fundamentals_job)
+            ran.append('fundamentals')
+        return ran
+
+    def next_run_time(self):
+        """다음 작업이 예정된 시각 (휴장일은 건너뜀)"""
+        now = self.clock().astimezone(MARKET_TZ)
+        day = now.date()
+        session = market_calendar.market_session(day)
+        if session is not None:
+            open_time, close_time = session
+            if now < open_time:
+                return open_time
+            if now < close_time:
+                if self.last_price_run is None:
+                    return now
+                return min(self.last_price_run + self.price_interval, close_time)
+            if self.last_fundamentals_day != day:
+                return max(now, self._fundamentals_time(session))
+        return market_calendar.market_session(market_calendar.next_trading_day(day))[0]
+
+    def run_forever(self, max_iterations=None):
+        """다음 예정 시각까지 대기하며 작업을 반복 실행"""
+        iterations = 0
+        while max_iterations is None or iterations < max_iterations:
+            self.run_pending()
+            wait = (self.next_run_time() - self.clock()).total_seconds()
+            self.sleep(min(max(wait, 1), MAX_SLEEP_SECONDS))
+            iterations += 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="장 시간 기반 자동 갱신 스케줄러")
+    parser.add_argument('--price-interval', type=int, default=DEFAULT_PRICE_INTERVAL_MINUTES,
+                        help='장중 가격 갱신 간격 (분)')
+    parser.add_argument('--fundamentals-delay', type=int, default=DEFAULT_FUNDAMENTALS_DELAY_MINUTES,
+                        help='폐장 후 재무 크롤링까지 대기 시간 (분)')
+    parser.add_argument('--prewarm-url', default='http://localhost:5000/',
+                        help='작업 후 캐시 예열을 위해 요청할 서버 주소 (빈 값이면 생략)')
+    args = parser.parse_args()
+
+    scheduler = RefreshScheduler(
+        prewarm=prewarm_via_http(args.prewarm_url) if args.prewarm_url else None,
+        price_interval=timedelta(minutes=args.price_interval),
+        fundamentals_delay=timedelta(minutes=args.fundamentals_delay),
+    )
+    print("🗓️ 장 시간 기반 자동 갱신 스케줄러 시작...")
+    print(f"⏱️  다음 실행 예정: {scheduler.next_run_time():%Y-%m-%d %H:%M %Z}")
+    scheduler.run_forever()
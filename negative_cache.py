@@ -0,0 +1,77 @@
+# 해석 불가 종목 네거티브 캐시
+# 상장폐지/티커 변경 등으로 데이터가 없는 종목을 사유와 만료 시간(TTL)과 함께 기록해
+# 다음 실행부터 건너뛰고, 만료되면 한 번씩 다시 확인 (실패가 반복될수록 간격을 늘림)
+
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+from atomic_publish import atomic_open
+
+NEGATIVE_CACHE_FILENAME = 'nasdaq100_negative_cache.json'
+INITIAL_TTL_DAYS = 7   # 첫 실패 후 재확인까지 기간
+MAX_TTL_DAYS = 60      # 재확인 간격 상한
+
+# 네거티브 캐시에 기록하는 실패 사유 (네트워크 오류 등 일시적인 실패는 기록하지 않음)
+REASON_NOT_FOUND = 'not_found'    # Yahoo가 종목을 찾을 수 없다고 응답
+REASON_EMPTY_INFO = 'empty_info'  # 응답은 왔지만 종목 정보가 비어 있음
+UNRESOLVABLE_REASONS = (REASON_NOT_FOUND, REASON_EMPTY_INFO)
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+class NegativeCache:
+    """{티커: {사유, 실패 횟수, 최초/최근 확인 시각, 만료 시각}}을 파일로 유지"""
+
+    def __init__(self, path=NEGATIVE_CACHE_FILENAME, clock=_now):
+        self.path = path
+        self.clock = clock
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def is_suppressed(self, ticker):
+        """아직 만료되지 않아 이번 실행에서 건너뛸 종목인지 여부"""
+        entry = self.entries.get(ticker)
+        if entry is None:
+            return False
+        return datetime.fromisoformat(entry['expires_at']) > self.clock()
+
+    def is_reprobe(self, ticker):
+        """기록은 있지만 만료되어 다시 확인하는 종목인지 여부"""
+        return ticker in self.entries and not self.is_suppressed(ticker)
+
+    def record_failure(self, ticker, reason):
+        """해석 불가 실패 기록, 반복 실패 시 재확인 간격을 두 배로 (최대 MAX_TTL_DAYS)"""
+        now = self.clock()
+        entry = self.entries.get(ticker, {'first_seen': now.isoformat(timespec='seconds'), 'failures': 0})
+        entry['failures'] += 1
+        ttl_days = min(INITIAL_TTL_DAYS * 2 ** (entry['failures'] - 1), MAX_TTL_DAYS)
+        entry.update({
+            'reason': reason,
+            'last_checked': now.isoformat(timespec='seconds'),
+            'expires_at': (now + timedelta(days=ttl_days)).isoformat(timespec='seconds'),
+        })
+        self.entries[ticker] = entry
+        self.save()
+
+    def record_success(self, ticker):
+        """다시 조회된 종목은 캐시에서 제거"""
+        if self.entries.pop(ticker, None) is not None:
+            self.save()
+
+    def save(self):
+        with atomic_open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, ensure_ascii=False)
+
+    def print_report(self):
+        """유니버스 정리를 위해 해석 불가 종목 목록 출력"""
+        if not self.entries:
+            return
+        print(f"\n🚫 해석 불가 종목 {len(self.entries)}개 (티커 목록 정리 필요):")
+        for ticker, entry in sorted(self.entries.items()):
+            print(f"  - {ticker}: {entry['reason']} (실패 {entry['failures']}회, "
+                  f"다음 확인 {entry['expires_at'][:10]})")
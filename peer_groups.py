@@ -0,0 +1,168 @@
+# 밸류에이션 유사 종목(peer) 그룹
+# 원본 아카이브의 Trailing P/E, Forward P/E, PEG, 이익 성장률, 시가총액, 섹터로 정규화한 특징 벡터를 만들고
+# 종목마다 가장 가까운 k개 종목을 NumPy 행렬 연산으로 한 번에 계산해 스냅샷 날짜별로 저장
+# (거리 행렬은 BLOCK_ROWS행씩 나눠 계산해 종목 수가 수천 개여도 메모리가 블록 크기만큼만 필요)
+
+import argparse
+import glob
+import json
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from atomic_publish import atomic_open
+import raw_archive
+from valuation_metrics import load_raw_snapshot, peg_with_source
+
+DEFAULT_K = 10
+BLOCK_ROWS = 512
+SECTOR_WEIGHT = 3.0   # 다른 섹터 종목은 지표가 비슷해도 이만큼 멀어짐
+MIN_FEATURES = 3      # 숫자 특징이 이보다 적은 종목은 제외
+
+# 특징 이름 -> 변환 (P/E, PEG는 음수/극단값을 잘라내고, 시가총액은 로그)
+NUMERIC_FEATURES = ['trailPE', 'fwdPE', 'peg', 'growth', 'marketCap']
+
+_DATE_PATTERN = re.compile(r'nasdaq100_peers_(\d{4}-\d{2}-\d{2})\.json$')
+
+
+def peers_filename(date):
+    return f"nasdaq100_peers_{date}.json"
+
+
+def available_peer_dates():
+    dates = []
+    for filename in glob.glob("nasdaq100_peers_????-??-??.json"):
+        match = _DATE_PATTERN.search(os.path.basename(filename))
+        if match:
+            dates.append(match.group(1))
+    return sorted(dates)
+
+
+def peer_values(raw):
+    """원본 DataFrame에서 종목별 특징 원값 DataFrame (index: 티커)"""
+    peg, _ = peg_with_source(raw)
+    return pd.DataFrame({
+        'sector': raw['sector'].fillna('N/A').values,
+        'trailPE': raw['trailingPE'].values,
+        'fwdPE': raw['forwardPE'].values,
+        'peg': peg.values,
+        'growth': raw['earningsGrowth'].values,
+        'marketCap': raw['marketCap'].values,
+    }, index=raw['ticker'].values)
+
+
+def feature_matrix(values):
+    """정규화한 특징 행렬 (float32) 반환
+
+    숫자 특징은 1~99 백분위로 자르고 중앙값/IQR로 표준화(빈 값은 중앙값 = 0),
+    섹터는 SECTOR_WEIGHT를 곱한 원-핫 벡터
+    """
+    columns = []
+    for feature in NUMERIC_FEATURES:
+        column = values[feature].astype('float64')
+        if feature in ('trailPE', 'fwdPE', 'peg'):
+            column = column.where(column > 0)
+        elif feature == 'marketCap':
+            column = np.log10(column.where(column > 0))
+        if column.notna().sum() >= 2:
+            low, high = column.quantile([0.01, 0.99])
+            column = column.clip(low, high)
+            q1, median, q3 = column.quantile([0.25, 0.5, 0.75])
+            column = (column - median) / ((q3 - q1) or 1.0)
+        columns.append(column.fillna(0.0).to_numpy())
+    sectors = pd.get_dummies(values['sector']).to_numpy(dtype='float64') * (SECTOR_WEIGHT / np.sqrt(2))
+    return np.column_stack(columns + [sectors]).astype(np.float32)
+
+
+def nearest_neighbours(features, k=DEFAULT_K, block_rows=BLOCK_ROWS):
+    """행마다 자신을 제외한 가장 가까운 k개 행의 (번호, 거리) 배열 반환
+
+    |a-b|² = |a|² + |b|² - 2a·b 를 블록 단위 행렬곱으로 계산하고 argpartition으로 k개만 정렬
+    """
+    count = len(features)
+    k = min(k, count - 1)
+    if k <= 0:
+        return np.empty((count, 0), dtype=np.int64), np.empty((count, 0), dtype=np.float32)
+    norms = np.einsum('ij,ij->i', features, features)
+    indices = np.empty((count, k), dtype=np.int64)
+    distances = np.empty((count, k), dtype=np.float32)
+    for start in range(0, count, block_rows):
+        block = features[start:start + block_rows]
+        squared = norms[start:start + block_rows, None] + norms[None, :] - 2 * block @ features.T
+        np.maximum(squared, 0, out=squared)
+        rows = np.arange(len(block))
+        squared[rows, start + rows] = np.inf  # 자기 자신 제외
+        nearest = np.argpartition(squared, k - 1, axis=1)[:, :k]
+        nearest_squared = np.take_along_axis(squared, nearest, axis=1)
+        order = np.argsort(nearest_squared, axis=1)
+        indices[start:start + len(block)] = np.take_along_axis(nearest, order, axis=1)
+        distances[start:start + len(block)] = np.sqrt(np.take_along_axis(nearest_squared, order, axis=1))
+    return indices, distances
+
+
+def compute_peers(raw, k=DEFAULT_K, block_rows=BLOCK_ROWS):
+    """원본 DataFrame으로 {peers: {티커: [[peer, 거리], ...]}, values: {티커: 특징 원값}} 계산"""
+    values = peer_values(raw)
+    values = values[~values.index.duplicated()]
+    values = values[values[NUMERIC_FEATURES].notna().sum(axis=1) >= MIN_FEATURES]
+    tickers = values.index.tolist()
+    indices, distances = nearest_neighbours(feature_matrix(values), k, block_rows)
+    peers = {ticker: [[tickers[j], round(float(d), 4)] for j, d in zip(indices[i], distances[i])]
+             for i, ticker in enumerate(tickers)}
+    clean = values.astype(object).where(values.notna(), None)
+    return {'k': indices.shape[1], 'features': NUMERIC_FEATURES + ['sector'],
+            'peers': peers, 'values': clean.to_dict(orient='index')}
+
+
+def update_peers(date, k=DEFAULT_K):
+    """날짜 원본 아카이브로 유사 종목을 계산해 저장, 저장한 파일 이름 반환 (아카이브가 없으면 None)"""
+    json_filename = raw_archive.unified_filename(date)
+    if not os.path.exists(json_filename):
+        return None
+    payload = {'date': date, **compute_peers(load_raw_snapshot(json_filename), k)}
+    with atomic_open(peers_filename(date), 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+    return peers_filename(date)
+
+
+def load_peers(date):
+    """저장된 유사 종목 dict, 없으면 None"""
+    if not os.path.exists(peers_filename(date)):
+        return None
+    with open(peers_filename(date), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def peer_response(payload, ticker, cheaper=False, limit=None):
+    """한 종목의 유사 종목 목록 (cheaper면 PEG가 더 낮은 종목만), 종목이 없으면 None"""
+    if ticker not in payload['peers']:
+        return None
+    values = payload['values']
+    own_peg = values[ticker]['peg']
+    peers = []
+    for peer, distance in payload['peers'][ticker]:
+        peg = values[peer]['peg']
+        if cheaper and (peg is None or own_peg is None or peg >= own_peg):
+            continue
+        peers.append({'ticker': peer, 'distance': distance, **values[peer]})
+    return {'ticker': ticker, 'date': payload['date'], **values[ticker], 'peers': peers[:limit]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="원본 아카이브로 밸류에이션 유사 종목 계산")
+    parser.add_argument('date', nargs='?', help='YYYY-MM-DD (기본: 최신 아카이브)')
+    parser.add_argument('--k', type=int, default=DEFAULT_K, help=f'종목별 유사 종목 수 (기본: {DEFAULT_K})')
+    args = parser.parse_args()
+
+    dates = raw_archive.available_archive_dates()
+    date = args.date or (dates[-1] if dates else None)
+    if date is None:
+        parser.error('원본 아카이브가 없습니다.')
+    started = time.perf_counter()
+    filename = update_peers(date, args.k)
+    if filename is None:
+        parser.error(f'{raw_archive.unified_filename(date)} 파일이 없습니다.')
+    print(f"👥 유사 종목 '{filename}' 저장 완료 ({time.perf_counter() - started:.2f}초)")
@@ -0,0 +1,57 @@
+# 데이터 갱신 파이프라인 실행
+# /update 요청과 스케줄러가 같은 경로로 크롤링/리포트 생성을 실행하도록 공용화
+# 모든 실행은 PipelineLease로 직렬화되어 한 번에 하나의 실행만 결과물을 게시
+
+import os
+import subprocess
+import sys
+
+from atomic_publish import PipelineLease
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LEASE_PATH = os.path.join(BASE_DIR, '.pipeline.lock')
+
+
+def run_script(script, *args, lease=None):
+    """같은 파이썬 인터프리터로 스크립트를 실행하고 CompletedProcess 반환
+
+    lease를 넘기면 스크립트가 그 잠금을 이어받아 실행 (스스로 잠금을 잡는 스크립트용)
+    """
+    env = lease.child_env() if lease is not None else None
+    return subprocess.run([sys.executable, script, *args],
+                          capture_output=True, text=True, cwd=BASE_DIR, env=env)
+
+
+def run_update_pipeline(profile=False):
+    """전체 크롤링 후 웹 리포트 생성, (성공 여부, 메시지) 반환
+
+    profile=True면 두 단계 모두 --profile로 실행해 profiles/에 타이밍 보고서 저장
+    다른 실행이 진행 중이면 PipelineBusyError 발생
+    """
+    extra_args = ['--profile'] if profile else []
+    with PipelineLease(path=LEASE_PATH) as lease:
+        # 1. 데이터 크롤링 실행 (크롤러는 이 잠금을 이어받음)
+        print("1단계: 데이터 크롤링 중...")
+        result1 = run_script('crawl_pe_peg_batch.py', *extra_args, lease=lease)
+        if result1.returncode != 0:
+            return False, f'크롤링 오류: {result1.stderr}'
+
+        # 2. 웹 리포트 생성
+        print("2단계: 웹 리포트 생성 중...")
+        result2 = run_script('generate_web_report.py', *extra_args)
+        if result2.returncode != 0:
+            return False, f'리포트 생성 오류: {result2.stderr}'
+
+    return True, '데이터가 성공적으로 업데이트되었습니다! 페이지를 새로고침해주세요.'
+
+
+def run_price_refresh():
+    """장중 가격만 갱신 (재무 데이터 크롤링 없이), (성공 여부, 메시지) 반환
+
+    다른 실행이 진행 중이면 PipelineBusyError 발생
+    """
+    with PipelineLease(path=LEASE_PATH):
+        result = run_script('refresh_prices.py')
+    if result.returncode != 0:
+        return False, f'가격 갱신 오류: {result.stderr}'
+    return True, '가격이 갱신되었습니다.'
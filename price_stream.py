@@ -0,0 +1,281 @@
+# 실시간 가격 전파
+# 서버에 하나뿐인 폴러가 정해진 주기로 게시된 종목 전체의 가격을 한 번에 조회하고,
+# 바뀐 종목의 가격과 다시 계산한 P/E, PEG만 연결된 모든 클라이언트(SSE)에 전달
+# (접속자가 늘어도 Yahoo 요청 수는 그대로)
+
+import collections
+import json
+import os
+import queue
+import threading
+import time
+
+from atomic_publish import PipelineLease, atomic_open
+from market_calendar import is_market_open
+from market_scheduler import system_clock
+from refresh_prices import fetch_latest_prices
+
+DEFAULT_POLL_SECONDS = 60
+HEARTBEAT_SECONDS = 15       # 프록시가 연결을 끊지 않도록 보내는 주석 이벤트 간격
+SUBSCRIBER_QUEUE_SIZE = 100  # 이보다 밀린 클라이언트는 전체 재동기화하도록 안내
+MAX_STREAM_SECONDS = 600     # SSE 연결을 이 시간마다 끊어 브라우저가 다시 연결 (워커 간 연결 재분배)
+RECENT_EVENTS = 200          # 폴링 클라이언트용으로 보관하는 최근 이벤트 수
+POLL_CLIENT_SECONDS = 3 * 60  # 마지막 폴링 요청 후 이 시간까지는 클라이언트가 있는 것으로 봄
+
+# 여러 워커 프로세스로 실행할 때: 폴러는 잠금을 가진 워커 하나만, 이벤트는 파일로 모든 워커에 전달
+PRICE_EVENTS_FILENAME = 'nasdaq100_price_events.jsonl'
+POLLER_LEASE_FILENAME = '.price_poller.lock'
+PRICE_DEMAND_FILENAME = '.price_demand'  # 클라이언트가 있는 워커가 주기적으로 수정 시각을 갱신
+DEMAND_TOUCH_SECONDS = 5
+FOLLOW_INTERVAL_SECONDS = 0.5
+MAX_EVENTS_BYTES = 1024 * 1024  # 이보다 커지면 새 파일로 교체
+
+# 가격에 비례해 다시 계산되는 필드 (refresh_prices.PRICE_SCALED_COLUMNS의 클라이언트 행 이름)
+PRICE_SCALED_FIELDS = ['trailPE', 'fwdPE', 'peg']
+
+
+def reprice_row(row, price):
+    """게시된 행의 P/E, PEG를 새 가격 비율만큼 조정한 변경 행"""
+    ratio = price / row['price'] if row['price'] else None
+    changed = {'ticker': row['ticker'], 'price': price}
+    for field in PRICE_SCALED_FIELDS:
+        value = row[field]
+        changed[field] = value * ratio if ratio is not None and value is not None else value
+    return changed
+
+
+def sse_event(event):
+    """이벤트 dict를 text/event-stream 형식으로 변환"""
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+class PriceBroadcaster:
+    """연결된 클라이언트마다 큐를 두고 같은 이벤트를 모두에게 전달
+
+    SSE 연결을 받지 못한 클라이언트를 위해 최근 이벤트를 보관해 폴링(events_since)으로도 제공
+    """
+
+    def __init__(self, queue_size=SUBSCRIBER_QUEUE_SIZE, recent=RECENT_EVENTS,
+                 poll_client_seconds=POLL_CLIENT_SECONDS):
+        self.queue_size = queue_size
+        self.poll_client_seconds = poll_client_seconds
+        self._subscribers = set()
+        self._recent = collections.deque(maxlen=recent)
+        self._polled_at = None
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        subscription = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def try_subscribe(self, limit):
+        """구독자가 limit보다 적을 때만 구독 (확인과 등록을 한 번에), 가득 찼으면 None"""
+        with self._lock:
+            if len(self._subscribers) >= limit:
+                return None
+            subscription = queue.Queue(maxsize=self.queue_size)
+            self._subscribers.add(subscription)
+            return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def client_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def has_clients(self):
+        """SSE 구독자나 최근 폴링한 클라이언트가 있는지"""
+        with self._lock:
+            if self._subscribers:
+                return True
+            return self._polled_at is not None and time.monotonic() - self._polled_at < self.poll_client_seconds
+
+    def current_seq(self):
+        """가장 최근 가격 이벤트의 seq (처음 폴링하는 클라이언트의 시작 위치), 없으면 0"""
+        with self._lock:
+            return self._recent[-1].get('seq', 0) if self._recent else 0
+
+    def events_since(self, seq):
+        """폴링 클라이언트용: seq 이후의 최근 이벤트 목록"""
+        with self._lock:
+            self._polled_at = time.monotonic()
+            return [event for event in self._recent if event.get('seq', 0) > seq]
+
+    def publish(self, event):
+        """모든 클라이언트에 이벤트 전달, 큐가 가득 찬 클라이언트는 밀린 이벤트를 버리고 재동기화 요청"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+            if event.get('type') == 'prices':
+                self._recent.append(event)
+        for subscription in subscribers:
+            try:
+                subscription.put_nowait(event)
+            except queue.Full:
+                with subscription.mutex:
+                    subscription.queue.clear()
+                subscription.put_nowait({'type': 'resync'})
+
+    def events(self, subscription, heartbeat=HEARTBEAT_SECONDS, max_seconds=MAX_STREAM_SECONDS):
+        """한 클라이언트의 SSE 응답 본문 생성기 (연결이 끊기면 구독 해제)
+
+        max_seconds가 지나면 응답을 끝내 워커 스레드를 돌려주고, 브라우저는 retry 뒤 다시 연결
+        """
+        started = time.monotonic()
+        try:
+            yield f"retry: 5000\n\n"
+            while time.monotonic() - started < max_seconds:
+                try:
+                    event = subscription.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield sse_event(event)
+        finally:
+            self.unsubscribe(subscription)
+
+
+class SharedPriceFeed:
+    """워커 프로세스 간 가격 이벤트 전달: 폴러 워커는 파일에 한 줄씩 추가하고,
+    각 워커는 파일을 따라 읽어 자기 broadcaster로 전달
+    """
+
+    def __init__(self, broadcaster, path=PRICE_EVENTS_FILENAME,
+                 follow_interval=FOLLOW_INTERVAL_SECONDS, max_bytes=MAX_EVENTS_BYTES,
+                 demand_path=PRICE_DEMAND_FILENAME, demand_seconds=POLL_CLIENT_SECONDS):
+        self.broadcaster = broadcaster
+        self.path = path
+        self.follow_interval = follow_interval
+        self.max_bytes = max_bytes
+        self.demand_path = demand_path
+        self.demand_seconds = demand_seconds
+        self._demand_touched_at = None
+
+    def touch_demand(self):
+        """이 워커에 클라이언트가 있으면 수요 파일의 수정 시각 갱신 (DEMAND_TOUCH_SECONDS마다)"""
+        now = time.monotonic()
+        if not self.broadcaster.has_clients():
+            return
+        if self._demand_touched_at is not None and now - self._demand_touched_at < DEMAND_TOUCH_SECONDS:
+            return
+        with open(self.demand_path, 'a'):
+            os.utime(self.demand_path)
+        self._demand_touched_at = now
+
+    def has_demand(self):
+        """어느 워커에든 최근 클라이언트가 있었는지 (폴러 워커가 조회 여부를 판단)"""
+        try:
+            return time.time() - os.path.getmtime(self.demand_path) < self.demand_seconds
+        except OSError:
+            return False
+
+    def publish(self, event):
+        """이벤트 한 줄 추가 (O_APPEND로 한 번에 기록), 파일이 커지면 빈 파일로 교체"""
+        if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+            with atomic_open(self.path, 'w', encoding='utf-8'):
+                pass
+        line = (json.dumps(event, ensure_ascii=False) + '\n').encode('utf-8')
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    def follow(self):
+        """파일에 새로 추가된 이벤트를 계속 읽어 broadcaster로 전달 (시작 시점 이후 이벤트만)"""
+        identity, offset = None, 0
+        if os.path.exists(self.path):
+            stat = os.stat(self.path)
+            identity, offset = stat.st_ino, stat.st_size
+        pending = b''
+        while True:
+            time.sleep(self.follow_interval)
+            self.touch_demand()
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                continue
+            if stat.st_ino != identity or stat.st_size < offset:
+                identity, offset, pending = stat.st_ino, 0, b''
+            if stat.st_size == offset:
+                continue
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+            offset += len(data)
+            *lines, pending = (pending + data).split(b'\n')
+            for line in lines:
+                if line:
+                    self.broadcaster.publish(json.loads(line))
+
+
+class PricePoller:
+    """게시된 버전의 종목 가격을 주기적으로 조회해 바뀐 값만 publish로 전파
+
+    load_rows는 (버전, {티커: 행})을 돌려주는 함수 (서버의 공유 스냅샷)
+    장이 열려 있을 때만 조회하고, has_clients가 있으면 그 함수가 True일 때(클라이언트가 있을 때)만 조회
+    lease가 있으면 그 잠금을 가진 프로세스만 조회 (여러 워커 중 하나만 Yahoo에 요청)
+    """
+
+    def __init__(self, publish, load_rows, has_clients=None, lease=None,
+                 fetch_prices=fetch_latest_prices, interval=DEFAULT_POLL_SECONDS,
+                 clock=system_clock, sleep=time.sleep):
+        self.publish = publish
+        self.load_rows = load_rows
+        self.has_clients = has_clients
+        self.lease = lease
+        self.fetch_prices = fetch_prices
+        self.interval = interval
+        self.clock = clock
+        self.sleep = sleep
+        self.version = None
+        self.last_prices = {}
+        self._leading = False
+
+    def poll_once(self):
+        """한 번 조회해 바뀐 행 목록 반환 (바뀐 것이 있으면 전파)"""
+        version, rows = self.load_rows()
+        if version is None:
+            return []
+        if version != self.version:
+            # 새 버전이 게시되면 그 버전의 가격을 기준으로 다시 비교
+            self.version = version
+            self.last_prices = {ticker: row['price'] for ticker, row in rows.items()}
+
+        prices = self.fetch_prices(list(rows))
+        changes = [reprice_row(rows[ticker], price) for ticker, price in sorted(prices.items())
+                   if ticker in rows and price != self.last_prices.get(ticker)]
+        if changes:
+            self.last_prices.update((row['ticker'], row['price']) for row in changes)
+            # seq는 폴링 클라이언트가 이어 받을 위치 (폴러 워커가 바뀌어도 증가하도록 시각 기반)
+            self.publish({'type': 'prices', 'version': version, 'seq': time.time_ns() // 1000,
+                          'rows': changes})
+        return changes
+
+    def should_poll(self):
+        if not is_market_open(self.clock()):
+            return False
+        if self.has_clients is not None and not self.has_clients():
+            return False
+        if self.lease is not None and not self._leading:
+            self._leading = self.lease.acquire()
+        return self.lease is None or self._leading
+
+    def run_forever(self):
+        while True:
+            if self.should_poll():
+                try:
+                    changes = self.poll_once()
+                    if changes:
+                        print(f"💹 가격 변경 {len(changes)}개 종목 전파")
+                except Exception as e:
+                    print(f"⚠️ 가격 조회 실패: {e}")
+            self.sleep(self.interval)
+
+
+def poller_lease(interval=DEFAULT_POLL_SECONDS):
+    """가격 폴러용 잠금 (잠금을 가진 워커가 죽으면 몇 주기 뒤 다른 워커가 이어받음)"""
+    return PipelineLease(path=POLLER_LEASE_FILENAME, ttl=max(3 * interval, 30))
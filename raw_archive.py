@@ -0,0 +1,141 @@
+# 원본 데이터 아카이브 (nasdaq100_real_unified_{date}.json) 와 오프셋 인덱스
+# 종목별 (바이트 오프셋, 길이) 인덱스를 함께 저장해 전체 파일을 파싱하지 않고 한 종목만 읽음
+# 인덱스에는 아카이브의 크기/수정 시각을 함께 기록해, 교체 도중 어긋난 인덱스는 사용하지 않음
+
+import glob
+import json
+import os
+import re
+
+from atomic_publish import atomic_path
+
+class ArchiveChangedError(RuntimeError):
+    """인덱스를 만든 뒤 아카이브 파일이 교체됨"""
+
+
+_DATE_PATTERN = re.compile(r'nasdaq100_real_unified_(\d{4}-\d{2}-\d{2})\.json$')
+
+
+def unified_filename(date):
+    """날짜별 통합 JSON 원본 파일 이름"""
+    return f"nasdaq100_real_unified_{date}.json"
+
+
+def index_filename(date):
+    """통합 JSON 옆에 저장되는 오프셋 인덱스 파일 이름"""
+    return f"nasdaq100_real_unified_{date}.idx.json"
+
+
+def write_unified_archive(records, date):
+    """(티커, info) 이터러블을 json.dump(indent=2)와 같은 형태로 기록하고 인덱스 저장, 종목 수 반환"""
+    index = {}
+    with atomic_path(unified_filename(date)) as tmp_path:
+        with open(tmp_path, 'wb') as f:
+            f.write(b"{")
+            for ticker, info in records:
+                # 종목 하나씩 직렬화해 값의 바이트 위치를 기록
+                body = json.dumps(info, indent=2, ensure_ascii=False).replace("\n", "\n  ").encode('utf-8')
+                f.write(b"," if index else b"")
+                f.write(f"\n  {json.dumps(ticker, ensure_ascii=False)}: ".encode('utf-8'))
+                index[ticker] = [f.tell(), len(body)]
+                f.write(body)
+            f.write(b"\n}" if index else b"}")
+        # 교체 후에도 유지되는 임시 파일의 크기/수정 시각을 인덱스에 기록
+        archive_stat = _archive_stat(tmp_path)
+    write_index(index, date, archive_stat)
+    return len(index)
+
+
+def _archive_stat(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def write_index(index, date, archive_stat):
+    """{티커: [오프셋, 길이]} 인덱스를 아카이브 상태와 함께 저장"""
+    with atomic_path(index_filename(date)) as tmp_path:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'archive': archive_stat, 'offsets': index}, f, ensure_ascii=False)
+
+
+def build_index(date):
+    """기존 아카이브를 한 번 훑어 오프셋 인덱스를 만들고 저장 (크롤러가 인덱스를 만들기 전 파일용)"""
+    archive_stat = _archive_stat(unified_filename(date))
+    with open(unified_filename(date), 'rb') as f:
+        data = f.read()
+    text = data.decode('utf-8')
+    decoder = json.JSONDecoder()
+    index = {}
+
+    # 문자 위치를 바이트 위치로 바꾸기 위해 지나온 구간의 바이트 수를 누적
+    char_pos, byte_pos = 0, 0
+
+    def advance(to):
+        nonlocal char_pos, byte_pos
+        byte_pos += len(text[char_pos:to].encode('utf-8'))
+        char_pos = to
+
+    def skip_whitespace(pos):
+        while pos < len(text) and text[pos] in ' \t\r\n':
+            pos += 1
+        return pos
+
+    pos = skip_whitespace(0)
+    if text[pos] != '{':
+        raise ValueError(f"{unified_filename(date)}: 최상위 객체가 아닙니다.")
+    pos = skip_whitespace(pos + 1)
+    while pos < len(text) and text[pos] != '}':
+        ticker, pos = decoder.raw_decode(text, pos)
+        pos = skip_whitespace(skip_whitespace(pos) + 1)  # ':' 건너뛰기
+        advance(pos)
+        start = byte_pos
+        _, pos = decoder.raw_decode(text, pos)
+        advance(pos)
+        index[ticker] = [start, byte_pos - start]
+        pos = skip_whitespace(pos)
+        if text[pos] == ',':
+            pos = skip_whitespace(pos + 1)
+
+    write_index(index, date, archive_stat)
+    return index
+
+
+def load_index(date):
+    """오프셋 인덱스 로드 (없거나 현재 아카이브와 맞지 않으면 아카이브를 훑어 다시 생성)"""
+    try:
+        with open(index_filename(date), 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        stored = None
+    if stored is None or stored.get('archive') != _archive_stat(unified_filename(date)):
+        return build_index(date)
+    return stored['offsets']
+
+
+def read_ticker_record(date, ticker, index=None, archive_stat=None):
+    """인덱스의 위치로 바로 이동해 한 종목의 원본 info만 읽음, 없으면 None
+
+    archive_stat({size, mtime_ns})을 넘기면 연 파일이 그 아카이브가 아닐 때 ArchiveChangedError
+    """
+    index = index if index is not None else load_index(date)
+    location = index.get(ticker)
+    if location is None:
+        return None
+    offset, length = location
+    with open(unified_filename(date), 'rb') as f:
+        if archive_stat is not None:
+            stat = os.fstat(f.fileno())
+            if {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns} != archive_stat:
+                raise ArchiveChangedError(f"{unified_filename(date)}: 인덱스를 만든 뒤 교체되었습니다.")
+        f.seek(offset)
+        return json.loads(f.read(length))
+
+
+def available_archive_dates():
+    """저장된 원본 아카이브 날짜 목록 (오름차순)"""
+    dates = []
+    for filename in glob.glob("nasdaq100_real_unified_????-??-??.json"):
+        match = _DATE_PATTERN.search(os.path.basename(filename))
+        if match:
+            dates.append(match.group(1))
+    return sorted(dates)
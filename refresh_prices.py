@@ -0,0 +1,70 @@
+import yfinance as yf
+from datetime import datetime
+from yf_session import get_yf_session, close_yf_session
+import generate_web_report
+from snapshot_store import latest_snapshot_date, load_snapshot, write_snapshot, write_snapshot_csv, snapshot_filename
+
+# 가격에 비례해 다시 계산되는 컬럼 (EPS와 성장률은 장중에 변하지 않는다고 가정)
+PRICE_SCALED_COLUMNS = ['Trailing P/E', 'Forward P/E', 'PEG Ratio']
+
+
+def fetch_latest_prices(tickers, session=None):
+    """여러 종목의 최신 가격을 한 번에 조회해 {티커: 가격} 반환"""
+    if not tickers:
+        return {}
+    history = yf.download(list(tickers), period="1d", interval="1m", group_by="ticker",
+                          threads=True, progress=False, session=session or get_yf_session())
+    prices = {}
+    for ticker in tickers:
+        try:
+            closes = history[ticker]['Close'].dropna()
+        except KeyError:
+            continue
+        if not closes.empty:
+            prices[ticker] = float(closes.iloc[-1])
+    return prices
+
+
+def apply_prices(df, prices):
+    """새 가격을 반영하고 P/E, PEG를 가격 변화율만큼 조정한 DataFrame 반환"""
+    df = df.copy()
+    new_prices = df['티커'].map(prices)
+    ratio = (new_prices / df['현재가격']).where(df['현재가격'] > 0)
+    for column in PRICE_SCALED_COLUMNS:
+        df[column] = df[column].where(ratio.isna(), df[column] * ratio)
+    df['현재가격'] = new_prices.fillna(df['현재가격'])
+    return df
+
+
+def refresh_prices():
+    """최신 스냅샷의 가격을 갱신해 오늘 날짜 스냅샷으로 저장하고 index.html 반영"""
+    snapshot_date = latest_snapshot_date()
+    if snapshot_date is None:
+        print("❌ 가격을 갱신할 스냅샷이 없습니다.")
+        return False
+
+    df = load_snapshot(snapshot_date)
+    print(f"📡 {len(df)}개 종목 가격 요청 중... (기준 스냅샷: {snapshot_date})")
+    prices = fetch_latest_prices(df['티커'].tolist())
+    print(f"✅ {len(prices)}개 종목 가격 수신")
+
+    current_date = datetime.now().strftime("%Y-%m-%d")
+    df = apply_prices(df, prices)
+    df['날짜'] = current_date
+
+    output_filename = snapshot_filename(current_date, 'csv')
+    write_snapshot_csv(df, output_filename)
+    write_snapshot(df, current_date)
+    print(f"📄 가격이 갱신된 데이터가 '{output_filename}' 파일에 저장되었습니다.")
+
+    generate_web_report.update_index_html()
+    return True
+
+
+if __name__ == "__main__":
+    print("💹 장중 가격 갱신 시작...")
+    success = refresh_prices()
+    close_yf_session()
+    if not success:
+        raise SystemExit(1)
+    print("✅ 가격 갱신 완료!")
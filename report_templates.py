@@ -0,0 +1,23 @@
+# 리포트 HTML 템플릿
+# templates/ 폴더의 Jinja2 템플릿을 프로세스당 한 번만 컴파일해 캐시하고,
+# generate()로 조각 단위 스트리밍 렌더링 (고정 부분은 컴파일 시 문자열 상수로 미리 만들어 둠)
+
+import os
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+# auto_reload=False: 한 번 컴파일한 템플릿은 파일 변경 확인 없이 재사용
+_environment = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(['html']),
+    auto_reload=False,
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+
+
+def get_template(name):
+    """컴파일된 템플릿 반환 (처음 요청 시에만 컴파일)"""
+    return _environment.get_template(name)
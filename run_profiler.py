@@ -0,0 +1,145 @@
+# 실행 프로파일링
+# --profile로 켜면 단계별/종목별 경과 시간(wall), CPU 시간, 대기(sleep) 시간을 기록하고
+# 나머지(wall - CPU - sleep)를 네트워크/디스크 I/O 대기로 보고 실행마다 JSON 보고서로 저장
+# 꺼져 있으면 기록 없이 그대로 통과 (sleep만 실제로 수행)
+
+import cProfile
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from atomic_publish import atomic_open
+
+PROFILE_DIR = 'profiles'
+
+
+class _Frame:
+    """열려 있는 단계/종목 하나의 누적 시간"""
+
+    def __init__(self, name):
+        self.name = name
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.sleep = 0.0
+
+
+def _timing(frame):
+    wall = time.perf_counter() - frame.wall_start
+    cpu = time.process_time() - frame.cpu_start
+    return {'wall': wall, 'cpu': cpu, 'sleep': frame.sleep,
+            'io_wait': max(wall - cpu - frame.sleep, 0.0)}
+
+
+class RunProfiler:
+    """실행 하나의 타이밍 수집기 (단일 스레드 기준, 단계는 중첩 가능)"""
+
+    def __init__(self):
+        self.enabled = False
+        self.run_name = None
+        self.started_at = None
+        self.stages = {}
+        self.tickers = []
+        self._stack = []
+        self._run = None
+        self._cprofile = None
+
+    def enable(self, run_name, cprofile=False):
+        """기록 시작 (cprofile=True면 cProfile 통계도 함께 저장)"""
+        self.enabled = True
+        self.run_name = run_name
+        self.started_at = datetime.now(timezone.utc)
+        self._run = _Frame(run_name)
+        if cprofile:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    @contextmanager
+    def stage(self, name):
+        """단계 시간 측정, 중첩된 단계는 '상위/하위' 이름으로 집계"""
+        if not self.enabled:
+            yield
+            return
+        parents = [frame.name for frame in self._stack if frame.name is not None]
+        path = f'{parents[-1]}/{name}' if parents else name
+        frame = _Frame(path)
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            timing = _timing(frame)
+            totals = self.stages.setdefault(path, {'calls': 0, 'wall': 0.0, 'cpu': 0.0,
+                                                   'sleep': 0.0, 'io_wait': 0.0})
+            totals['calls'] += 1
+            for key, value in timing.items():
+                totals[key] += value
+
+    @contextmanager
+    def ticker(self, ticker):
+        """종목 하나를 처리하는 시간 측정 (단계 이름에는 포함하지 않음)"""
+        if not self.enabled:
+            yield
+            return
+        frame = _Frame(None)
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            self.tickers.append({'ticker': ticker, **_timing(frame)})
+
+    def sleep(self, seconds):
+        """time.sleep과 같지만 열려 있는 단계/종목의 대기 시간으로 기록"""
+        if seconds <= 0:
+            return
+        time.sleep(seconds)
+        if self.enabled:
+            for frame in self._stack + [self._run]:
+                frame.sleep += seconds
+
+    def report(self):
+        """기계가 읽을 수 있는 타이밍 보고서 dict"""
+        return {
+            'run': self.run_name,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'argv': sys.argv[1:],
+            'total': _timing(self._run),
+            'stages': [{'stage': name, **totals} for name, totals in self.stages.items()],
+            'tickers': self.tickers,
+        }
+
+    def write_report(self, directory=PROFILE_DIR):
+        """보고서(.json)와 cProfile 통계(.prof)를 저장하고 보고서 경로 반환, 꺼져 있으면 None"""
+        if not self.enabled:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(directory, f"{self.run_name}_{self.started_at.strftime('%Y%m%dT%H%M%SZ')}")
+        report = self.report()
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(stem + '.prof')
+            report['cprofile'] = stem + '.prof'
+        with atomic_open(stem + '.json', 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        return stem + '.json'
+
+    def print_summary(self):
+        """단계별 시간 요약 출력"""
+        if not self.enabled:
+            return
+        total = _timing(self._run)
+        print(f"\n⏱️  프로파일 ({self.run_name}): 전체 {total['wall']:.2f}s "
+              f"(CPU {total['cpu']:.2f}s, 대기 {total['sleep']:.2f}s, I/O {total['io_wait']:.2f}s)")
+        for name, totals in self.stages.items():
+            print(f"  - {name}: {totals['wall']:.3f}s x{totals['calls']} "
+                  f"(CPU {totals['cpu']:.3f}s, 대기 {totals['sleep']:.3f}s, I/O {totals['io_wait']:.3f}s)")
+        if self.tickers:
+            slowest = sorted(self.tickers, key=lambda entry: entry['wall'], reverse=True)[:5]
+            print("  - 가장 느린 종목: " + ', '.join(f"{entry['ticker']} {entry['wall']:.2f}s" for entry in slowest))
+
+
+# 프로세스 전체에서 공유하는 프로파일러 (main에서 enable)
+profiler = RunProfiler()
@@ -0,0 +1,181 @@
+# 종목 검색 인덱스
+# 티커, 회사명(longName/shortName), 산업군의 단어를 정렬된 목록으로 두고 접두어는 이진 탐색으로,
+# 오타/중간 일치는 trigram으로 찾음
+# 파이프라인이 게시할 때 만들어 파일로 저장하고(종목/이름이 바뀌었을 때만 다시 생성), 서버는 시작할 때 읽기만 함
+
+import bisect
+import hashlib
+import json
+import os
+import re
+
+from atomic_publish import atomic_open
+import raw_archive
+
+SEARCH_INDEX_FILENAME = 'nasdaq100_search_index.json'
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+MAX_PREFIX_TERMS = 2000  # 한 글자 검색처럼 너무 많은 단어가 걸리면 앞에서부터 이만큼만
+
+# 필드 번호와 일치 점수 (정확히 일치, 접두어 일치)
+FIELD_TICKER, FIELD_NAME, FIELD_INDUSTRY = 0, 1, 2
+FIELD_NAMES = ('ticker', 'name', 'industry')
+EXACT_SCORES = (100, 40, 15)
+PREFIX_SCORES = (60, 25, 8)
+TRIGRAM_SCORE = 20  # trigram 일치율(0~1)에 곱함
+
+_TOKEN = re.compile(r'[0-9a-z가-힣]+')
+
+
+def tokenize(text):
+    return _TOKEN.findall((text or '').lower())
+
+
+def trigrams(text):
+    text = ' '.join(tokenize(text))
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def archive_names(date):
+    """date 이전(포함) 가장 최근 원본 아카이브의 {티커: (longName, shortName)}
+
+    중간/최종 게시 때는 그날 아카이브가 아직 없으므로 직전 아카이브의 이름을 사용
+    (이름은 거의 바뀌지 않아 같은 실행 안에서 인덱스가 두 번 만들어지지 않음)
+    """
+    dates = [archive_date for archive_date in raw_archive.available_archive_dates() if archive_date <= date]
+    if not dates:
+        return {}
+    with open(raw_archive.unified_filename(dates[-1]), 'r', encoding='utf-8') as f:
+        return {ticker: (info.get('longName'), info.get('shortName')) for ticker, info in json.load(f).items()}
+
+
+def search_entries(df, date=None):
+    """스냅샷 DataFrame(과 원본 아카이브의 longName/shortName)으로 검색 대상 목록 생성
+
+    [티커, 회사명, 짧은 이름, 산업군] 목록 (티커 순)
+    """
+    names = archive_names(date) if date is not None else {}
+    entries = []
+    for row in df[['티커', '종목명', '산업군']].itertuples(index=False):
+        ticker, company, industry = row
+        long_name, short_name = names.get(ticker, (None, None))
+        long_name = long_name or (company if company != 'N/A' else '')
+        short_name = short_name if short_name and short_name != long_name else ''
+        entries.append([ticker, long_name, short_name, industry if isinstance(industry, str) else ''])
+    entries.sort()
+    return entries
+
+
+def fingerprint(entries):
+    return hashlib.sha1(json.dumps(entries, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def build_index(entries):
+    """검색 대상 목록으로 인덱스 dict 생성
+
+    terms: 정렬된 단어 목록, postings: 단어별 [[종목 번호, 필드], ...], trigrams: {trigram: [종목 번호, ...]}
+    """
+    postings = {}
+    grams = {}
+    for entry_id, (ticker, long_name, short_name, industry) in enumerate(entries):
+        fields = ((FIELD_TICKER, ticker), (FIELD_NAME, long_name), (FIELD_NAME, short_name),
+                  (FIELD_INDUSTRY, industry))
+        for field, text in fields:
+            for term in tokenize(text):
+                hits = postings.setdefault(term, [])
+                if [entry_id, field] not in hits:
+                    hits.append([entry_id, field])
+        for gram in trigrams(f'{ticker} {long_name} {short_name}'):
+            grams.setdefault(gram, []).append(entry_id)
+    terms = sorted(postings)
+    return {'fingerprint': fingerprint(entries), 'entries': entries, 'terms': terms,
+            'postings': [postings[term] for term in terms], 'trigrams': grams}
+
+
+def update_search_index(df, date=None, path=SEARCH_INDEX_FILENAME):
+    """종목/이름이 바뀐 경우에만 인덱스를 다시 만들어 저장, 새로 만들었으면 True"""
+    entries = search_entries(df, date)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if json.load(f).get('fingerprint') == fingerprint(entries):
+                return False
+    with atomic_open(path, 'w', encoding='utf-8') as f:
+        json.dump(build_index(entries), f, ensure_ascii=False, separators=(',', ':'))
+    return True
+
+
+class SearchIndex:
+    """저장된 인덱스로 검색 (파일이 바뀌면 다시 읽음)"""
+
+    def __init__(self, path=SEARCH_INDEX_FILENAME):
+        self.path = path
+        self._mtime = None
+        self._index = None
+        self._trigram_sets = None
+        self.reload()
+
+    def reload(self):
+        """인덱스 파일이 바뀌었으면 다시 읽음, 인덱스가 있으면 True"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except FileNotFoundError:
+            return self._index is not None
+        if mtime != self._mtime:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            self._trigram_sets = {gram: set(ids) for gram, ids in index['trigrams'].items()}
+            self._index, self._mtime = index, mtime
+        return True
+
+    def _term_scores(self, token):
+        """검색어 단어 하나에 걸리는 {종목 번호: 점수} (필드별 최고 점수)"""
+        terms, postings = self._index['terms'], self._index['postings']
+        scores = {}
+        start = bisect.bisect_left(terms, token)
+        for position in range(start, min(start + MAX_PREFIX_TERMS, len(terms))):
+            term = terms[position]
+            if not term.startswith(token):
+                break
+            table = EXACT_SCORES if term == token else PREFIX_SCORES
+            for entry_id, field in postings[position]:
+                scores[entry_id] = max(scores.get(entry_id, 0), table[field])
+        return scores
+
+    def _trigram_scores(self, query):
+        """접두어로 찾지 못했을 때 trigram이 절반 이상 겹치는 종목 (오타, 단어 중간 일치)"""
+        grams = trigrams(query)
+        counts = {}
+        for gram in grams:
+            for entry_id in self._trigram_sets.get(gram, ()):
+                counts[entry_id] = counts.get(entry_id, 0) + 1
+        return {entry_id: TRIGRAM_SCORE * count / len(grams)
+                for entry_id, count in counts.items() if count * 2 >= len(grams)}
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """점수 순 검색 결과 [{ticker, name, shortName, industry, score, match}]"""
+        if self._index is None:
+            return []
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # 모든 단어가 걸리는 종목만 (점수는 합산)
+        scores = None
+        for token in tokens:
+            token_scores = self._term_scores(token)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {entry_id: score + token_scores[entry_id]
+                          for entry_id, score in scores.items() if entry_id in token_scores}
+            if not scores:
+                break
+        match = 'prefix'
+        if not scores and len(' '.join(tokens)) >= 3:
+            scores, match = self._trigram_scores(query), 'trigram'
+
+        entries = self._index['entries']
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], len(entries[item[0]][0]), entries[item[0]][0]))
+        return [{'ticker': entries[entry_id][0], 'name': entries[entry_id][1],
+                 'shortName': entries[entry_id][2], 'industry': entries[entry_id][3],
+                 'score': round(score, 2), 'match': match}
+                for entry_id, score in ranked[:limit]]
@@ -0,0 +1,76 @@
+# 운영 서버 실행
+# gunicorn pre-fork 워커(gthread)로 app을 실행: 워커/스레드 수 설정 가능,
+# 앱은 마스터에서 한 번 불러온 뒤 fork해 코드와 초기 데이터를 공유하고,
+# 게시된 응답은 serving_bundle 파일을 모든 워커가 메모리 매핑으로 공유
+# 실시간 가격(SSE)은 워커당 스레드 절반까지만 연결하고, 넘치면 클라이언트가 /api/prices 폴링으로 전환
+# (새 번들은 재시작 없이 각 워커가 CHECK_INTERVAL_SECONDS 안에 반영)
+#
+# 사용 예: python serve.py --workers 4 --threads 8 --bind 0.0.0.0:5000
+
+import argparse
+import multiprocessing
+import os
+import threading
+
+DEFAULT_BIND = '0.0.0.0:5000'
+DEFAULT_THREADS = 8  # SSE(/api/prices/stream) 연결도 워커 스레드를 하나씩 차지 (워커당 절반까지만 허용)
+
+
+def default_workers():
+    return min(multiprocessing.cpu_count() * 2 + 1, 8)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="나스닥 PEG 분석 운영 서버 (gunicorn)")
+    parser.add_argument('--bind', default=DEFAULT_BIND, help=f'주소:포트 (기본: {DEFAULT_BIND})')
+    parser.add_argument('--workers', type=int, default=default_workers(), help='워커 프로세스 수')
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS, help='워커당 스레드 수')
+    parser.add_argument('--timeout', type=int, default=60, help='응답 없는 워커 재시작까지 초')
+    parser.add_argument('--scheduler', action='store_true',
+                        help='마스터 프로세스에서 장 시간 기반 자동 갱신 스케줄러 실행')
+    args = parser.parse_args()
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise SystemExit("❌ gunicorn이 필요합니다: pip install gunicorn (Windows에서는 python app.py 사용)")
+
+    # app을 불러오기 전에 설정해야 워커들이 공유 번들/공유 가격 피드를 사용
+    os.environ['PEG_SERVING_BUNDLE'] = '1'
+    # SSE 연결은 워커 스레드의 절반까지만 받고, 나머지 클라이언트는 폴링 (일반 요청이 막히지 않도록)
+    os.environ['PEG_MAX_PRICE_STREAMS'] = str(max(args.threads // 2, 1))
+
+    import serving_bundle
+    from app import app, prewarm_cache
+
+    # 시작 시점의 게시 결과로 번들을 만들어 둠 (이후에는 게시할 때마다 교체)
+    meta = serving_bundle.publish_bundle()
+    print(f"📦 응답 번들 준비 완료 (스냅샷 {meta['snapshot_date']}, 버전 {meta['version']})")
+    prewarm_cache()
+
+    def when_ready(server):
+        if args.scheduler:
+            from market_scheduler import RefreshScheduler
+            scheduler = RefreshScheduler()
+            threading.Thread(target=scheduler.run_forever, daemon=True).start()
+            print(f"🗓️ 자동 갱신 스케줄러 실행 중 (다음 실행: {scheduler.next_run_time():%Y-%m-%d %H:%M %Z})")
+
+    class PegApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', args.bind)
+            self.cfg.set('workers', args.workers)
+            self.cfg.set('threads', args.threads)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('timeout', args.timeout)
+            self.cfg.set('preload_app', True)
+            self.cfg.set('when_ready', when_ready)
+
+        def load(self):
+            return app
+
+    print(f"🚀 운영 서버 시작: {args.bind} (워커 {args.workers}개 x 스레드 {args.threads}개)")
+    PegApplication().run()
+
+
+if __name__ == "__main__":
+    main()
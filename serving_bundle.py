@@ -0,0 +1,112 @@
+# 운영 서버용 공유 응답 번들
+# 게시할 때마다 완성된 응답 본문(index.html과 압축본, /api/snapshot, /api/changes 전체 응답)을
+# 한 파일에 모아 원자적으로 교체하고, 모든 워커가 같은 파일을 메모리 매핑으로 읽음
+# (워커 수가 늘어도 메모리는 OS 페이지 캐시 한 벌, 새 파일은 CHECK_INTERVAL_SECONDS 안에 반영)
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime, timezone
+
+from atomic_publish import atomic_open
+from snapshot_store import latest_snapshot_date, load_snapshot_table
+import snapshot_versions
+
+BUNDLE_FILENAME = 'nasdaq100_serving.bundle'
+MAGIC = b'PEGBUNDLE1\n'
+CHECK_INTERVAL_SECONDS = 0.5  # 워커가 번들 교체 여부를 확인하는 최소 간격
+
+# 번들에 넣는 정적 응답 (파일이 있을 때만)
+BUNDLED_FILES = ['index.html', 'index.html.gz', 'index.html.br']
+
+
+def write_bundle(entries, meta, path=BUNDLE_FILENAME):
+    """{이름: 바이트}를 번들 파일로 저장: MAGIC, 헤더 길이(8바이트), 헤더 JSON, 본문들"""
+    offsets = {}
+    position = 0
+    for name, body in entries.items():
+        offsets[name] = [position, len(body)]
+        position += len(body)
+    header = json.dumps({'meta': meta, 'entries': offsets}).encode('utf-8')
+    with atomic_open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for body in entries.values():
+            f.write(body)
+
+
+def publish_bundle(path=BUNDLE_FILENAME):
+    """현재 게시된 결과물로 번들을 다시 만들어 교체"""
+    entries = {}
+    for filename in BUNDLED_FILES:
+        if os.path.exists(filename):
+            with open(filename, 'rb') as f:
+                entries[filename] = f.read()
+
+    date = latest_snapshot_date()
+    table = load_snapshot_table(date) if date is not None else None
+    if table is not None:
+        entries['api/snapshot'] = json.dumps({'success': True, 'date': date, 'rows': table.to_pylist()},
+                                             ensure_ascii=False).encode('utf-8')
+
+    changes = snapshot_versions.changes_since(None)
+    if changes is not None:
+        entries['api/changes'] = json.dumps({'success': True, **changes},
+                                            ensure_ascii=False).encode('utf-8')
+
+    meta = {'published_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'snapshot_date': date, 'version': changes['version'] if changes else None}
+    write_bundle(entries, meta, path)
+    return meta
+
+
+class SharedBundle:
+    """워커마다 하나씩 두는 번들 리더 (파일이 교체되면 새 파일을 다시 매핑)"""
+
+    def __init__(self, path=BUNDLE_FILENAME, check_interval=CHECK_INTERVAL_SECONDS):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._state = None   # (파일 식별자, mmap, 데이터 시작 위치, 헤더)
+        self._checked_at = 0.0
+
+    def _refresh(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._state
+        with self._lock:
+            self._checked_at = now
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                self._state = None
+                return None
+            identity = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            if self._state is None or self._state[0] != identity:
+                # 이전 매핑은 사용 중인 요청이 끝나면 GC가 정리
+                with open(self.path, 'rb') as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if mapped[:len(MAGIC)] != MAGIC:
+                    raise ValueError(f'{self.path}는 번들 파일이 아닙니다.')
+                header_start = len(MAGIC) + 8
+                (header_length,) = struct.unpack('<Q', mapped[len(MAGIC):header_start])
+                header = json.loads(mapped[header_start:header_start + header_length])
+                self._state = (identity, mapped, header_start + header_length, header)
+            return self._state
+
+    def get(self, name):
+        """번들에 든 응답 본문, 번들이나 항목이 없으면 None"""
+        state = self._refresh()
+        if state is None or name not in state[3]['entries']:
+            return None
+        _, mapped, data_start, header = state
+        offset, length = header['entries'][name]
+        return mapped[data_start + offset:data_start + offset + length]
+
+    def meta(self):
+        state = self._refresh()
+        return state[3]['meta'] if state is not None else None
@@ -0,0 +1,243 @@
+# 스냅샷 내보내기 (CSV / JSON Lines / XLSX)
+# 여러 날짜의 스냅샷을 CHUNK_ROWS행씩 읽어(Arrow는 메모리 매핑, 없으면 CSV를 나눠 읽음)
+# 종목/필터/컬럼을 적용한 뒤 바로 응답 본문 조각으로 만들어 보냄
+# (전체 결과를 메모리에 만들지 않으므로 행 수와 관계없이 메모리 사용량이 일정하고 첫 바이트가 바로 나감)
+
+import numbers
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+from snapshot_store import (available_snapshot_dates, find_snapshot_csv, latest_snapshot_date,
+                            load_snapshot_table, to_typed_frame)
+from valuation_metrics import CSV_COLUMNS, METRIC_COLUMNS
+
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
+CHUNK_ROWS = 1000
+MAX_DATES = 400
+
+# 기본 내보내기 컬럼 (스냅샷 컬럼 이름 그대로, 예전 스냅샷에 없는 컬럼은 빈 값)
+EXPORT_COLUMNS = CSV_COLUMNS[:3] + ["섹터"] + CSV_COLUMNS[3:] + METRIC_COLUMNS + ["Stale"]
+
+# 클라이언트 행 이름으로도 컬럼을 지정할 수 있도록
+COLUMN_ALIASES = {
+    'date': '날짜', 'company': '종목명', 'ticker': '티커', 'sector': '섹터', 'industry': '산업군',
+    'price': '현재가격', 'trailPE': 'Trailing P/E', 'fwdPE': 'Forward P/E', 'peg': 'PEG Ratio',
+    'pegSource': 'PEG Source', 'fwdPEG': 'Forward PEG', 'earningsYield': 'Earnings Yield',
+    'peSectorRatio': 'PE/Sector Median', 'stale': 'Stale',
+}
+
+# 필터 이름 -> (스냅샷 컬럼, 비교 방향)
+FILTERS = {
+    'min_peg': ('PEG Ratio', 'min'),
+    'max_peg': ('PEG Ratio', 'max'),
+    'max_trailPE': ('Trailing P/E', 'max'),
+    'max_fwdPE': ('Forward P/E', 'max'),
+    'min_price': ('현재가격', 'min'),
+    'max_price': ('현재가격', 'max'),
+}
+
+_DATE = re.compile(r'\d{4}-\d{2}-\d{2}$')
+
+
+def _split(value):
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+def normalize_export(args):
+    """요청 인자를 검증해 내보내기 조건 dict 반환, 잘못된 값이면 ValueError
+
+    format: csv(기본) / jsonl / xlsx
+    date: 날짜 하나 또는 쉼표 목록, start/end: 날짜 범위 (둘 다 없으면 최신 스냅샷)
+    universe: 쉼표로 구분한 티커 (없으면 전체), sector: 섹터 이름
+    columns: 쉼표로 구분한 컬럼 (스냅샷 컬럼 이름 또는 COLUMN_ALIASES), 필터: FILTERS
+    """
+    export_format = args.get('format') or 'csv'
+    if export_format not in FORMATS:
+        raise ValueError(f'format은 {", ".join(FORMATS)} 중 하나여야 합니다.')
+
+    for date in _split(args.get('date')) + [args.get('start') or '', args.get('end') or '']:
+        if date and not _DATE.match(date):
+            raise ValueError(f'날짜 형식이 잘못되었습니다: {date}')
+    available = available_snapshot_dates()
+    if args.get('date'):
+        dates = sorted(set(_split(args.get('date'))) & set(available))
+    elif args.get('start') or args.get('end'):
+        start, end = args.get('start') or '0000-00-00', args.get('end') or '9999-99-99'
+        dates = [date for date in available if start <= date <= end]
+    else:
+        latest = latest_snapshot_date()
+        dates = [latest] if latest else []
+    if not dates:
+        raise LookupError('내보낼 스냅샷이 없습니다.')
+    if len(dates) > MAX_DATES:
+        raise ValueError(f'한 번에 최대 {MAX_DATES}개 날짜까지 내보낼 수 있습니다.')
+
+    columns = [COLUMN_ALIASES.get(column, column) for column in _split(args.get('columns'))] or EXPORT_COLUMNS
+    unknown = [column for column in columns if column not in EXPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f'알 수 없는 컬럼: {", ".join(unknown)}')
+
+    filters = {}
+    for name in FILTERS:
+        value = args.get(name)
+        if value is None or value == '':
+            continue
+        try:
+            filters[name] = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'{name} 값이 숫자가 아닙니다: {value}')
+
+    universe = sorted({ticker.upper() for ticker in _split(args.get('universe'))}) or None
+    return {'format': export_format, 'dates': dates, 'columns': list(dict.fromkeys(columns)),
+            'universe': universe, 'sector': args.get('sector') or None, 'filters': filters}
+
+
+def export_filename(spec):
+    dates = spec['dates']
+    span = dates[0] if len(dates) == 1 else f"{dates[0]}_{dates[-1]}"
+    return f"nasdaq100_export_{span}.{FORMATS[spec['format']][1]}"
+
+
+def snapshot_chunks(date, chunk_rows=CHUNK_ROWS):
+    """날짜 스냅샷을 chunk_rows행씩 DataFrame으로 (Arrow 메모리 매핑 우선, 없으면 CSV를 나눠 읽음)"""
+    table = load_snapshot_table(date)
+    if table is not None:
+        for batch in table.to_batches(max_chunksize=chunk_rows):
+            yield batch.to_pandas()
+        return
+    csv_filename = find_snapshot_csv(date)
+    if csv_filename is None:
+        return
+    for chunk in pd.read_csv(csv_filename, encoding='utf-8-sig', chunksize=chunk_rows):
+        yield to_typed_frame(chunk)
+
+
+def export_chunks(spec, chunk_rows=CHUNK_ROWS):
+    """조건에 맞는 행을 컬럼만 골라 DataFrame 조각으로 (날짜 순)"""
+    for date in spec['dates']:
+        for chunk in snapshot_chunks(date, chunk_rows):
+            if spec['universe'] is not None:
+                chunk = chunk[chunk['티커'].isin(spec['universe'])]
+            if spec['sector'] is not None and '섹터' in chunk.columns:
+                chunk = chunk[chunk['섹터'] == spec['sector']]
+            for name, threshold in spec['filters'].items():
+                column, direction = FILTERS[name]
+                values = pd.to_numeric(chunk[column], errors='coerce')
+                chunk = chunk[values >= threshold] if direction == 'min' else chunk[values <= threshold]
+            if chunk.empty:
+                continue
+            if '날짜' not in chunk.columns:
+                chunk = chunk.assign(**{'날짜': date})
+            yield chunk.reindex(columns=spec['columns'])
+
+
+def stream_csv(spec):
+    # Excel에서 한글이 깨지지 않도록 BOM 포함 (저장된 CSV와 같은 utf-8-sig)
+    yield '\ufeff' + pd.DataFrame(columns=spec['columns']).to_csv(index=False)
+    for chunk in export_chunks(spec):
+        yield chunk.to_csv(index=False, header=False)
+
+
+def stream_jsonl(spec):
+    for chunk in export_chunks(spec):
+        # NaN은 null, 카테고리/불리언도 JSON 값으로
+        yield chunk.astype(object).where(chunk.notna(), None).to_json(orient='records', lines=True,
+                                                                      force_ascii=False) + '\n'
+
+
+class _ChunkSink:
+    """zipfile이 쓰는 바이트를 모았다가 응답 조각으로 넘겨주는 쓰기 전용 스트림 (seek 불가)"""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>')
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+    'officeDocument" Target="xl/workbook.xml"/></Relationships>')
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="PEG" sheetId="1" r:id="rId1"/></sheets></workbook>')
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+    'worksheet" Target="worksheets/sheet1.xml"/></Relationships>')
+
+
+def _xlsx_cell(value):
+    if value is None or (isinstance(value, float) and value != value):
+        return '<c/>'
+    if isinstance(value, (bool, np.bool_)):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, numbers.Real):
+        return f'<c><v>{float(value)!r}</v></c>'
+    return f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+
+def _xlsx_rows(values):
+    return ''.join('<row>' + ''.join(_xlsx_cell(value) for value in row) + '</row>' for row in values)
+
+
+def stream_xlsx(spec):
+    """시트 하나짜리 XLSX를 ZIP 스트림으로 (문자열은 inline string, 공유 문자열 표 없음)"""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _XLSX_CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _XLSX_ROOT_RELS)
+        archive.writestr('xl/workbook.xml', _XLSX_WORKBOOK)
+        archive.writestr('xl/_rels/workbook.xml.rels', _XLSX_WORKBOOK_RELS)
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                         '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                         '<sheetData>' + _xlsx_rows([spec['columns']])).encode('utf-8'))
+            for chunk in export_chunks(spec):
+                rows = chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
+                sheet.write(_xlsx_rows(rows).encode('utf-8'))
+                data = sink.drain()
+                if data:  # 압축기가 아직 내보내지 않은 조각은 다음 번에
+                    yield data
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+
+STREAMERS = {'csv': stream_csv, 'jsonl': stream_jsonl, 'xlsx': stream_xlsx}
+
+
+def stream_export(spec):
+    """내보내기 응답 본문 생성기"""
+    return STREAMERS[spec['format']](spec)
@@ -0,0 +1,127 @@
+# 스냅샷 저장소
+# CSV와 함께 타입이 지정된 Arrow IPC / Parquet 파일을 저장하고,
+# Arrow 파일은 메모리 매핑으로 읽어 파싱 없이 여러 프로세스가 같은 페이지를 공유
+
+import glob
+import os
+import re
+
+import pandas as pd
+
+from atomic_publish import atomic_open, atomic_path
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 미설치 시 CSV만 사용
+    pa = None
+
+FLOAT_COLUMNS = ["현재가격", "Trailing P/E", "Forward P/E", "PEG Ratio",
+                 "Forward PEG", "Earnings Yield", "PE/Sector Median"]
+CATEGORY_COLUMNS = ["섹터", "산업군", "PEG Source"]
+
+_DATE_PATTERN = re.compile(r'nasdaq100_real_data_(\d{4}-\d{2}-\d{2})\.(?:arrow|csv)$')
+
+
+def snapshot_filename(date, extension):
+    """날짜별 스냅샷 파일 이름 (extension: csv, arrow, parquet)"""
+    return f"nasdaq100_real_data_{date}.{extension}"
+
+
+def to_typed_frame(df):
+    """가격/비율은 float64, 섹터/산업군은 categorical로 변환한 DataFrame 반환"""
+    df = df.copy()
+    if "섹터" not in df.columns and "산업군" in df.columns:
+        df.insert(df.columns.get_loc("산업군"), "섹터", df["산업군"].str.split(" - ", n=1).str[0])
+    for column in FLOAT_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('float64')
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    return df
+
+
+def write_snapshot_csv(df, csv_filename):
+    """스냅샷 CSV를 원자적으로 저장 (Arrow 전용 컬럼은 제외)"""
+    with atomic_open(csv_filename, 'w', encoding='utf-8-sig', newline='') as f:
+        df.drop(columns=['섹터'], errors='ignore').to_csv(f, index=False)
+
+
+def write_snapshot(df, date):
+    """Arrow IPC(메모리 매핑용, 비압축)와 Parquet(보관용) 파일 저장, 저장한 파일 목록 반환"""
+    if pa is None:
+        return []
+    table = pa.Table.from_pandas(to_typed_frame(df), preserve_index=False)
+
+    arrow_filename = snapshot_filename(date, 'arrow')
+    with atomic_path(arrow_filename) as tmp_path:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    parquet_filename = snapshot_filename(date, 'parquet')
+    with atomic_path(parquet_filename) as tmp_path:
+        pq.write_table(table, tmp_path, compression='zstd')
+    return [arrow_filename, parquet_filename]
+
+
+def load_snapshot_table(date):
+    """Arrow 스냅샷을 메모리 매핑으로 읽어 pyarrow Table 반환 (복사 없음), 없으면 None"""
+    arrow_filename = snapshot_filename(date, 'arrow')
+    if pa is None or not os.path.exists(arrow_filename):
+        return None
+    source = pa.memory_map(arrow_filename, 'r')
+    return pa.ipc.open_file(source).read_all()
+
+
+def find_snapshot_csv(date):
+    """날짜별 CSV 파일 검색 (실제 데이터 파일 우선, 없으면 이전 형식 파일)"""
+    for csv_filename in (f"nasdaq100_real_data_{date}.csv",
+                         f"nasdaq100_pe_peg_{date}.csv",
+                         f"stock_pe_peg_{date}.csv"):
+        if os.path.exists(csv_filename):
+            return csv_filename
+    return None
+
+
+def load_snapshot(date):
+    """날짜별 스냅샷을 DataFrame으로 반환 (Arrow 메모리 매핑 우선, 없으면 CSV), 없으면 None"""
+    table = load_snapshot_table(date)
+    if table is not None:
+        return table.to_pandas()
+    csv_filename = find_snapshot_csv(date)
+    if csv_filename is None:
+        return None
+    return pd.read_csv(csv_filename, encoding='utf-8-sig')
+
+
+def available_snapshot_dates():
+    """저장된 스냅샷 날짜 목록 (오름차순)"""
+    dates = set()
+    for filename in glob.glob("nasdaq100_real_data_????-??-??.*"):
+        match = _DATE_PATTERN.search(os.path.basename(filename))
+        if match:
+            dates.add(match.group(1))
+    return sorted(dates)
+
+
+def latest_snapshot_date():
+    """가장 최근 스냅샷 날짜, 없으면 None"""
+    dates = available_snapshot_dates()
+    return dates[-1] if dates else None
+
+
+def load_history(dates=None):
+    """여러 날짜의 Arrow 스냅샷을 메모리 매핑으로 이어 붙인 Table 반환"""
+    if pa is None:
+        return None
+    tables = []
+    for date in dates or available_snapshot_dates():
+        table = load_snapshot_table(date)
+        if table is not None:
+            tables.append(table)
+    if not tables:
+        return None
+    return pa.concat_tables(tables, promote_options='permissive')
@@ -0,0 +1,91 @@
+# 스냅샷 버전 관리
+# 게시할 때마다 단조 증가하는 버전 번호를 붙여 행 데이터를 보관하고,
+# 클라이언트가 가진 버전 이후 추가/변경/삭제된 행만 돌려줌 (너무 오래된 버전이면 전체)
+
+import json
+import os
+from datetime import datetime, timezone
+
+from atomic_publish import atomic_open
+
+VERSIONS_FILENAME = 'nasdaq100_versions.json'
+MAX_RETAINED_VERSIONS = 50  # 이보다 오래된 버전을 가진 클라이언트는 전체 데이터를 받음
+
+
+def version_filename(version):
+    """버전별 행 데이터 파일 이름"""
+    return f"nasdaq100_version_{version}.json"
+
+
+def load_manifest(path=VERSIONS_FILENAME):
+    """{'current': 최신 버전, 'versions': [{version, date, published_at}, ...]} (오래된 순)"""
+    if not os.path.exists(path):
+        return {'current': 0, 'versions': []}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_version_rows(version):
+    """버전의 {티커: 행} 반환, 보관 기간이 지나 파일이 없으면 None"""
+    filename = version_filename(version)
+    if not os.path.exists(filename):
+        return None
+    with open(filename, 'r', encoding='utf-8') as f:
+        return json.load(f)['rows']
+
+
+def publish_version(rows, date, path=VERSIONS_FILENAME):
+    """행 목록을 새 버전으로 게시하고 버전 번호 반환 (직전 버전과 같으면 번호를 올리지 않음)"""
+    manifest = load_manifest(path)
+    rows_by_ticker = {row['ticker']: row for row in rows}
+    current = manifest['current']
+    if current and manifest['versions'][-1]['date'] == date and load_version_rows(current) == rows_by_ticker:
+        return current
+
+    version = current + 1
+    with atomic_open(version_filename(version), 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'date': date, 'rows': rows_by_ticker}, f, ensure_ascii=False)
+
+    manifest['current'] = version
+    manifest['versions'].append({'version': version, 'date': date,
+                                 'published_at': datetime.now(timezone.utc).isoformat(timespec='seconds')})
+    expired, manifest['versions'] = (manifest['versions'][:-MAX_RETAINED_VERSIONS],
+                                     manifest['versions'][-MAX_RETAINED_VERSIONS:])
+    with atomic_open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    for entry in expired:
+        try:
+            os.remove(version_filename(entry['version']))
+        except OSError:
+            pass
+    return version
+
+
+def diff_rows(old, new):
+    """두 {티커: 행} 사이의 (추가된 행, 변경된 행, 삭제된 티커)"""
+    added = [row for ticker, row in new.items() if ticker not in old]
+    changed = [row for ticker, row in new.items() if ticker in old and old[ticker] != row]
+    removed = sorted(ticker for ticker in old if ticker not in new)
+    return added, changed, removed
+
+
+def changes_since(since, path=VERSIONS_FILENAME):
+    """since 버전 이후의 변경분 응답, 최신 버전이 없으면 None
+
+    since 버전을 더 이상 보관하지 않거나 알 수 없는 버전이면 전체 행을 돌려줌 (full=True)
+    """
+    manifest = load_manifest(path)
+    current = manifest['current']
+    if not current:
+        return None
+    latest = manifest['versions'][-1]
+    rows = load_version_rows(current)
+    payload = {'version': current, 'date': latest['date'], 'published_at': latest['published_at']}
+
+    old = load_version_rows(since) if since is not None and 0 < since <= current else None
+    if old is None:
+        payload.update({'full': True, 'rows': list(rows.values())})
+        return payload
+    added, changed, removed = diff_rows(old, rows)
+    payload.update({'full': False, 'since': since, 'added': added, 'changed': changed, 'removed': removed})
+    return payload
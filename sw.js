@@ -1,7 +1,7 @@
 // 나스닥 100 PEG 분석 PWA - Service Worker
 // 기간 제한 없는 안정 버전
 
-const CACHE_NAME = 'nasdaq-peg-v1.7.0'; // 캐시 버전 업데이트 (중요!)
+const CACHE_NAME = 'nasdaq-peg-v1.8.2'; // 캐시 버전 업데이트 (중요!)
 
 // 캐시할 핵심 리소스 목록 (상대 경로)
 const CACHE_URLS = [
@@ -17,7 +17,7 @@ const CACHE_URLS = [
 // 1. 서비스 워커 설치
 // ==========================================
 self.addEventListener('install', (event) => {
-  console.log(`[SW v1.7.0] 서비스 워커 설치 중...`);
+  console.log(`[SW v1.8.2] 서비스 워커 설치 중...`);
   event.waitUntil(
     caches.open(CACHE_NAME)
       .then((cache) => {
@@ -25,11 +25,11 @@ self.addEventListener('install', (event) => {
         return cache.addAll(CACHE_URLS);
       })
       .then(() => {
-        console.log('✅ [SW v1.7.0] 서비스 워커 설치 완료');
+        console.log('✅ [SW v1.8.2] 서비스 워커 설치 완료');
         return self.skipWaiting(); // 설치 즉시 활성화 되도록 설정
       })
       .catch((error) => {
-        console.error('❌ [SW v1.7.0] 서비스 워커 설치에 실패했습니다:', error);
+        console.error('❌ [SW v1.8.2] 서비스 워커 설치에 실패했습니다:', error);
       })
   );
 });
@@ -38,20 +38,20 @@ self.addEventListener('install', (event) => {
 // 2. 서비스 워커 활성화
 // ==========================================
 self.addEventListener('activate', (event) => {
-  console.log(`🔄 [SW v1.7.0] 서비스 워커 활성화 중...`);
+  console.log(`🔄 [SW v1.8.2] 서비스 워커 활성화 중...`);
   event.waitUntil(
     caches.keys().then((cacheNames) => {
       return Promise.all(
         cacheNames.map((cacheName) => {
           // 현재 버전이 아닌 모든 이전 버전의 캐시를 삭제
           if (cacheName !== CACHE_NAME) {
-            console.log(`🗑️ [SW v1.7.0] 오래된 캐시를 삭제합니다:`, cacheName);
+            console.log(`🗑️ [SW v1.8.2] 오래된 캐시를 삭제합니다:`, cacheName);
             return caches.delete(cacheName);
           }
         })
       );
     }).then(() => {
-      console.log('✅ [SW v1.7.0] 서비스 워커 활성화 완료');
+      console.log('✅ [SW v1.8.2] 서비스 워커 활성화 완료');
       return self.clients.claim(); // 클라이언트 제어권을 즉시 획득
     })
   );
@@ -61,6 +61,12 @@ self.addEventListener('activate', (event) => {
 // 3. 네트워크 요청 처리 (네트워크 우선 전략)
 // ==========================================
 self.addEventListener('fetch', (event) => {
+  // API 응답(/api/changes 변경분 등)은 클라이언트 버전마다 달라 캐시하지 않음
+  // 페이지가 마지막으로 받은 버전과 행을 로컬에 보관하고 변경분만 요청함
+  if (new URL(event.request.url).pathname.startsWith('/api/')) {
+    return;
+  }
+
   event.respondWith(
     fetch(event.request)
       .then((networkResponse) => {
@@ -80,4 +86,4 @@ self.addEventListener('fetch', (event) => {
   );
 });
 
-console.log('🚀 [SW v1.7.0] 서비스 워커 로드가 완료되었습니다.');
\ No newline at end of file
+console.log('🚀 [SW v1.8.2] 서비스 워커 로드가 완료되었습니다.');
\ No newline at end of file
@@ -0,0 +1,46 @@
+import pytest
+
+import alert_rules
+from alert_rules import AlertRuleStore, evaluate_new_versions, load_alerts
+from snapshot_versions import publish_version
+
+
+def prices(**pegs):
+    return [{'ticker': ticker, 'peg': peg} for ticker, peg in pegs.items()]
+
+
+@pytest.fixture
+def peg_rule(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = AlertRuleStore()
+    store.add(alert_rules.normalize_rule({'field': 'peg', 'kind': 'crosses_below', 'value': 1.0}))
+    return store
+
+
+def test_crossing_needs_previous_value(peg_rule):
+    publish_version(prices(AAPL=1.2, MSFT=1.5), '2025-08-01')
+    publish_version(prices(AAPL=0.9), '2025-08-01')          # AAPL 돌파, MSFT 빠짐
+    publish_version(prices(AAPL=0.8, MSFT=0.7), '2025-08-01')  # MSFT가 다시 들어옴: 돌파 아님
+    fired = evaluate_new_versions(peg_rule)
+    assert [(alert['ticker'], alert['version']) for alert in fired] == [('AAPL', 2)]
+
+
+def test_crash_before_state_save_does_not_duplicate_alerts(peg_rule, monkeypatch):
+    publish_version(prices(AAPL=1.2), '2025-08-01')
+    publish_version(prices(AAPL=0.9), '2025-08-01')
+
+    real_atomic_open = alert_rules.atomic_open
+
+    def crash(*args, **kwargs):
+        raise KeyboardInterrupt  # 알림은 기록했지만 상태를 저장하기 전에 중단
+
+    monkeypatch.setattr(alert_rules, 'atomic_open', crash)
+    with pytest.raises(KeyboardInterrupt):
+        evaluate_new_versions(peg_rule)
+    monkeypatch.setattr(alert_rules, 'atomic_open', real_atomic_open)
+
+    assert evaluate_new_versions(peg_rule) == []
+    publish_version(prices(AAPL=1.1), '2025-08-01')
+    publish_version(prices(AAPL=0.5), '2025-08-01')
+    assert [alert['version'] for alert in evaluate_new_versions(peg_rule)] == [4]
+    assert [(alert['version'], alert['seq']) for alert in load_alerts()] == [(2, 1), (4, 2)]
@@ -0,0 +1,108 @@
+import json
+import os
+import sys
+import time
+
+import pytest
+
+import crawl_pe_peg_batch
+from atomic_publish import PipelineLease, atomic_open
+
+
+def test_atomic_open_replaces_only_on_success(tmp_path):
+    target = tmp_path / 'out.txt'
+    target.write_text('old')
+    try:
+        with atomic_open(str(target), 'w') as f:
+            f.write('partial')
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert target.read_text() == 'old'
+    assert os.listdir(tmp_path) == ['out.txt']
+
+
+def test_lease_is_single_flight(tmp_path):
+    path = str(tmp_path / '.pipeline.lock')
+    first, second = PipelineLease(path), PipelineLease(path)
+    assert first.acquire()
+    assert not second.acquire()
+    first.release()
+    assert second.acquire()
+    second.release()
+    assert not os.path.exists(path)
+
+
+def test_unreadable_lease_counts_as_held_until_mtime_ttl(tmp_path):
+    path = tmp_path / '.pipeline.lock'
+    # 다른 실행이 잠금 파일을 막 만든(또는 갱신 중인) 순간처럼 내용이 비어 있음
+    path.write_text('')
+    lease = PipelineLease(str(path), ttl=60)
+    assert not lease.acquire()
+    assert path.exists()
+
+    # 수정 시각 + ttl이 지나면 중단된 실행으로 보고 치움
+    old = time.time() - 120
+    os.utime(path, (old, old))
+    assert lease.acquire()
+    assert json.loads(path.read_text())['token'] == lease.token
+    lease.release()
+
+
+def test_renew_keeps_lease_readable(tmp_path):
+    path = str(tmp_path / '.pipeline.lock')
+    lease = PipelineLease(path, ttl=0.3)
+    assert lease.acquire()
+    deadline = time.time() + 0.5
+    while time.time() < deadline:
+        with open(path, 'r', encoding='utf-8') as f:
+            assert json.load(f)['token'] == lease.token
+    lease.release()
+
+
+def test_expired_lease_is_taken_over(tmp_path):
+    path = str(tmp_path / '.pipeline.lock')
+    crashed = PipelineLease(path, ttl=60)
+    assert crashed.acquire()
+    crashed._stop.set()  # 비정상 종료로 더 이상 연장하지 않는 실행
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'token': crashed.token, 'pid': 0, 'expires_at': time.time() - 1}, f)
+
+    takeover = PipelineLease(path, ttl=60)
+    assert takeover.acquire()
+    # 늦게 돌아온 이전 실행이 해제해도 새 잠금은 남아 있음
+    crashed.release()
+    assert json.loads(open(path, encoding='utf-8').read())['token'] == takeover.token
+    takeover.release()
+    assert not os.path.exists(path)
+
+
+def test_child_process_inherits_lease(tmp_path, monkeypatch):
+    path = str(tmp_path / '.pipeline.lock')
+    parent = PipelineLease(path)
+    assert parent.acquire()
+    monkeypatch.setattr(os, 'environ', parent.child_env())
+    child = PipelineLease(path)
+    assert child.acquire() and child.inherited
+    child.release()
+    assert os.path.exists(path)  # 해제는 부모가 담당
+
+    # 토큰이 다른(이미 끝난 실행의) 환경에서는 이어받지 않음
+    monkeypatch.setenv('PIPELINE_LEASE_TOKEN', 'stale')
+    assert not PipelineLease(path).acquire()
+    parent.release()
+
+
+def test_standalone_crawl_exits_when_pipeline_is_busy(tmp_path, monkeypatch):
+    path = str(tmp_path / '.pipeline.lock')
+    ran = []
+    monkeypatch.setattr(crawl_pe_peg_batch, 'LEASE_PATH', path)
+    monkeypatch.setattr(crawl_pe_peg_batch, 'run_crawl', ran.append)
+    monkeypatch.setattr(sys, 'argv', ['crawl_pe_peg_batch.py'])
+    with PipelineLease(path):
+        with pytest.raises(SystemExit) as exit_info:
+            crawl_pe_peg_batch.main()
+    assert exit_info.value.code == 1 and ran == []
+
+    crawl_pe_peg_batch.main()
+    assert len(ran) == 1 and not os.path.exists(path)
@@ -0,0 +1,37 @@
+import pytest
+
+from atomic_publish import PipelineBusyError, PipelineLease
+from backfill import run_backfill
+from generate_web_report import report_filename
+from raw_archive import write_unified_archive
+
+DATE = '2025-08-01'
+
+
+def write_archive():
+    write_unified_archive([
+        ('AAA', {'longName': 'Alpha Inc.', 'sector': 'Technology', 'industry': 'Software',
+                 'currentPrice': 10.0, 'trailingPE': 20.0, 'earningsGrowth': 0.25}),
+        ('BBB', {'shortName': 'Beta', 'sector': 'Energy', 'currentPrice': 5.0, 'pegRatio': 1.5}),
+    ], DATE)
+
+
+def test_backfill_regenerates_existing_report(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_archive()
+    with open(report_filename(DATE), 'w', encoding='utf-8') as f:
+        f.write('<html>stale</html>')
+
+    assert run_backfill([DATE], jobs=1, state_path='state.json', lease_path='.pipeline.lock') == []
+    with open(report_filename(DATE), 'r', encoding='utf-8') as f:
+        html = f.read()
+    assert 'stale' not in html
+    assert 'Alpha Inc.' in html
+
+
+def test_backfill_waits_for_pipeline_lease(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_archive()
+    with PipelineLease(path='.pipeline.lock'):
+        with pytest.raises(PipelineBusyError):
+            run_backfill([DATE], jobs=1, state_path='state.json', lease_path='.pipeline.lock')
@@ -0,0 +1,28 @@
+from crawl_checkpoint import CrawlCheckpoint, checkpoint_filename
+
+
+def test_resume_after_truncated_line(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    checkpoint = CrawlCheckpoint('2025-08-01')
+    checkpoint.append('AAPL', 'ok', {'symbol': 'AAPL'})
+    checkpoint.close()
+    # 기록 도중 강제 종료되어 마지막 줄이 잘린 상태
+    with open(checkpoint.path, 'a', encoding='utf-8') as f:
+        f.write('{"ticker": "MSFT", "status": "o')
+
+    resumed = CrawlCheckpoint('2025-08-01', resume=True)
+    assert resumed.completed_tickers() == {'AAPL'}
+    resumed.append('MSFT', 'ok', {'symbol': 'MSFT'})
+    resumed.append('NVDA', 'ok', {'symbol': 'NVDA'})
+    assert [record['ticker'] for record in resumed.iter_records()] == ['AAPL', 'MSFT', 'NVDA']
+    resumed.discard()
+
+
+def test_resume_when_whole_file_is_partial(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open(checkpoint_filename('2025-08-01'), 'w', encoding='utf-8') as f:
+        f.write('{"ticker": "AA')
+    resumed = CrawlCheckpoint('2025-08-01', resume=True)
+    resumed.append('AAPL', 'ok', {})
+    assert [record['ticker'] for record in resumed.iter_records()] == ['AAPL']
+    resumed.discard()
@@ -0,0 +1,48 @@
+import json
+import threading
+import types
+
+import crawl_pe_peg_batch
+from crawl_checkpoint import CrawlCheckpoint
+from crawl_priority import PAGE_VIEWS_FILENAME, add_page_views, order_tickers
+from raw_archive import write_unified_archive
+
+
+def test_order_by_market_cap_then_alphabetical(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_unified_archive([('AAPL', {'marketCap': 3e12}), ('MSFT', {'marketCap': 3.5e12}),
+                           ('ZS', {'marketCap': None})], '2025-08-01')
+    assert order_tickers(['ZS', 'AAPL', 'ADBE', 'MSFT'], 'market_cap') == ['MSFT', 'AAPL', 'ADBE', 'ZS']
+    assert order_tickers(['ZS', 'AAPL'], 'alphabetical') == ['AAPL', 'ZS']
+
+
+def test_page_views_accumulate_across_concurrent_writers(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    writers = [threading.Thread(target=lambda: [add_page_views({'NVDA': 1}) for _ in range(20)])
+               for _ in range(4)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    add_page_views({'AMD': 100})
+    with open(PAGE_VIEWS_FILENAME, encoding='utf-8') as f:
+        assert json.load(f) == {'AMD': 100, 'NVDA': 80}
+    assert order_tickers(['AAPL', 'NVDA', 'AMD'], 'page_views') == ['AMD', 'NVDA', 'AAPL']
+
+
+def test_crawl_stops_at_deadline_and_returns_remaining(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    clock = [0.0]
+    monkeypatch.setattr(crawl_pe_peg_batch, 'time', types.SimpleNamespace(monotonic=lambda: clock[0]))
+    monkeypatch.setattr(crawl_pe_peg_batch, 'pause', lambda seconds, deadline=None: None)
+
+    def fetch(ticker, attempts=3, deadline=None, fetcher=None):
+        clock[0] += 10  # 종목마다 10초 걸림
+        return {'longName': ticker, 'currentPrice': 1.0}, None
+
+    monkeypatch.setattr(crawl_pe_peg_batch, 'fetch_ticker_info', fetch)
+    checkpoint = CrawlCheckpoint('2025-08-01')
+    remaining = crawl_pe_peg_batch.crawl(['A', 'B', 'C', 'D'], checkpoint, deadline=25)
+    assert remaining == ['D']
+    assert checkpoint.completed_tickers() == {'A', 'B', 'C'}
+    checkpoint.discard()
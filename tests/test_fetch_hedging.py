@@ -0,0 +1,41 @@
+import threading
+import time
+
+import pytest
+
+from fetch_hedging import FetchTimeout, HedgedFetcher
+
+
+def test_timed_out_requests_are_not_sent_late():
+    release = threading.Event()
+    calls = []
+
+    def hang(key):
+        calls.append(key)
+        release.wait(5)
+        return key
+
+    fetcher = HedgedFetcher(hang, timeout=0.2, max_workers=4)
+    try:
+        for index in range(6):
+            with pytest.raises(FetchTimeout):
+                fetcher.fetch(f'T{index}')
+        # 작업 스레드가 모두 묶인 뒤의 요청은 큐에 쌓이지 않고 보내지도 않음
+        time.sleep(0.1)
+        assert calls == ['T0', 'T1', 'T2', 'T3']
+        assert fetcher.stats()['timeouts'] == 6
+
+        # 묶여 있던 요청이 끝나면 다시 보낼 수 있음
+        release.set()
+        time.sleep(0.1)
+        assert fetcher.fetch('T6') == 'T6'
+        assert calls[-1] == 'T6'
+    finally:
+        release.set()
+        fetcher.shutdown()
+
+
+def test_pool_size_covers_transport_timeout():
+    assert HedgedFetcher.pool_size(20, concurrency=1, transport_timeout=30) == 3
+    assert HedgedFetcher.pool_size(20, concurrency=1, hedge=True, transport_timeout=30) == 6
+    assert HedgedFetcher.pool_size(0.1, concurrency=4, transport_timeout=30) == 32
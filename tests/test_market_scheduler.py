@@ -0,0 +1,52 @@
+from datetime import date, datetime, timedelta
+
+import market_calendar
+from market_calendar import MARKET_TZ
+from market_scheduler import FakeClock, RefreshScheduler
+
+
+def run_schedule(start, end):
+    """가짜 시계로 start부터 end까지 스케줄러를 돌려 실행된 (작업, 시각) 목록 반환"""
+    clock = FakeClock(start)
+    runs = []
+
+    def job(name):
+        def run():
+            runs.append((name, clock()))
+            return True, name
+        return run
+
+    scheduler = RefreshScheduler(price_job=job('price'), fundamentals_job=job('fundamentals'),
+                                 clock=clock, sleep=clock.sleep)
+    while clock() < end:
+        scheduler.run_forever(max_iterations=1)
+    return runs
+
+
+def at(day, hour, minute=0):
+    return datetime.combine(day, datetime.min.time(), tzinfo=MARKET_TZ).replace(hour=hour, minute=minute)
+
+
+def test_calendar_thanksgiving_week_2025():
+    assert market_calendar.market_session(date(2025, 11, 27)) is None  # 추수감사절 휴장
+    assert date(2025, 11, 28) in market_calendar.early_close_days(2025)
+    assert market_calendar.market_session(date(2025, 11, 28))[1] == at(date(2025, 11, 28), 13)
+    assert market_calendar.next_trading_day(date(2025, 11, 26)) == date(2025, 11, 28)
+
+
+def test_schedule_skips_holiday_and_follows_early_close():
+    wednesday, thursday, friday = date(2025, 11, 26), date(2025, 11, 27), date(2025, 11, 28)
+    runs = run_schedule(at(wednesday, 15, 50), at(date(2025, 11, 29), 12))
+
+    # 휴장일(목요일)에는 아무 작업도 실행하지 않음
+    assert not [moment for _, moment in runs if moment.date() == thursday]
+
+    # 수요일: 폐장 전 가격 갱신 한 번, 정규 폐장(16:00) 30분 뒤 재무 크롤링
+    assert [(name, moment) for name, moment in runs if moment.date() == wednesday] == [
+        ('price', at(wednesday, 15, 50)), ('fundamentals', at(wednesday, 16, 30))]
+
+    # 금요일(조기 폐장 13:00): 개장부터 15분 간격 가격 갱신, 13:30에 재무 크롤링
+    friday_prices = [moment for name, moment in runs if name == 'price' and moment.date() == friday]
+    assert friday_prices == [at(friday, 9, 30) + timedelta(minutes=15 * i) for i in range(14)]
+    assert [moment for name, moment in runs if name == 'fundamentals' and moment.date() == friday] == [
+        at(friday, 13, 30)]
@@ -0,0 +1,70 @@
+import pandas as pd
+
+import crawl_pe_peg_batch
+from crawl_checkpoint import CrawlCheckpoint
+
+
+def test_partial_publish_skips_batch_without_successes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    published = []
+    monkeypatch.setattr(crawl_pe_peg_batch, 'publish_snapshot', published.append)
+    checkpoint = CrawlCheckpoint('2025-08-01')
+    for ticker in ['AAPL', 'MSFT', 'NVDA']:
+        checkpoint.append(ticker, 'failed')
+
+    crawl_pe_peg_batch.make_partial_publisher(checkpoint, previous=None)()
+    assert published == []
+
+    checkpoint.append('AAPL', 'ok', {'longName': 'Apple Inc.', 'sector': 'Technology',
+                                     'currentPrice': 200.0, 'trailingPE': 30.0})
+    crawl_pe_peg_batch.make_partial_publisher(checkpoint, previous=None)()
+    assert [list(df['티커']) for df in published] == [['AAPL']]
+    checkpoint.discard()
+
+
+def ok(checkpoint, ticker, sector, pe):
+    checkpoint.append(ticker, 'ok', {'longName': ticker, 'sector': sector, 'currentPrice': 10.0, 'trailingPE': pe})
+
+
+def test_partial_publish_reads_only_new_lines_and_matches_full_compute(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    published = []
+    monkeypatch.setattr(crawl_pe_peg_batch, 'publish_snapshot', published.append)
+    reads = []
+    checkpoint = CrawlCheckpoint('2025-08-01')
+    read_from = checkpoint.read_from
+    monkeypatch.setattr(checkpoint, 'read_from', lambda offset: reads.append(offset) or read_from(offset))
+    publish = crawl_pe_peg_batch.make_partial_publisher(checkpoint, previous=None)
+
+    ok(checkpoint, 'AAA', 'Tech', 10.0)
+    ok(checkpoint, 'BBB', 'Tech', 30.0)
+    publish()
+    ok(checkpoint, 'CCC', 'Tech', 20.0)
+    checkpoint.append('BBB', 'failed')  # 재시도에서 실패한 종목은 빠짐
+    publish()
+
+    assert reads[0] == 0 and reads[1] > 0
+    assert list(published[0]['티커']) == ['AAA', 'BBB']
+    latest = published[-1]
+    assert list(latest['티커']) == ['AAA', 'CCC']
+    # 섹터 중앙값 같은 전체 종목 지표도 최종 계산과 같음
+    full = crawl_pe_peg_batch.compute_metrics_from_checkpoint(checkpoint)
+    assert latest.drop(columns='갱신시각').equals(full.drop(columns='갱신시각'))
+    checkpoint.discard()
+
+
+def test_partial_publish_keeps_previous_rows_as_stale(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    published = []
+    monkeypatch.setattr(crawl_pe_peg_batch, 'publish_snapshot', published.append)
+    checkpoint = CrawlCheckpoint('2025-08-01')
+    ok(checkpoint, 'AAA', 'Tech', 12.0)
+    previous = crawl_pe_peg_batch.compute_metrics_from_checkpoint(checkpoint)
+    previous['현재가격'] = 1.0
+    previous = pd.concat([previous, previous.assign(티커='ZZZ')], ignore_index=True)
+
+    crawl_pe_peg_batch.make_partial_publisher(checkpoint, previous)()
+    merged = published[0].set_index('티커')
+    assert merged.loc['AAA', '현재가격'] == 10.0 and not merged.loc['AAA', 'Stale']
+    assert merged.loc['ZZZ', '현재가격'] == 1.0 and merged.loc['ZZZ', 'Stale']
+    checkpoint.discard()
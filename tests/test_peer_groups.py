@@ -0,0 +1,42 @@
+import numpy as np
+
+from peer_groups import compute_peers, nearest_neighbours, peer_response
+from valuation_metrics import raw_frame
+
+
+def test_blocked_knn_matches_brute_force():
+    features = np.random.default_rng(0).normal(size=(50, 6)).astype(np.float32)
+    indices, distances = nearest_neighbours(features, k=5, block_rows=7)
+
+    full = np.linalg.norm(features[:, None, :] - features[None, :, :], axis=2)
+    np.fill_diagonal(full, np.inf)
+    expected = np.argsort(full, axis=1, kind='stable')[:, :5]
+    assert (indices == expected).all()
+    assert np.allclose(distances, np.take_along_axis(full, expected, axis=1), atol=1e-4)
+
+
+def company(sector, pe, growth, cap, peg=None):
+    return {'sector': sector, 'trailingPE': pe, 'forwardPE': pe * 0.9, 'earningsGrowth': growth,
+            'marketCap': cap, 'pegRatio': peg}
+
+
+def test_peers_prefer_same_sector_and_filter_cheaper():
+    raw = raw_frame([
+        ('SOFT1', company('Technology', 30.0, 0.20, 1e12, peg=1.5)),
+        ('SOFT2', company('Technology', 32.0, 0.22, 9e11, peg=1.2)),
+        ('SOFT3', company('Technology', 60.0, 0.10, 5e10, peg=3.0)),
+        ('OIL1', company('Energy', 31.0, 0.21, 1e12, peg=0.9)),
+        ('THIN', {'sector': 'Technology', 'trailingPE': 30.0}),  # 특징이 부족해 제외
+    ])
+    payload = {'date': '2025-08-01', **compute_peers(raw, k=3)}
+    assert 'THIN' not in payload['peers']
+    # 지표가 거의 같아도 다른 섹터 종목은 같은 섹터 종목보다 멀리
+    peers = [peer for peer, _ in payload['peers']['SOFT1']]
+    assert peers[0] == 'SOFT2' and set(peers) == {'SOFT2', 'SOFT3', 'OIL1'}
+    distances = dict(payload['peers']['SOFT1'])
+    assert distances['OIL1'] > distances['SOFT2']
+
+    cheaper = peer_response(payload, 'SOFT1', cheaper=True)
+    assert [peer['ticker'] for peer in cheaper['peers']] == ['SOFT2', 'OIL1']
+    assert peer_response(payload, 'SOFT1', limit=1)['peers'][0]['ticker'] == 'SOFT2'
+    assert peer_response(payload, 'NONE') is None
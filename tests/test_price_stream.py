@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+import app
+from market_calendar import MARKET_TZ
+from price_stream import PriceBroadcaster, PricePoller, SharedPriceFeed
+
+MARKET_HOURS = datetime(2025, 8, 1, 11, 0, tzinfo=MARKET_TZ)
+
+
+def make_poller(publish, has_clients=None):
+    rows = {'AAPL': {'ticker': 'AAPL', 'price': 200.0, 'trailPE': 30.0, 'fwdPE': 25.0, 'peg': 2.0}}
+    fetched = []
+
+    def fetch_prices(tickers):
+        fetched.append(tickers)
+        return {'AAPL': 220.0}
+
+    poller = PricePoller(publish, lambda: (1, rows), has_clients=has_clients, fetch_prices=fetch_prices,
+                         clock=lambda: MARKET_HOURS)
+    return poller, fetched
+
+
+def test_poller_idles_without_clients():
+    broadcaster = PriceBroadcaster()
+    poller, _ = make_poller(broadcaster.publish, broadcaster.has_clients)
+    assert not poller.should_poll()
+    subscription = broadcaster.subscribe()
+    assert poller.should_poll()
+    broadcaster.unsubscribe(subscription)
+    assert not poller.should_poll()
+    # 폴링 클라이언트도 최근에 요청했으면 클라이언트로 셈
+    broadcaster.events_since(0)
+    assert poller.should_poll()
+
+
+def test_polling_clients_receive_recent_events():
+    broadcaster = PriceBroadcaster()
+    poller, _ = make_poller(broadcaster.publish)
+    changes = poller.poll_once()
+    assert changes[0]['price'] == 220.0 and abs(changes[0]['peg'] - 2.2) < 1e-9
+    events = broadcaster.events_since(0)
+    assert [event['rows'] for event in events] == [changes]
+    assert broadcaster.events_since(events[-1]['seq']) == []
+
+
+def test_shared_feed_demand_across_workers(tmp_path):
+    demand = str(tmp_path / '.price_demand')
+    leader = SharedPriceFeed(PriceBroadcaster(), path=str(tmp_path / 'events.jsonl'), demand_path=demand)
+    other = SharedPriceFeed(PriceBroadcaster(), path=str(tmp_path / 'events.jsonl'), demand_path=demand)
+    assert not leader.has_demand()
+
+    # 다른 워커에 클라이언트가 붙으면 폴러 워커도 수요를 봄
+    other.broadcaster.subscribe()
+    other.touch_demand()
+    assert leader.has_demand()
+
+    old = time.time() - 2 * leader.demand_seconds
+    os.utime(demand, (old, old))
+    assert not leader.has_demand()
+
+
+def test_stream_ends_after_max_seconds():
+    broadcaster = PriceBroadcaster()
+    subscription = broadcaster.subscribe()
+    chunks = list(broadcaster.events(subscription, heartbeat=0.01, max_seconds=0.05))
+    assert chunks[0].startswith('retry:')
+    assert broadcaster.client_count() == 0
+
+
+def test_first_poll_starts_at_current_seq_without_replay(monkeypatch):
+    broadcaster = PriceBroadcaster()
+    monkeypatch.setattr(app, 'price_broadcaster', broadcaster)
+    monkeypatch.setattr(app, 'ensure_price_poller', lambda: None)
+    for seq in (1, 2, 3):
+        broadcaster.publish({'type': 'prices', 'seq': seq, 'version': 1, 'rows': []})
+    client = app.app.test_client()
+
+    first = client.get('/api/prices').get_json()
+    assert first['events'] == [] and first['seq'] == 3
+
+    broadcaster.publish({'type': 'prices', 'seq': 4, 'version': 1, 'rows': []})
+    # since 이후 이벤트만 재생, 놓친 것이 없으면 빈 목록
+    replay = client.get(f"/api/prices?since={first['seq']}").get_json()
+    assert [event['seq'] for event in replay['events']] == [4] and replay['seq'] == 4
+    assert [event['seq'] for event in client.get('/api/prices?since=1').get_json()['events']] == [2, 3, 4]
+    assert client.get('/api/prices?since=4').get_json() == {'success': True, 'events': [], 'seq': 4}
+
+
+def test_try_subscribe_never_exceeds_limit_under_concurrency():
+    broadcaster = PriceBroadcaster()
+    start = threading.Barrier(16)
+    results = []
+
+    def connect():
+        start.wait()
+        results.append(broadcaster.try_subscribe(4))
+
+    threads = [threading.Thread(target=connect) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(subscription is not None for subscription in results) == 4
+    assert broadcaster.client_count() == 4
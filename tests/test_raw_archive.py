@@ -0,0 +1,57 @@
+import json
+import os
+
+import pytest
+
+import app
+import raw_archive
+from raw_archive import ArchiveChangedError, build_index, read_ticker_record, unified_filename, write_unified_archive
+
+RECORDS = [
+    ('AAPL', {'longName': 'Apple Inc.', 'currentPrice': 200.5}),
+    ('삼성', {'longName': '삼성전자 "우선주"', 'tags': ['한글', 'ü']}),
+    ('MSFT', {'longName': 'Microsoft', 'nested': {'a': [1, 2, {'b': None}]}}),
+]
+
+
+def test_written_offsets_match_build_index_and_full_parse(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_unified_archive(iter(RECORDS), '2025-08-01')
+    with open(raw_archive.index_filename('2025-08-01'), encoding='utf-8') as f:
+        written = json.load(f)['offsets']
+    # 멀티바이트 문자가 있어도 바이트 오프셋이 같아야 함
+    assert build_index('2025-08-01') == written
+    with open(unified_filename('2025-08-01'), encoding='utf-8') as f:
+        assert json.load(f) == dict(RECORDS)
+    for ticker, info in RECORDS:
+        assert read_ticker_record('2025-08-01', ticker) == info
+    assert read_ticker_record('2025-08-01', 'NVDA') is None
+
+
+def test_read_rejects_replaced_archive(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_unified_archive(iter(RECORDS), '2025-08-01')
+    stat = os.stat(unified_filename('2025-08-01'))
+    expected = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    old_index = raw_archive.load_index('2025-08-01')
+
+    write_unified_archive(iter([('AAPL', {'longName': 'Apple Inc. (renamed)'})] + RECORDS[1:]), '2025-08-01')
+    with pytest.raises(ArchiveChangedError):
+        read_ticker_record('2025-08-01', 'MSFT', index=old_index, archive_stat=expected)
+
+
+def test_api_ticker_reads_with_index_of_its_own_archive(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app, 'record_page_view', lambda symbol: None)
+    app.cached_ticker_record.cache_clear()
+    client = app.app.test_client()
+
+    write_unified_archive(iter(RECORDS), '2025-08-01')
+    assert client.get('/api/ticker/msft').get_json()['info'] == RECORDS[2][1]
+    old = app.current_archive_index()
+
+    # 다음 날 아카이브가 게시된 뒤에도 이전 키로는 이전 인덱스만 사용
+    write_unified_archive(iter([('MSFT', {'longName': 'Microsoft (new)'})]), '2025-08-02')
+    assert client.get('/api/ticker/MSFT').get_json()['info'] == {'longName': 'Microsoft (new)'}
+    assert app.cached_ticker_record(old, 'MSFT') == RECORDS[2][1]
+    app.cached_ticker_record.cache_clear()
@@ -0,0 +1,21 @@
+import json
+
+import pandas as pd
+
+import raw_archive
+from search_index import fingerprint, search_entries
+
+
+def test_entries_use_latest_archive_before_todays_exists(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open(raw_archive.unified_filename('2025-01-02'), 'w', encoding='utf-8') as f:
+        json.dump({'AAPL': {'longName': 'Apple Inc.', 'shortName': 'Apple'}}, f)
+    df = pd.DataFrame({'티커': ['AAPL'], '종목명': ['Apple'], '산업군': ['Consumer Electronics']})
+
+    partial = search_entries(df, '2025-01-03')
+    assert partial == [['AAPL', 'Apple Inc.', 'Apple', 'Consumer Electronics']]
+
+    # 그날 아카이브가 저장된 뒤에도 이름이 같으면 인덱스를 다시 만들 필요가 없음
+    with open(raw_archive.unified_filename('2025-01-03'), 'w', encoding='utf-8') as f:
+        json.dump({'AAPL': {'longName': 'Apple Inc.', 'shortName': 'Apple'}}, f)
+    assert fingerprint(search_entries(df, '2025-01-03')) == fingerprint(partial)
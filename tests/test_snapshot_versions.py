@@ -0,0 +1,54 @@
+import snapshot_versions
+from snapshot_versions import changes_since, load_manifest, publish_version
+
+
+def apply(rows, payload):
+    """클라이언트(index.html DataSync)가 변경분을 반영하는 방식"""
+    if payload['full']:
+        return {row['ticker']: row for row in payload['rows']}
+    rows = dict(rows)
+    for row in payload['added'] + payload['changed']:
+        rows[row['ticker']] = row
+    for ticker in payload['removed']:
+        rows.pop(ticker)
+    return rows
+
+
+VERSIONS = [
+    [{'ticker': 'AAPL', 'price': 200.0}, {'ticker': 'MSFT', 'price': 400.0}],
+    [{'ticker': 'AAPL', 'price': 201.0}, {'ticker': 'MSFT', 'price': 400.0}, {'ticker': 'NVDA', 'price': 100.0}],
+    [{'ticker': 'AAPL', 'price': 201.0}, {'ticker': 'NVDA', 'price': 90.0}],
+]
+
+
+def test_diff_chain_reaches_latest_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert changes_since(0) is None
+    client = {}
+    version = 0
+    for rows in VERSIONS:
+        assert publish_version(rows, '2025-08-01') == version + 1
+        payload = changes_since(version or None)
+        client, version = apply(client, payload), payload['version']
+        assert client == {row['ticker']: row for row in rows}
+
+    # 같은 내용을 다시 게시하면 버전이 그대로, 최신 버전 클라이언트는 빈 변경분
+    assert publish_version(VERSIONS[-1], '2025-08-01') == 3
+    latest = changes_since(3)
+    assert (latest['added'], latest['changed'], latest['removed']) == ([], [], [])
+
+    # 두 버전을 건너뛴 클라이언트도 한 번에 같은 결과
+    skipped = changes_since(1)
+    assert not skipped['full'] and skipped['removed'] == ['MSFT']
+    assert apply({row['ticker']: row for row in VERSIONS[0]}, skipped) == client
+
+
+def test_expired_or_unknown_version_gets_full_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(snapshot_versions, 'MAX_RETAINED_VERSIONS', 2)
+    for rows in VERSIONS:
+        publish_version(rows, '2025-08-01')
+    assert [entry['version'] for entry in load_manifest()['versions']] == [2, 3]
+    assert changes_since(1)['full']
+    assert changes_since(99)['full']
+    assert not changes_since(2)['full']
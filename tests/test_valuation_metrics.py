@@ -0,0 +1,34 @@
+from crawl_checkpoint import CrawlCheckpoint
+from valuation_metrics import CSV_COLUMNS, METRIC_COLUMNS, compute_metrics, raw_frame
+
+
+def checkpoint_records(checkpoint):
+    return ((record['ticker'], record['info']) for record in checkpoint.iter_records()
+            if record['info'] is not None)
+
+
+def test_compute_on_empty_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    checkpoint = CrawlCheckpoint('2025-08-01')
+    # 모든 종목이 실패한 실행 (rate limit 등): info 없는 기록만 있음
+    checkpoint.append('AAPL', 'failed')
+    checkpoint.append('MSFT', 'failed')
+
+    results = compute_metrics(raw_frame(checkpoint_records(checkpoint)), '2025-08-01')
+    assert results.empty
+    assert list(results.columns) == CSV_COLUMNS + METRIC_COLUMNS
+    checkpoint.discard()
+
+
+def test_compute_metrics_industry_and_peg_fallback():
+    raw = raw_frame([
+        ('AAA', {'longName': 'Alpha Inc.', 'sector': 'Technology', 'industry': 'Software',
+                 'currentPrice': 10.0, 'trailingPE': 20.0, 'earningsGrowth': 0.25}),
+        ('BBB', {'shortName': 'Beta', 'sector': 'Energy', 'currentPrice': 5.0, 'pegRatio': 1.5}),
+    ])
+    results = compute_metrics(raw, '2025-08-01').set_index('티커')
+    assert results.loc['AAA', '산업군'] == 'Technology - Software'
+    assert results.loc['AAA', 'PEG Ratio'] == 0.8  # trailingPE / (성장률 * 100)
+    assert results.loc['BBB', '종목명'] == 'Beta'
+    assert results.loc['BBB', '산업군'] == 'Energy'
+    assert results.loc['BBB', 'PEG Source'] == 'pegRatio'
@@ -0,0 +1,27 @@
+import pytest
+
+from watchlists import WatchlistStore, compute_view, normalize_watchlist
+
+
+def test_stores_in_different_workers_see_each_other(tmp_path):
+    path = str(tmp_path / 'watchlists.json')
+    # serve.py의 워커 두 개처럼 같은 파일을 쓰는 별도 인스턴스
+    first, second = WatchlistStore(path), WatchlistStore(path)
+    a = first.save(normalize_watchlist({'tickers': 'AAPL'}))
+    b = second.save(normalize_watchlist({'tickers': 'MSFT'}))
+
+    assert second.get(a)['tickers'] == ['AAPL']
+    assert first.get(b)['tickers'] == ['MSFT']
+    assert first.delete(b)
+    assert second.get(b) is None
+    assert second.get(a) is not None
+
+
+def test_normalize_and_view():
+    watchlist = normalize_watchlist({'tickers': 'msft, aapl,NVDA', 'sort': 'peg', 'max_peg': '2'})
+    assert watchlist['tickers'] == ['AAPL', 'MSFT', 'NVDA']
+    rows = {'AAPL': {'ticker': 'AAPL', 'peg': 1.9}, 'MSFT': {'ticker': 'MSFT', 'peg': 2.4},
+            'NVDA': {'ticker': 'NVDA', 'peg': 1.7}}
+    assert [row['ticker'] for row in compute_view(rows, watchlist)] == ['NVDA', 'AAPL']
+    with pytest.raises(ValueError):
+        normalize_watchlist({'tickers': ''})
@@ -0,0 +1,121 @@
+# 밸류에이션 지표 계산 단계
+# 크롤링(I/O)과 분리해 스냅샷 전체를 컬럼 단위(NumPy/pandas)로 한 번에 계산
+# 저장된 원본 데이터(nasdaq100_real_unified_{date}.json)로 재크롤링 없이 다시 실행 가능
+
+import argparse
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from snapshot_store import write_snapshot, write_snapshot_csv
+
+# 지표 계산에 필요한 원본 필드
+RAW_TEXT_FIELDS = ['longName', 'shortName', 'sector', 'industry']
+RAW_NUMERIC_FIELDS = ['currentPrice', 'trailingPE', 'forwardPE', 'trailingPegRatio', 'pegRatio',
+                      'forwardPegRatio', 'earningsGrowth', 'marketCap']
+
+# PEG 비율 우선순위 (앞에서부터 값이 있는 소스 사용)
+PEG_SOURCES = ['trailingPegRatio', 'pegRatio', 'forwardPegRatio']
+PEG_SOURCE_DERIVED = 'trailingPE/earningsGrowth'
+
+# 기존 CSV 컬럼 + 추가 지표 컬럼
+CSV_COLUMNS = ["날짜", "종목명", "티커", "산업군", "현재가격", "Trailing P/E", "Forward P/E", "PEG Ratio"]
+METRIC_COLUMNS = ["PEG Source", "Forward PEG", "Earnings Yield", "PE/Sector Median"]
+
+
+def raw_frame(records):
+    """(티커, info 딕셔너리) 이터러블에서 필요한 필드만 뽑아 DataFrame 생성"""
+    columns = {field: [] for field in ['ticker'] + RAW_TEXT_FIELDS + RAW_NUMERIC_FIELDS}
+    for ticker, info in records:
+        columns['ticker'].append(ticker)
+        for field in RAW_TEXT_FIELDS + RAW_NUMERIC_FIELDS:
+            columns[field].append(info.get(field))
+    df = pd.DataFrame(columns)
+    # 종목이 하나도 없어도 텍스트 컬럼은 문자열 연산이 가능한 object 타입으로
+    for field in ['ticker'] + RAW_TEXT_FIELDS:
+        df[field] = df[field].astype(object)
+    for field in RAW_NUMERIC_FIELDS:
+        df[field] = pd.to_numeric(df[field], errors='coerce').astype('float64')
+    return df
+
+
+def load_raw_snapshot(json_filename):
+    """통합 JSON 원본 파일을 읽어 지표 계산용 DataFrame 반환"""
+    with open(json_filename, 'r', encoding='utf-8') as f:
+        all_stock_data = json.load(f)
+    return raw_frame(all_stock_data.items())
+
+
+def peg_with_source(raw):
+    """PEG 대체 순서(trailingPegRatio → pegRatio → forwardPegRatio → PE/성장률)를 적용해 (PEG, 출처) 반환"""
+    growth = raw['earningsGrowth'].where(raw['earningsGrowth'] > 0)
+    derived = raw['trailingPE'] / (growth * 100)
+
+    candidates = [raw[source].to_numpy() for source in PEG_SOURCES] + [derived.to_numpy()]
+    names = PEG_SOURCES + [PEG_SOURCE_DERIVED]
+    conditions = [~np.isnan(values) for values in candidates]
+
+    peg = np.select(conditions, candidates, default=np.nan)
+    source = np.select(conditions, names, default=None)
+    return pd.Series(peg, index=raw.index), pd.Series(source, index=raw.index, dtype=object)
+
+
+def compute_metrics(raw, date):
+    """원본 DataFrame 전체에 대해 CSV 행과 추가 지표를 한 번에 계산"""
+    peg, peg_source = peg_with_source(raw)
+
+    # 산업군 정보 조합 (섹터 - 세부 산업)
+    sector = raw['sector'].fillna('N/A')
+    industry = raw['industry'].fillna('N/A')
+    industry_info = sector.where((industry == 'N/A') | (industry == sector), sector + " - " + industry)
+
+    # 추가 지표
+    growth = raw['earningsGrowth'].where(raw['earningsGrowth'] > 0)
+    forward_peg = raw['forwardPegRatio'].fillna(raw['forwardPE'] / (growth * 100))
+    positive_pe = raw['trailingPE'].where(raw['trailingPE'] > 0)
+    earnings_yield = 1 / positive_pe
+    sector_median_pe = positive_pe.groupby(sector).transform('median')
+    pe_to_sector = positive_pe / sector_median_pe
+
+    result = pd.DataFrame({
+        "날짜": date,
+        "종목명": raw['longName'].fillna(raw['shortName']).fillna('N/A'),
+        "티커": raw['ticker'],
+        "산업군": industry_info,
+        "현재가격": raw['currentPrice'],
+        "Trailing P/E": raw['trailingPE'],
+        "Forward P/E": raw['forwardPE'],
+        "PEG Ratio": peg,
+        "PEG Source": peg_source,
+        "Forward PEG": forward_peg,
+        "Earnings Yield": earnings_yield,
+        "PE/Sector Median": pe_to_sector,
+    })
+
+    # 유효한 재무 데이터(가격, P/E, PEG 중 하나 이상)가 있는 종목만 유지
+    valid = result[["현재가격", "Trailing P/E", "PEG Ratio"]].notna().any(axis=1)
+    return result[valid].reset_index(drop=True)
+
+
+def date_from_filename(filename):
+    """파일 이름에서 YYYY-MM-DD 날짜 추출"""
+    match = re.search(r'\d{4}-\d{2}-\d{2}', os.path.basename(filename))
+    return match.group(0) if match else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="저장된 원본 JSON으로 밸류에이션 지표 재계산")
+    parser.add_argument('json_file', help='nasdaq100_real_unified_{date}.json 파일')
+    parser.add_argument('--output', help='저장할 CSV 파일 (기본: nasdaq100_real_data_{date}.csv)')
+    args = parser.parse_args()
+
+    date = date_from_filename(args.json_file)
+    metrics = compute_metrics(load_raw_snapshot(args.json_file), date)
+    output = args.output or f"nasdaq100_real_data_{date}.csv"
+    write_snapshot_csv(metrics, output)
+    if args.output is None:
+        write_snapshot(metrics, date)
+    print(f"📄 {len(metrics)}개 종목 지표가 '{output}' 파일에 저장되었습니다.")
@@ -0,0 +1,119 @@
+# 사용자별 관심 종목(watchlist)
+# 관심 목록은 티커/정렬/필터 조건만 저장하고, 화면 데이터는 항상 공유 스냅샷(게시 버전)에서 잘라내 계산
+# (관심 목록 때문에 크롤링이 일어나는 일은 없음)
+
+import json
+import os
+import threading
+import uuid
+
+from atomic_publish import atomic_open, file_lock
+
+WATCHLISTS_FILENAME = 'nasdaq100_watchlists.json'
+MAX_TICKERS = 200
+
+SORT_FIELDS = ('ticker', 'company', 'industry', 'peg', 'trailPE', 'fwdPE', 'price')
+DEFAULT_SORT = 'peg'
+
+# 필터 이름 -> (행 필드, 비교 방향)
+FILTERS = {
+    'min_peg': ('peg', 'min'),
+    'max_peg': ('peg', 'max'),
+    'max_trailPE': ('trailPE', 'max'),
+    'max_fwdPE': ('fwdPE', 'max'),
+    'min_price': ('price', 'min'),
+    'max_price': ('price', 'max'),
+}
+
+
+def normalize_watchlist(spec):
+    """요청으로 받은 관심 목록 조건을 검증해 정규화된 dict 반환, 잘못된 값이면 ValueError"""
+    tickers = spec.get('tickers') or []
+    if isinstance(tickers, str):
+        tickers = tickers.split(',')
+    tickers = sorted({str(ticker).strip().upper() for ticker in tickers if str(ticker).strip()})
+    if not tickers:
+        raise ValueError('관심 종목이 비어 있습니다.')
+    if len(tickers) > MAX_TICKERS:
+        raise ValueError(f'관심 종목은 최대 {MAX_TICKERS}개까지 가능합니다.')
+
+    sort = spec.get('sort') or DEFAULT_SORT
+    if sort not in SORT_FIELDS:
+        raise ValueError(f'정렬 기준은 {", ".join(SORT_FIELDS)} 중 하나여야 합니다.')
+    descending = str(spec.get('desc', '')).lower() in ('1', 'true')
+
+    filters = {}
+    for name in FILTERS:
+        value = spec.get(name)
+        if value is None or value == '':
+            continue
+        try:
+            filters[name] = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'{name} 값이 숫자가 아닙니다: {value}')
+
+    return {'tickers': tickers, 'sort': sort, 'desc': descending, 'filters': filters}
+
+
+def watchlist_key(watchlist):
+    """정규화된 관심 목록의 캐시 키 (조건이 같으면 사용자가 달라도 같은 키)"""
+    return json.dumps(watchlist, sort_keys=True, separators=(',', ':'))
+
+
+def compute_view(rows_by_ticker, watchlist):
+    """스냅샷 {티커: 행}에서 관심 종목만 골라 필터/정렬한 행 목록 (값이 없는 행은 항상 뒤로)"""
+    rows = [rows_by_ticker[ticker] for ticker in watchlist['tickers'] if ticker in rows_by_ticker]
+    for name, threshold in watchlist['filters'].items():
+        field, direction = FILTERS[name]
+        if direction == 'min':
+            rows = [row for row in rows if row[field] is not None and row[field] >= threshold]
+        else:
+            rows = [row for row in rows if row[field] is not None and row[field] <= threshold]
+
+    sort = watchlist['sort']
+    present = [row for row in rows if row[sort] is not None]
+    missing = [row for row in rows if row[sort] is None]
+    present.sort(key=lambda row: row[sort], reverse=watchlist['desc'])
+    return present + missing
+
+
+class WatchlistStore:
+    """{관심 목록 id: 정규화된 조건}을 파일로 유지 (id는 사용자가 보관하는 추측 불가능한 토큰)
+
+    여러 워커 프로세스가 같은 파일을 쓰므로 작업마다 파일 잠금 아래에서 다시 읽음
+    """
+
+    def __init__(self, path=WATCHLISTS_FILENAME):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def get(self, watchlist_id):
+        with file_lock(self.path, shared=True):
+            return self._load().get(watchlist_id)
+
+    def save(self, watchlist, watchlist_id=None):
+        """관심 목록 저장 (id가 없으면 새로 발급), id 반환"""
+        with self._lock, file_lock(self.path):
+            entries = self._load()
+            watchlist_id = watchlist_id or uuid.uuid4().hex
+            entries[watchlist_id] = watchlist
+            self._write(entries)
+        return watchlist_id
+
+    def delete(self, watchlist_id):
+        with self._lock, file_lock(self.path):
+            entries = self._load()
+            if entries.pop(watchlist_id, None) is None:
+                return False
+            self._write(entries)
+        return True
+
+    def _write(self, entries):
+        with atomic_open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,42 @@
+# yfinance 공용 HTTP 세션
+# 모든 종목 요청이 하나의 세션(연결 풀 + 쿠키/crumb)을 재사용하도록 관리
+
+import certifi
+from curl_cffi import CurlOpt
+from curl_cffi import requests as curl_requests
+
+# 동시에 유지할 keep-alive 연결 수 (크롤링 동시성에 맞춤)
+DEFAULT_POOL_SIZE = 5
+# 개별 요청 타임아웃 (초)
+DEFAULT_TIMEOUT = 30
+
+_shared_session = None
+
+
+def create_yf_session(pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+    """certifi CA 번들과 keep-alive 연결 풀을 사용하는 curl_cffi 세션 생성"""
+    return curl_requests.Session(
+        impersonate="chrome",
+        verify=True,
+        timeout=timeout,
+        curl_options={
+            CurlOpt.CAINFO: certifi.where(),
+            CurlOpt.MAXCONNECTS: pool_size,
+        },
+    )
+
+
+def get_yf_session(pool_size=DEFAULT_POOL_SIZE):
+    """프로세스 전체에서 공유하는 세션 반환 (최초 호출 시 생성)"""
+    global _shared_session
+    if _shared_session is None:
+        _shared_session = create_yf_session(pool_size=pool_size)
+    return _shared_session
+
+
+def close_yf_session():
+    """공유 세션 종료"""
+    global _shared_session
+    if _shared_session is not None:
+        _shared_session.close()
+        _shared_session = None